@@ -0,0 +1,65 @@
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncClientAdapter():
+    ''' DEFAULT_MAX_IN_FLIGHT: number of requests to one platform that may be in flight at once '''
+    DEFAULT_MAX_IN_FLIGHT = 32
+
+    def __init__(self, client, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        '''
+        Asynchronous adapter for a blocking API client (eg. spotipy.Spotify or ytmusicapi.YTMusic).\n
+        NOTE: spotipy and ytmusicapi only provide blocking calls, so each call is awaited on a pool
+        of at most max_in_flight threads shared by every coroutine using this adapter. The number
+        of threads therefore depends on how many requests may be in flight, not on how many
+        coroutines (tracks, playlists, libraries) are waiting on the event loop.
+        '''
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.semaphore = None
+        self.semaphore_loop = None
+        pass
+
+    async def call(self, method_name: str, *args, **kwargs):
+        '''
+        Await a method of the wrapped API client.\n
+        Parameters:
+        - (str) method_name: name of the client method (eg. "search")
+        - (list) args, (dict) kwargs: arguments of the client method\n
+        Return:
+        - (any) return value of the client method
+        '''
+        return await self.run(getattr(self.client, method_name), *args, **kwargs)
+
+    async def run(self, func, *args, **kwargs):
+        '''
+        Await a blocking function that makes requests through the wrapped API client (eg.
+        Converter.search_YT), counting it against this adapter's in-flight limit.\n
+        Parameters:
+        - (function) func: blocking function
+        - (list) args, (dict) kwargs: arguments of func\n
+        Return:
+        - (any) return value of func
+        '''
+        loop = asyncio.get_running_loop()
+        # A semaphore can only be used on one event loop, so create a new one for each loop
+        if self.semaphore_loop is not loop:
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+            self.semaphore_loop = loop
+        async with self.semaphore:
+            # Run func in a copy of the task's context, so that its metrics are attributed to the task's playlist
+            return await loop.run_in_executor(self.executor,
+                functools.partial(contextvars.copy_context().run, func, *args, **kwargs))
+
+    def close(self) -> None:
+        '''
+        Shut down the adapter's threads once every pending call has finished.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        self.executor.shutdown(wait=True)
+        return
@@ -0,0 +1,146 @@
+import asyncio
+
+from ConverterClass import Converter
+from TrackInfoClass import TrackInfo
+from AsyncClientAdapterClass import AsyncClientAdapter
+
+class AsyncConverter(Converter):
+    def __init__(self, *args, MAX_IN_FLIGHT=AsyncClientAdapter.DEFAULT_MAX_IN_FLIGHT, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.async_ytm = AsyncClientAdapter(self.ytm_client, MAX_IN_FLIGHT)
+        self.async_sp = AsyncClientAdapter(self.sp_client, MAX_IN_FLIGHT)
+        pass
+
+    '''
+    Helper functions: Searching
+    '''
+    async def async_search_YT(self, query: str, limit: int = None, filter: str = None) -> list[dict]:
+        '''
+        Asynchronous version of Converter.search_YT (uses self.search_cache in the same way).\n
+        Parameters:
+        - (str) query: search query
+        - (int) limit: number of results to return (None to use ytm_client's default)
+        - (str) filter: ytm_client search filter (eg. "albums")\n
+        Return:
+        - (list[dict]) search results, exactly as returned by ytm_client.search
+        '''
+        return await self.async_ytm.run(self.search_YT, query, limit, filter)
+
+    async def async_search_SP(self, query: str, search_type: str = "track", limit: int = None) -> dict:
+        '''
+        Asynchronous version of Converter.search_SP (uses self.search_cache in the same way).\n
+        Parameters:
+        - (str) query: search query
+        - (str) search_type: sp_client search type (eg. "track" or "album")
+        - (int) limit: number of results to return (None to use sp_client's default)\n
+        Return:
+        - (dict) search results, exactly as returned by sp_client.search
+        '''
+        return await self.async_sp.run(self.search_SP, query, search_type, limit)
+
+    '''
+    Helper functions: Song matching
+    '''
+    async def async_find_best_match_ID(self, song_info: TrackInfo, async_multi_search_func) -> str:
+        '''
+        Asynchronous version of Converter.find_best_match_ID.\n
+        NOTE: songs that are being matched concurrently (eg. the same song on two playlists converted at
+        the same time) are both looked up; only matches that have finished are found in self.match_memo.\n
+        Parameters:
+        - (TrackInfo) song_info: record with song name, artist, album and duration, or None to skip the song
+        - (function) async_multi_search_func: async generator function yielding the search results of
+            the song one query at a time (eg. self.async_get_multiple_YT_search_results)\n
+        Return:
+        - (str) ID of search result with best holistic score (None if not found or skipped)
+        '''
+        if not song_info:
+            return None
+        if self.match_memo:
+            memoized, memo_match_ID = self.match_memo.get(song_info)
+            if memoized:
+                return memo_match_ID
+        with self.metrics.time("match"):
+            best_match_ID = await self.async_lookup_best_match_ID(song_info, async_multi_search_func)
+        if self.match_memo:
+            self.match_memo.put(song_info, best_match_ID)
+        return best_match_ID
+
+    async def async_lookup_best_match_ID(self, song_info: TrackInfo, async_multi_search_func) -> str:
+        '''
+        Asynchronous version of Converter.lookup_best_match_ID.\n
+        Parameters:
+        - (TrackInfo) song_info: record with song name, artist, album and duration
+        - (function) async_multi_search_func: async generator function yielding the search results of
+            the song one query at a time (eg. self.async_get_multiple_YT_search_results)\n
+        Return:
+        - (str) ID of search result with best holistic score (None if not found)
+        '''
+        stored_match_ID = self.get_stored_match_ID(song_info)
+        if stored_match_ID:
+            return stored_match_ID
+        # May send an "isrc:" query to Spotify
+        isrc_match_ID, isrc_score = await self.async_sp.run(self.get_ISRC_match_ID, song_info)
+        if isrc_match_ID:
+            self.store_match_ID(song_info, isrc_match_ID, isrc_score)
+            return isrc_match_ID
+        catalog_match_ID, catalog_score = self.get_catalog_match_ID(song_info)
+        if catalog_match_ID:
+            self.store_match_ID(song_info, catalog_match_ID, catalog_score)
+            return catalog_match_ID
+        best_match_ID = None
+        best_score = 0
+        sent = []
+        winner = None
+        list_all_search_res = async_multi_search_func(song_info)
+        try:
+            async for template, search_res in list_all_search_res:
+                self.record_search_results(search_res)
+                sent.append(template)
+                previous_score = best_score
+                best_match_ID, best_score = self.score_search_results(song_info, search_res, best_match_ID, best_score)
+                if best_score > previous_score:
+                    winner = (template, next(res.rank for res in search_res if res.id == best_match_ID))
+                if best_score >= self.confident_score:
+                    break
+        finally:
+            await list_all_search_res.aclose()
+        self.record_query_winner(sent, winner)
+        self.store_match_ID(song_info, best_match_ID, best_score)
+        return best_match_ID
+
+    async def async_get_best_match_IDs(self, songs_info: list, async_multi_search_func,
+                                       recorded_matches: dict = None) -> list:
+        '''
+        Asynchronous version of Converter.get_best_match_IDs. Every song is matched as a separate
+        coroutine; the number of requests in flight is bounded by self.async_ytm and self.async_sp.\n
+        Parameters:
+        - (list) songs_info: list of TrackInfo records, or None for songs that should not be matched
+        - (function) async_multi_search_func: async generator function yielding the search results of a song
+        - (dict) recorded_matches: {index: (source ID, match ID)} of songs matched by a previous run (eg. 
+            recorded in self.journal); songs still at the same position are not searched again\n
+        Return:
+        - (list) best match ID for each song in songs_info, in the same order (None if not found or not matched)
+        '''
+        recorded_matches = recorded_matches or {}
+        known_match_IDs = {index: recorded_matches[index][1] for index, song_info in enumerate(songs_info)
+            if song_info and index in recorded_matches and recorded_matches[index][0] == song_info.id}
+        best_match_IDs = await asyncio.gather(*[self.async_find_best_match_ID(song_info, async_multi_search_func)
+            for index, song_info in enumerate(songs_info) if index not in known_match_IDs])
+        best_match_IDs.reverse()
+        return [known_match_IDs[index] if index in known_match_IDs else best_match_IDs.pop()
+            for index in range(len(songs_info))]
+
+    '''
+    Helper functions: Utils
+    '''
+    def close(self) -> None:
+        '''
+        Shut down the threads of both client adapters.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        self.async_ytm.close()
+        self.async_sp.close()
+        return
@@ -0,0 +1,81 @@
+import asyncio
+
+from AsyncConverterClass import AsyncConverter
+from SpotifyConverterClass import SpotifyConverter
+from TrackInfoClass import TrackInfo
+from MatchMemoClass import MatchMemo
+
+class AsyncSpotifyConverter(AsyncConverter, SpotifyConverter):
+
+    '''
+    Convert all Spotify playlists, liked songs, and liked albums to YouTube Music
+    '''
+    async def async_convert_SP_to_YT_library(self) -> None:
+        '''
+        Asynchronous version of SpotifyConverter.convert_SP_to_YT_library. Liked songs and all
+        playlists are converted concurrently, then liked albums are converted.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        shared_memo = self.match_memo
+        self.match_memo = shared_memo or MatchMemo()
+        sp_playlists = (await self.async_sp.call("current_user_playlists"))["items"]
+        await asyncio.gather(
+            self.async_convert_SP_to_YT_playlist("LIKED_SONGS"),
+            *[self.async_convert_SP_to_YT_playlist(sp_playlist["id"]) for sp_playlist in sp_playlists])
+        await self.async_ytm.run(self.convert_SP_to_YT_liked_albums)
+        self.print_not_added_songs()
+        self.print_not_added_albums()
+        self.print_run_stats()
+        self.match_memo = shared_memo
+        return
+
+    '''
+    Convert single Spotify playlist or liked songs to YouTube Music
+    '''
+    async def async_convert_SP_to_YT_playlist(self, sp_playlist_ID: str) -> str:
+        '''
+        Asynchronous version of SpotifyConverter.convert_SP_to_YT_playlist. All songs of the
+        playlist are matched concurrently.\n
+        Parameters:
+        - (str) sp_playlist_ID: playlist ID of source Spotify playlist\n
+        Return:
+        - (str) playlist ID for newly created YouTube Music playlist
+        '''
+        progress = self.get_journal_progress(sp_playlist_ID)
+        if progress and progress["done"]:
+            return self.skip_finished_playlist(progress)
+        sp_playlist_name = await self.async_sp.run(self.get_SP_playlist_name, sp_playlist_ID)
+        self.print(f"\nSpotify playlist detected: '{sp_playlist_name}'")
+        with self.metrics.playlist(sp_playlist_name):
+            sp_tracks = await self.async_sp.run(self.get_all_SP_tracks, sp_playlist_ID)
+            self.print("Copying contents into Youtube playlist...")
+            songs_info = [self.get_SP_song_info(sp_track["track"]) if sp_track["track"] else None
+                for sp_track in sp_tracks]
+            del sp_tracks
+            best_match_IDs = await self.async_get_best_match_IDs(songs_info, self.async_get_multiple_YT_search_results,
+                progress["matches"] if progress else None)
+            yt_playlist_ID = await self.async_ytm.run(self.add_matches_to_YT_playlist,
+                sp_playlist_ID, sp_playlist_name, songs_info, best_match_IDs)
+        return yt_playlist_ID
+
+    async def async_get_multiple_YT_search_results(self, song_info: TrackInfo):
+        '''
+        Asynchronous version of SpotifyConverter.get_multiple_YT_search_results. The first query
+        is searched on its own; if more results are requested (ie. it did not return a confident match),
+        the remaining queries are searched concurrently.\n
+        Parameters:
+        - (TrackInfo) song_info: record with info about the target Spotify song\n
+        Return:
+        - (async generator) (template name, list of TrackInfo records) pairs (one per query, in planned order)
+        '''
+        queries, limit = self.plan_queries(self.get_YT_search_queries(song_info))
+        request_limit = self.get_request_limit(limit)
+        template, query = queries[0]
+        yield template, self.process_YT_search_results(await self.async_search_YT(query, limit=request_limit), limit)
+        all_yt_search_raw = await asyncio.gather(*[self.async_search_YT(query, limit=request_limit)
+            for _, query in queries[1:]])
+        for (template, _), single_search_raw in zip(queries[1:], all_yt_search_raw):
+            yield template, self.process_YT_search_results(single_search_raw, limit)
@@ -0,0 +1,80 @@
+import asyncio
+
+from AsyncConverterClass import AsyncConverter
+from YouTubeConverterClass import YouTubeMusicConverter
+from TrackInfoClass import TrackInfo
+from MatchMemoClass import MatchMemo
+
+class AsyncYouTubeMusicConverter(AsyncConverter, YouTubeMusicConverter):
+    '''
+    Convert all YouTube Music playlists and liked albums to Spotify
+    '''
+    async def async_convert_YT_to_SP_library(self) -> None:
+        '''
+        Asynchronous version of YouTubeMusicConverter.convert_YT_to_SP_library. All playlists
+        are converted concurrently, then liked albums are converted and videos are downloaded.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        shared_memo = self.match_memo
+        self.match_memo = shared_memo or MatchMemo()
+        # NOTE: See YouTubeMusicConverter.convert_YT_to_SP_library for why the 0th playlist is skipped.
+        yt_playlists_no_liked_vids = (await self.async_ytm.call("get_library_playlists", limit=None))[1:]
+        await asyncio.gather(*[self.async_convert_YT_to_SP_playlist(yt_playlist["playlistId"])
+            for yt_playlist in yt_playlists_no_liked_vids])
+        await self.async_sp.run(self.convert_YT_to_SP_liked_albums)
+        self.print_not_added_songs()
+        self.print_not_added_albums()
+        self.print_run_stats()
+        self.match_memo = shared_memo
+        await self.async_ytm.run(self.download_YT_videos)
+        return
+
+    '''
+    Convert single YouTube Music playlist to Spotify
+    '''
+    async def async_convert_YT_to_SP_playlist(self, yt_playlist_ID: str) -> str:
+        '''
+        Asynchronous version of YouTubeMusicConverter.convert_YT_to_SP_playlist. All songs of the
+        playlist are matched concurrently.\n
+        Parameters:
+        - (str) yt_playlist_ID: playlist ID for source YouTube Music playlist\n
+        Return:
+        - (str) playlist ID for newly created Spotify playlist
+        '''
+        progress = self.get_journal_progress(yt_playlist_ID)
+        if progress and progress["done"]:
+            return self.skip_finished_playlist(progress)
+        yt_playlist_name, yt_tracks = await self.async_ytm.run(self.get_YT_playlist, yt_playlist_ID)
+        self.print(f"\nYouTube Music playlist detected: '{yt_playlist_name}'")
+        self.print("Copying contents into Spotify playlist...")
+        with self.metrics.playlist(yt_playlist_name):
+            songs_info = [self.get_YT_song_info(yt_song) if yt_song else None for yt_song in yt_tracks]
+            del yt_tracks
+            best_match_IDs = await self.async_get_best_match_IDs(self.get_YT_songs_to_match(songs_info),
+                self.async_get_multiple_SP_search_results, progress["matches"] if progress else None)
+            sp_playlist_ID = await self.async_sp.run(self.add_matches_to_SP_playlist,
+                yt_playlist_ID, yt_playlist_name, songs_info, best_match_IDs)
+        return sp_playlist_ID
+
+    async def async_get_multiple_SP_search_results(self, song_info: TrackInfo):
+        '''
+        Asynchronous version of YouTubeMusicConverter.get_multiple_SP_search_results. The first query
+        is searched on its own; if more results are requested (ie. it did not return a confident match),
+        the remaining queries are searched concurrently.\n
+        Parameters:
+        - (TrackInfo) song_info: record with info about the target YouTube Music song\n
+        Return:
+        - (async generator) (template name, list of TrackInfo records) pairs (one per query, in planned order)
+        '''
+        queries, limit = self.plan_queries(self.get_SP_search_queries(song_info))
+        request_limit = self.get_request_limit(limit)
+        template, query = queries[0]
+        yield template, self.process_SP_search_results(
+            await self.async_search_SP(query, "track", limit=request_limit), limit)
+        all_sp_search_raw = await asyncio.gather(*[self.async_search_SP(query, "track", limit=request_limit)
+            for _, query in queries[1:]])
+        for (template, _), single_search_raw in zip(queries[1:], all_sp_search_raw):
+            yield template, self.process_SP_search_results(single_search_raw, limit)
@@ -0,0 +1,227 @@
+import json
+import time
+import logging
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from JournalClass import Journal
+from MetricsClass import Metrics
+from ReporterClass import Reporter
+
+class BatchRunner():
+    ''' JOB_OPTIONS: options of a manifest job and their defaults (overridden by the top level of the manifest,
+        then by each job) '''
+    JOB_OPTIONS = {"keep_dupes": False, "downloads": False}
+
+    ''' LIBRARY_SOURCES: sources of the libraries that a manifest job can convert '''
+    LIBRARY_SOURCES = ("Spotify", "YouTube Music")
+
+    ''' JOURNAL_PATH: journal of each library job ({index} = position of the job in the manifest), so that library
+        jobs running at the same time do not share a journal '''
+    JOURNAL_PATH = "conversion_journal_{index}.jsonl"
+
+    def __init__(self, YTM_CLIENT, SP_CLIENT, CONVERTER_OPTIONS: dict = None, WORKERS: int = 1,
+                 RESUME: bool = False) -> None:
+        '''
+        Converts the playlists and libraries listed in a manifest without prompting, WORKERS jobs at a time.
+        Every job has its own converter, but all of them share the API clients (and their rate limiters),
+        the converter options (eg. search cache, match store, metrics and reporter), and one run memo per
+        direction (see MatchMemo), so a song found on several playlists of the manifest is matched once.\n
+        Parameters:
+        - (YTMusic) YTM_CLIENT: YouTube Music API client
+        - (spotipy.Spotify) SP_CLIENT: Spotify API client
+        - (dict) CONVERTER_OPTIONS: keyword arguments of every converter (see Converter.__init__)
+        - (int) WORKERS: number of jobs converted at the same time
+        - (bool) RESUME: whether library jobs continue the conversion recorded in their journal (see JOURNAL_PATH)
+        '''
+        self.ytm_client = YTM_CLIENT
+        self.sp_client = SP_CLIENT
+        self.converter_options = CONVERTER_OPTIONS or {}
+        self.workers = WORKERS
+        self.resume = RESUME
+        self.metrics = self.converter_options.get("METRICS") or Metrics()
+        self.converter_options["METRICS"] = self.metrics
+        self.reporter = self.converter_options.get("REPORTER")
+        self.match_memos = {}
+        pass
+
+    '''
+    Manifest
+    '''
+    def load_manifest(self, path: str) -> list[dict]:
+        '''
+        Given a manifest file, return its jobs. A manifest is a JSON list of jobs, or a JSON object with a
+        "jobs" list and default JOB_OPTIONS. A job is a playlist URL, or an object with either a playlist
+        "url" or the source of a "library" ("Spotify" or "YouTube Music") and any JOB_OPTIONS, eg.\n
+        {"keep_dupes": false, "jobs": ["https://open.spotify.com/playlist/...",
+            {"url": "https://music.youtube.com/playlist?list=...", "downloads": true}, {"library": "Spotify"}]}\n
+        Parameters:
+        - (str) path: path of the manifest file\n
+        Return:
+        - (list[dict]) jobs with their "index", "source", "playlist_ID" (None for library jobs), "url" or
+            "library", and every option in JOB_OPTIONS
+        '''
+        with open(path, encoding="utf-8") as file:
+            manifest = json.load(file)
+        if isinstance(manifest, list):
+            manifest = {"jobs": manifest}
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs", []), list):
+            raise ValueError(f"{path} is not a list of jobs or an object with a \"jobs\" list")
+        defaults = dict(self.JOB_OPTIONS)
+        defaults.update({option: manifest[option] for option in self.JOB_OPTIONS if option in manifest})
+        jobs = []
+        for index, entry in enumerate(manifest.get("jobs", [])):
+            if not isinstance(entry, (str, dict)):
+                raise ValueError(f"Job {index + 1} of {path} is not a playlist URL or an object: {entry!r}")
+            entry = {"url": entry} if isinstance(entry, str) else dict(entry)
+            unknown = set(entry) - set(self.JOB_OPTIONS) - {"url", "library"}
+            if unknown:
+                raise ValueError(f"Job {index + 1} of {path} has unknown keys: {', '.join(sorted(unknown))}")
+            job = dict(defaults, index=index)
+            job.update(entry)
+            if "url" in job:
+                job["source"], job["playlist_ID"] = self.get_playlist_source(job["url"])
+                if not job["source"]:
+                    raise ValueError(f"Job {index + 1} of {path} is not a Spotify or YouTube Music playlist URL: "
+                        + job["url"])
+            elif job.get("library") in self.LIBRARY_SOURCES:
+                job["source"], job["playlist_ID"] = job["library"], None
+            else:
+                raise ValueError(f"Job {index + 1} of {path} needs a playlist \"url\" or a \"library\" "
+                    + f"({' or '.join(self.LIBRARY_SOURCES)})")
+            jobs.append(job)
+        return jobs
+
+    def get_playlist_source(self, url: str) -> tuple[str, str]:
+        '''
+        Given a playlist URL, return its platform and playlist ID.\n
+        Parameters:
+        - (str) url: URL of a Spotify or YouTube Music playlist\n
+        Return:
+        - (tuple[str, str]) "Spotify" or "YouTube Music" and the playlist ID (None, None if the URL is not a playlist)
+        '''
+        parsed_URL = urllib.parse.urlparse(url)
+        if parsed_URL.netloc == "open.spotify.com" and parsed_URL.path[:10] == "/playlist/":
+            return "Spotify", parsed_URL.path[10:]
+        if parsed_URL.netloc == "music.youtube.com" and parsed_URL.path == "/playlist":
+            playlist_IDs = urllib.parse.parse_qs(parsed_URL.query).get("list")
+            if playlist_IDs:
+                return "YouTube Music", playlist_IDs[0]
+        return None, None
+
+    '''
+    Running jobs
+    '''
+    def run(self, jobs: list[dict]) -> dict:
+        '''
+        Convert every job, self.workers at a time. A job that fails does not stop the others.\n
+        Parameters:
+        - (list[dict]) jobs: jobs of a manifest (see load_manifest)\n
+        Return:
+        - (dict) summary with the "elapsed" seconds, number of jobs "done" and "failed", the result of each job
+            in "jobs" (see run_job) and the "report" of the run (see Reporter.get_report)
+        '''
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.run_job, jobs))
+        run_stats = self.get_run_stats()
+        if self.reporter:
+            report = self.reporter.finish(self.metrics, run_stats)
+        else:
+            report = Reporter().get_report(self.metrics.get_summary(), run_stats)
+        return {
+            "elapsed": time.perf_counter() - start,
+            "done": sum(result["status"] == "done" for result in results),
+            "failed": sum(result["status"] == "failed" for result in results),
+            "jobs": results,
+            "report": report,
+        }
+
+    def run_job(self, job: dict) -> dict:
+        '''
+        Convert one playlist or library.\n
+        Parameters:
+        - (dict) job: job of a manifest (see load_manifest)\n
+        Return:
+        - (dict) result with the job "index", "source", "url" or "library", "status" ("done" or "failed"),
+            "destination" playlist ID (None for libraries), "error" (None unless failed), "seconds",
+            "not_added_songs" and "not_added_albums" (see Converter.NOT_ADDED_SONGS) and "writes"
+            (see Converter.write_stats)
+        '''
+        result = {"index": job["index"], "source": job["source"], "status": "done", "destination": None,
+            "error": None}
+        result.update({key: job[key] for key in ("url", "library") if key in job})
+        start = time.perf_counter()
+        converter = None
+        try:
+            converter_class = self.get_converter_class(job["source"])
+            if job["playlist_ID"]:
+                converter = converter_class(self.ytm_client, self.sp_client, job["keep_dupes"], job["downloads"],
+                    **self.converter_options)
+                converter.match_memo = self.match_memos[converter_class]
+                if job["source"] == "Spotify":
+                    result["destination"] = converter.convert_SP_to_YT_playlist(job["playlist_ID"])
+                else:
+                    result["destination"] = converter.convert_YT_to_SP_playlist(job["playlist_ID"])
+                    converter.download_YT_videos()
+            else:
+                journal = Journal(self.JOURNAL_PATH.format(index=job["index"]), resume=self.resume)
+                converter = converter_class(self.ytm_client, self.sp_client, job["keep_dupes"], job["downloads"],
+                    JOURNAL=journal, **self.converter_options)
+                converter.match_memo = self.match_memos[converter_class]
+                try:
+                    if job["source"] == "Spotify":
+                        converter.convert_SP_to_YT_library()
+                    else:
+                        converter.convert_YT_to_SP_library()
+                finally:
+                    journal.close()
+        except Exception as exception:
+            logging.exception(f"Job {job['index'] + 1} failed")
+            result["status"] = "failed"
+            result["error"] = repr(exception)
+        result["seconds"] = time.perf_counter() - start
+        result["not_added_songs"] = converter.NOT_ADDED_SONGS if converter else {}
+        result["not_added_albums"] = converter.NOT_ADDED_ALBUMS if converter else []
+        result["writes"] = converter.write_stats if converter else {}
+        return result
+
+    def get_converter_class(self, source: str) -> type:
+        '''
+        Given the source of a job, return the converter class that converts from it (and create its run memo).\n
+        Parameters:
+        - (str) source: "Spotify" or "YouTube Music"\n
+        Return:
+        - (type) SpotifyConverter or YouTubeMusicConverter
+        '''
+        # Imported here so that the converters (and numpy) are only loaded once a job starts
+        from MatchMemoClass import MatchMemo
+        if source == "Spotify":
+            from SpotifyConverterClass import SpotifyConverter as converter_class
+        else:
+            from YouTubeConverterClass import YouTubeMusicConverter as converter_class
+        self.match_memos.setdefault(converter_class, MatchMemo())
+        return converter_class
+
+    def get_run_stats(self) -> dict:
+        '''
+        Return the stats of what is shared by every job: run memos, local stores and rate limiters.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with the stats of the run memo of each direction, search cache, match store, catalog
+            index, query planner and rate limiters (None for the stores that are not used)
+        '''
+        rate_limits = {}
+        for client in (self.sp_client, self.ytm_client):
+            rate_limiter = getattr(client, "rate_limiter", None)
+            if rate_limiter:
+                rate_limits[rate_limiter.name] = rate_limiter.get_stats()
+        stats = {"match_memos": {f"{converter_class.SOURCE} to {converter_class.DESTINATION}": memo.get_stats()
+            for converter_class, memo in self.match_memos.items()}}
+        for option, name in (("SEARCH_CACHE", "search_cache"), ("MATCH_STORE", "match_store"),
+                             ("CATALOG_INDEX", "catalog_index"), ("QUERY_PLANNER", "query_planner")):
+            store = self.converter_options.get(option)
+            stats[name] = store.get_stats() if store else None
+        stats["rate_limits"] = rate_limits
+        return stats
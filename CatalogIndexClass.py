@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+from TrackInfoClass import TrackInfo
+
+class CatalogIndex():
+    ''' DEFAULT_PATH: file in which every search result seen so far is stored '''
+    DEFAULT_PATH = "catalog_index.sqlite"
+
+    ''' NGRAM_SIZE: length of the character n-grams of titles that are indexed (catches small differences
+        in spelling or punctuation that whole-word tokens miss) '''
+    NGRAM_SIZE = 3
+
+    ''' MAX_CANDIDATES: max number of catalog entries scored for one song '''
+    MAX_CANDIDATES = 20
+
+    ''' MAX_POSTINGS: tokens found in more catalog entries than this (eg. "the", "love") are too common
+        to narrow down the candidates and are skipped during lookups '''
+    MAX_POSTINGS = 500
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        '''
+        Local catalog of every Spotify and YouTube Music search result seen so far, with an inverted
+        index from title/artist tokens and title n-grams to entries. Entries are stored on disk and
+        the index is rebuilt in memory when the catalog is opened.
+        '''
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.entries = {}
+        self.postings = {}
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS catalog (
+                platform TEXT NOT NULL,
+                id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                album TEXT,
+                duration REAL NOT NULL,
+                result_type TEXT,
+                video_type TEXT,
+                seen REAL NOT NULL,
+                PRIMARY KEY (platform, id))''')
+        self.conn.commit()
+        for platform, ID, title, artist, album, duration, result_type, video_type in self.conn.execute(
+                "SELECT platform, id, title, artist, album, duration, result_type, video_type FROM catalog"):
+            self.index(platform, TrackInfo(title, artist, album, duration, ID, result_type, False, video_type))
+        pass
+
+    def add(self, platform: str, tracks: list[TrackInfo]) -> None:
+        '''
+        Given the search results of a query, add the results that are not in the catalog yet.\n
+        Parameters:
+        - (str) platform: platform of the search results (eg. Converter.YT_SOURCE)
+        - (list[TrackInfo]) tracks: TrackInfo records of the search results\n
+        Return:
+        - None
+        '''
+        now = time.time()
+        with self.lock:
+            new_tracks = [track for track in tracks if track.id and (platform, track.id) not in self.entries]
+            if not new_tracks:
+                return
+            for track in new_tracks:
+                # Whether a result was the top result only applies to the query it was returned for
+                self.index(platform, TrackInfo(track.title, track.artist, track.album, track.duration_seconds,
+                    track.id, track.result_type, False, track.video_type))
+            self.conn.executemany(
+                '''INSERT OR REPLACE INTO catalog
+                (platform, id, title, artist, album, duration, result_type, video_type, seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(platform, track.id, track.title, track.artist, track.album, track.duration_seconds,
+                    track.result_type, track.video_type, now) for track in new_tracks])
+            self.conn.commit()
+        return
+
+    def index(self, platform: str, track: TrackInfo) -> None:
+        '''
+        Add a catalog entry to the in-memory inverted index (the caller holds self.lock).\n
+        Parameters:
+        - (str) platform: platform of the entry
+        - (TrackInfo) track: catalog entry\n
+        Return:
+        - None
+        '''
+        self.entries[(platform, track.id)] = track
+        for token in self.get_tokens(track):
+            self.postings.setdefault((platform, token), set()).add(track.id)
+        return
+
+    def get_candidates(self, platform: str, song_info: TrackInfo) -> list[TrackInfo]:
+        '''
+        Given a song, return the catalog entries of a platform that share the most tokens with it.\n
+        Parameters:
+        - (str) platform: platform of the entries to look up (ie. the platform the song is matched on)
+        - (TrackInfo) song_info: record of the song to match\n
+        Return:
+        - (list[TrackInfo]) up to self.MAX_CANDIDATES entries, most shared tokens first
+        '''
+        overlaps = Counter()
+        with self.lock:
+            postings = [self.postings[(platform, token)] for token in self.get_tokens(song_info)
+                if (platform, token) in self.postings]
+            for IDs in postings:
+                if len(IDs) <= self.MAX_POSTINGS:
+                    overlaps.update(IDs)
+            if not overlaps and postings:
+                # Every token of the song is common, so fall back to the least common one
+                overlaps.update(min(postings, key=len))
+            ranked_IDs = sorted(overlaps, key=lambda ID: (-overlaps[ID], ID))[:self.MAX_CANDIDATES]
+            return [self.entries[(platform, ID)] for ID in ranked_IDs]
+
+    def match(self, platform: str, song_info: TrackInfo, score_func, min_score: float) -> tuple[str, float]:
+        '''
+        Given a song, score the catalog entries most similar to it and return the best one if it
+        scores at least min_score (ie. it would have been accepted as a confident search result).\n
+        Parameters:
+        - (str) platform: platform the song is matched on
+        - (TrackInfo) song_info: record of the song to match
+        - (function) score_func: function returning the score of each of a list of candidates
+        - (float) min_score: score at which the best entry is accepted\n
+        Return:
+        - (tuple[str, float]) ID and score of the best entry (ID is None if it scored below min_score)
+        '''
+        candidates = self.get_candidates(platform, song_info)
+        best_match_ID, best_score = None, float("-inf")
+        if candidates:
+            scores = score_func(candidates)
+            best_index = max(range(len(candidates)), key=lambda index: scores[index])
+            best_match_ID, best_score = candidates[best_index].id, float(scores[best_index])
+        with self.lock:
+            if best_score >= min_score:
+                self.hits += 1
+                return best_match_ID, best_score
+            self.misses += 1
+        return None, best_score
+
+    def get_tokens(self, track: TrackInfo) -> set[str]:
+        '''
+        Given a song, return the tokens under which it is indexed: the words of its normalized title
+        and artist, and the character n-grams of its normalized title.\n
+        Parameters:
+        - (TrackInfo) track: record of a song\n
+        Return:
+        - (set[str]) tokens
+        '''
+        tokens = set(track.title_normalized.split())
+        tokens.update(track.artist_normalized.split())
+        title = f" {track.title_normalized} "
+        tokens.update("#" + title[start:start + self.NGRAM_SIZE]
+            for start in range(len(title) - self.NGRAM_SIZE + 1))
+        return tokens
+
+    def get_stats(self) -> dict:
+        '''
+        Return the hit/miss counters of this catalog.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of hits, misses, entries and hit rate
+        '''
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        '''
+        Close the connection to the catalog file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.conn.close()
+        return
@@ -1,7 +1,17 @@
 import math
 import logging
+import functools
+import operator
+import threading
+import contextvars
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from termcolor import colored
+from PlaylistWriterClass import PlaylistWriter
+from MetricsClass import Metrics
+from TrackInfoClass import TrackInfo
 
 class Converter():
     ''' SP_SOURCE: string constant for the word "Spotify" '''
@@ -38,82 +48,225 @@ class Converter():
             that were not added because they were duplicates
         - "downloads" -> (list) list of dicts (keys = queries : values = source (YT) IDs) 
             that were not added because they were not song type objects
+        NOTE: Each converter starts with its own empty copy (see __init__), so that converters running at
+            the same time (eg. batch jobs) do not report each other's songs.
     '''
     NOT_ADDED_SONGS = {}
 
-    ''' NOT_ADDED_ALBUMS: list of album names that were not added because they could not be found'''
+    ''' NOT_ADDED_ALBUMS: list of album names that were not added because they could not be found (one list
+        per converter, like NOT_ADDED_SONGS) '''
     NOT_ADDED_ALBUMS = []
 
-    ''' YTDL_OPTIONS: dict of options for youtube_dl download'''
+    ''' YTDL_OPTIONS: dict of options for youtube_dl download (shared by every download and never modified; 
+        the conversion to MP3 is done separately, see Downloader) '''
     YTDL_OPTIONS = {
         'format': 'bestaudio/best',
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }],
+        'quiet': True,
     }
+
+    ''' DOWNLOAD_DIRECTORY: directory in which a folder of downloaded MP3 files is created for each playlist '''
+    DOWNLOAD_DIRECTORY = "downloads"
     
-    def __init__(self, YTM_CLIENT, SP_CLIENT, KEEP_DUPES, DOWNLOADS=False) -> None:
+    ''' SOURCE: platform from which songs are converted (set by each subclass to SP_SOURCE or YT_SOURCE) '''
+    SOURCE = None
+
+    ''' DESTINATION: platform to which songs are converted (set by each subclass to YT_SOURCE or SP_SOURCE) '''
+    DESTINATION = None
+
+    ''' SP_BATCH_SIZE: max number of tracks added to a Spotify playlist per request (limit of the Spotify API) '''
+    SP_BATCH_SIZE = 100
+
+    ''' YT_BATCH_SIZE: number of videos added to a YouTube Music playlist per request '''
+    YT_BATCH_SIZE = 100
+
+    ''' SP_ALBUM_BATCH_SIZE: max number of albums saved to the Spotify library per request (limit of the Spotify API) '''
+    SP_ALBUM_BATCH_SIZE = 20
+
+    ''' CONFIDENT_SCORE: score at which a search result is accepted as the best match without requesting 
+        the results of the remaining queries (set by each subclass; infinity to always run every query) '''
+    CONFIDENT_SCORE = float("inf")
+
+    ''' CONFIDENT_DURATION_DIFF: difference in song duration (in seconds) allowed by CONFIDENT_SCORE '''
+    CONFIDENT_DURATION_DIFF = 2
+
+    ''' MATCH_WINDOW_FACTOR: number of songs (or albums) per worker that may be matched ahead of the one 
+        currently being added when matching concurrently (bounds the number of pending matches) '''
+    MATCH_WINDOW_FACTOR = 4
+
+    ''' PAGE_WORKERS: max number of pages of a paginated Spotify list (playlist, saved tracks or saved albums) 
+        requested at once (1 to follow the "next" link of each page one at a time) '''
+    PAGE_WORKERS = 8
+
+    def __init__(self, YTM_CLIENT, SP_CLIENT, KEEP_DUPES, DOWNLOADS=False, SEARCH_CACHE=None,
+                 MATCH_STORE=None, MAX_WORKERS=1, CONFIDENT_SCORE=None, JOURNAL=None, PAGE_WORKERS=None,
+                 CATALOG_INDEX=None, DOWNLOADER=None, METRICS=None, REPORTER=None, QUERY_PLANNER=None) -> None:
         self.ytm_client = YTM_CLIENT
         self.sp_client = SP_CLIENT
         self.keep_dupes = KEEP_DUPES
         self.download_videos = DOWNLOADS
+        self.downloader = DOWNLOADER
+        self.metrics = METRICS if METRICS is not None else Metrics()
+        self.reporter = REPORTER
+        self.search_cache = SEARCH_CACHE
+        self.match_store = MATCH_STORE
+        self.max_workers = MAX_WORKERS
+        self.confident_score = CONFIDENT_SCORE if CONFIDENT_SCORE is not None else self.CONFIDENT_SCORE
+        self.journal = JOURNAL
+        self.page_workers = PAGE_WORKERS if PAGE_WORKERS is not None else self.PAGE_WORKERS
+        self.catalog_index = CATALOG_INDEX
+        self.query_planner = QUERY_PLANNER
+        self.isrc_stats = {"local": 0, "query": 0, "misses": 0, "unknown": 0}
+        self.match_memo = None
+        self.NOT_ADDED_SONGS = {}
+        self.NOT_ADDED_ALBUMS = []
+        self.write_stats = {}
+        self.stats_lock = threading.Lock()
         pass
 
     '''
     Helper functions: Get song info
     '''
-    def get_SP_song_info(self, song: dict) -> dict:
+    def get_SP_song_info(self, song: dict, rank: int = None) -> TrackInfo:
         '''
-        Given a Spotify song, summarize important song information into a dictionary\n
+        Given a Spotify song, summarize important song information into a TrackInfo record\n
         Parameters:
-        - (dict) SONG: Spotify song\n
+        - (dict) SONG: Spotify song
+        - (int) rank: position of the song in the response of a search (None if not a search result)\n
         Return:
-        - (dict) dictionary with song name, artist, id, album, and duration
+        - (TrackInfo) record with song name, artist, id, album, duration, and ISRC
         '''
-        song_info = {}
-        song_info["title"] = song["name"]
-        song_info["artist"] = song["artists"][0]["name"]
-        song_info["id"] = song["id"]
-        song_info["album"] = song["album"]["name"]
-        song_info["duration_seconds"] = song["duration_ms"]/1000
-        return song_info
+        return TrackInfo(
+            title=song["name"],
+            artist=song["artists"][0]["name"],
+            album=song["album"]["name"],
+            duration_seconds=song["duration_ms"]/1000,
+            ID=song["id"],
+            isrc=song.get("external_ids", {}).get("isrc"),
+            rank=rank)
 
-    def get_YT_song_info(self, song: dict) -> dict: 
+    def get_YT_song_info(self, song: dict, rank: int = None) -> TrackInfo: 
         '''
-        Given a YouTube Music song, summarize important song information into a dictionary\n
+        Given a YouTube Music song, summarize important song information into a TrackInfo record\n
         Parameters:
-        - (dict) song: YouTube Music song dictionary\n
+        - (dict) song: YouTube Music song dictionary
+        - (int) rank: position of the song in the response of a search (None if not a search result)\n
         Return:
-        - (dict) dictionary with song name, artist, id, album, and duration
+        - (TrackInfo) record with song name, artist, id, album, duration, and result type
         '''
-        song_info = {}
-        song_info["title"] = song["title"]
-        song_info["artist"] = song["artists"][0]["name"]
-        song_info["id"] = song["videoId"]
         if "album" in song and song["album"] != None:
-            song_info["album"] = song["album"]["name"]
+            album = song["album"]["name"]
         else:
-            song_info["album"] = None
-        song_duration_raw = song["duration"]
-        song_info["duration_seconds"] = self.get_sec_from_raw_duration(song_duration_raw)
-        if "resultType" in song:
-            song_info["type"] = song["resultType"]
-        if "category" in song:
-            song_info["top_result"] = (song["category"] == "Top result")
-        return song_info
+            album = None
+        return TrackInfo(
+            title=song["title"],
+            artist=song["artists"][0]["name"],
+            album=album,
+            duration_seconds=self.get_sec_from_raw_duration(song["duration"]),
+            ID=song["videoId"],
+            result_type=song.get("resultType"),
+            top_result=(song.get("category") == "Top result"),
+            video_type=song.get("videoType"),
+            rank=rank)
+
+    '''
+    Helper functions: Searching
+    '''
+    def search_YT(self, query: str, limit: int = None, filter: str = None) -> list[dict]:
+        '''
+        Perform a YouTube Music search, using self.search_cache (if any) to avoid repeating
+        searches that have already been made.\n
+        Parameters:
+        - (str) query: search query
+        - (int) limit: number of results to return (None to use ytm_client's default)
+        - (str) filter: ytm_client search filter (eg. "albums")\n
+        Return:
+        - (list[dict]) search results, exactly as returned by ytm_client.search
+        '''
+        search_kwargs = {"query": query}
+        if limit is not None:
+            search_kwargs["limit"] = limit
+        if filter is not None:
+            search_kwargs["filter"] = filter
+        with self.metrics.time("search"):
+            if self.search_cache:
+                return self.search_cache.search(self.YT_SOURCE, self.ytm_client.search,
+                    search_kwargs, query, limit, filter)
+            return self.ytm_client.search(**search_kwargs)
+
+    def search_SP(self, query: str, search_type: str = "track", limit: int = None) -> dict:
+        '''
+        Perform a Spotify search, using self.search_cache (if any) to avoid repeating
+        searches that have already been made.\n
+        Parameters:
+        - (str) query: search query
+        - (str) search_type: sp_client search type (eg. "track" or "album")
+        - (int) limit: number of results to return (None to use sp_client's default)\n
+        Return:
+        - (dict) search results, exactly as returned by sp_client.search
+        '''
+        search_kwargs = {"q": query, "type": search_type}
+        if limit is not None:
+            search_kwargs["limit"] = limit
+        with self.metrics.time("search"):
+            if self.search_cache:
+                return self.search_cache.search(self.SP_SOURCE, self.sp_client.search,
+                    search_kwargs, query, limit, search_type)
+            return self.sp_client.search(**search_kwargs)
+
+    def get_YT_album(self, browse_ID: str) -> dict:
+        '''
+        Get a YouTube Music album, using self.search_cache (if any) to avoid requesting the same
+        album again.\n
+        Parameters:
+        - (str) browse_ID: browseId of the album\n
+        Return:
+        - (dict) album, exactly as returned by ytm_client.get_album
+        '''
+        with self.metrics.time("search"):
+            if self.search_cache:
+                return self.search_cache.search(self.YT_SOURCE, self.ytm_client.get_album,
+                    {"browseId": browse_ID}, browse_ID, filter="album_info", normalize=False)
+            return self.ytm_client.get_album(browse_ID)
 
     '''
     Helper functions: Song matching
     '''
-    def find_best_match_ID(self, song_info: dict, multi_search_func) -> str:
+    def find_best_match_ID(self, song_info: TrackInfo, multi_search_func) -> str:
+        '''
+        Given a target song to match, return the ID of its best match (see lookup_best_match_ID). If the
+        song was already matched earlier in this run (ie. it is in self.match_memo), its match is
+        returned without looking it up again.\n
+        Parameters:
+        - (TrackInfo) song_info: record with song name, artist, album and duration
+        - (function) multi_search_func: function to get all search results for the song in song_info
+            (see lookup_best_match_ID)\n
+        Return:
+        - (str) ID of search result with best holistic score (ie. best match to the song in song_info)
+        '''
+        if self.match_memo:
+            memoized, memo_match_ID = self.match_memo.get(song_info)
+            if memoized:
+                return memo_match_ID
+        with self.metrics.time("match"):
+            best_match_ID = self.lookup_best_match_ID(song_info, multi_search_func)
+        if self.match_memo:
+            self.match_memo.put(song_info, best_match_ID)
+        return best_match_ID
+
+    def lookup_best_match_ID(self, song_info: TrackInfo, multi_search_func) -> str:
         '''
         Given a list of search results and a target song to match, holistically score each 
-        search result and then return the result with the highest score (ie. the best match).\n
+        search result and then return the result with the highest score (ie. the best match).
+        If self.match_store already holds a match for the song, return it without searching; otherwise, if
+        the song's ISRC resolves to a song on the destination platform (see get_ISRC_match_ID) or 
+        self.catalog_index holds a result that would be accepted as a confident match, return it without
+        running the text queries.\n
         Parameters:
-        - (dict) SONG_INFO: dictionary with song name, artist, album and duration\n
+        - (TrackInfo) SONG_INFO: record with song name, artist, album and duration\n
         - (function) MULTI_SEARCH_FUNC: function to get all search results for the song in song_info
+            (a generator yielding the results of one query at a time, so that the remaining queries are
+            skipped once a confident match is found)
+            - NOTE: MULTI_SEARCH_FUNC yields (template name, search results) pairs (see plan_queries)
             - NOTE: MULTI_SEARCH_FUNC is our own defined function to perform searches using multiple
                 search queries (eg. self.get_multiple_YT_search_results or 
                 self.get_multiple_SP_search_results). It is NOT the native search function built-in to 
@@ -122,21 +275,322 @@ class Converter():
         Return:
         - (str) ID of search result with best holistic score (ie. best match to the song in song_info)
         '''
+        stored_match_ID = self.get_stored_match_ID(song_info)
+        if stored_match_ID:
+            return stored_match_ID
+        isrc_match_ID, isrc_score = self.get_ISRC_match_ID(song_info)
+        if isrc_match_ID:
+            self.store_match_ID(song_info, isrc_match_ID, isrc_score)
+            return isrc_match_ID
+        catalog_match_ID, catalog_score = self.get_catalog_match_ID(song_info)
+        if catalog_match_ID:
+            self.store_match_ID(song_info, catalog_match_ID, catalog_score)
+            return catalog_match_ID
+        list_all_search_res = multi_search_func(song_info)
+        best_match_ID, best_score = self.get_best_search_result(song_info, list_all_search_res)
+        self.store_match_ID(song_info, best_match_ID, best_score)
+        return best_match_ID    
+
+    def get_best_search_result(self, song_info: TrackInfo, list_all_search_res) -> tuple[str, float]:
+        '''
+        Given a target song and the search results of its queries, holistically score each search 
+        result and return the ID and score of the result with the highest score. Stops requesting
+        the results of further queries as soon as a result scores at least self.confident_score.
+        Which query produced the best result is recorded in self.query_planner (if any).\n
+        Parameters:
+        - (TrackInfo) song_info: record with song name, artist, album and duration
+        - (iterable) list_all_search_res: list (or generator) of (template name, list of TrackInfo records)
+            pairs (see MULTI_SEARCH_FUNC in lookup_best_match_ID)\n
+        Return:
+        - (tuple[str, float]) ID and score of the best search result (ID is None if no result scored above 0)
+        '''
         best_match_ID = None
         best_score = 0
-        list_all_search_res = multi_search_func(song_info)
+        sent = []
+        winner = None
         # print("\n")
-        for search_res in list_all_search_res:
-            offset = self.OFFSET
-            for res_info in search_res:
-                params = self.check_parameters(song_info, res_info)
-                res_score = self.score(params, offset)
-                offset -= 1
-                if res_score > best_score:
-                    best_score = res_score
-                    best_match_ID = res_info["id"]
-                # self.print(f"{res_info['title']} by {res_info['artist']}: {res_score}")
-        return best_match_ID    
+        for template, search_res in list_all_search_res:
+            self.record_search_results(search_res)
+            sent.append(template)
+            previous_score = best_score
+            best_match_ID, best_score = self.score_search_results(song_info, search_res, best_match_ID, best_score)
+            if best_score > previous_score:
+                winner = (template, next(res.rank for res in search_res if res.id == best_match_ID))
+            if best_score >= self.confident_score:
+                break
+        self.record_query_winner(sent, winner)
+        return best_match_ID, best_score
+
+    def score_search_results(self, song_info: TrackInfo, search_res: list[TrackInfo], best_match_ID: str,
+                             best_score: float) -> tuple[str, float]:
+        '''
+        Given a target song and the search results of one query, score each search result and
+        return the best result so far.\n
+        Parameters:
+        - (TrackInfo) song_info: record with song name, artist, album and duration
+        - (list[TrackInfo]) search_res: TrackInfo records of the search results of one query
+        - (str) best_match_ID: ID of the best result of previous queries (None if there is none)
+        - (float) best_score: score of the best result of previous queries (0 if there is none)\n
+        Return:
+        - (tuple[str, float]) ID and score of the best result of this and previous queries
+        '''
+        if not search_res:
+            return best_match_ID, best_score
+        with self.metrics.time("score"):
+            res_scores = self.score_batch([song_info] * len(search_res), search_res,
+                self.OFFSET - np.arange(len(search_res)))
+        # argmax returns the first of equal scores, like comparing the results one at a time
+        best_index = int(np.argmax(res_scores))
+        if res_scores[best_index] > best_score:
+            best_score = float(res_scores[best_index])
+            best_match_ID = search_res[best_index].id
+        return best_match_ID, best_score
+
+    def plan_queries(self, queries: dict) -> tuple[list[tuple[str, str]], int]:
+        '''
+        Given the search queries of a song, return the ones to search (in order) and the number of results to
+        request per search. With self.query_planner, templates are reordered, dropped and limited according to
+        how often they produced the best match in earlier lookups (see QueryPlanner.plan).\n
+        Parameters:
+        - (dict) queries: template name -> search query, in default order (eg. see get_YT_search_queries)\n
+        Return:
+        - (tuple[list[tuple[str, str]], int]) (template name, query) pairs and result limit
+        '''
+        if self.query_planner:
+            return self.query_planner.plan(self.DESTINATION, queries, self.LIMIT)
+        return list(queries.items()), self.LIMIT
+
+    def get_request_limit(self, limit: int) -> int:
+        '''
+        Given the result limit planned for a search (see plan_queries), return the number of results to request.
+        With self.search_cache, every search requests self.LIMIT results, so that a query has one cache entry
+        whatever limit was planned for it, and its response is cut to the planned limit when it is processed
+        (eg. see process_YT_search_results).\n
+        Parameters:
+        - (int) limit: planned result limit\n
+        Return:
+        - (int) number of results to request from the API client
+        '''
+        return self.LIMIT if self.search_cache else limit
+
+    def record_query_winner(self, sent: list[str], winner: tuple[str, int]) -> None:
+        '''
+        Given the templates searched for a song and the template and rank of its best match, record them in
+        self.query_planner (if any).\n
+        Parameters:
+        - (list[str]) sent: names of the templates whose queries were searched
+        - (tuple[str, int]) winner: template name and rank of the best match in the response of its search (see
+            TrackInfo.rank, None if not found)\n
+        Return:
+        - None
+        '''
+        if self.query_planner and sent:
+            self.query_planner.record(self.DESTINATION, sent, *(winner or (None, None)))
+        return
+
+    def get_catalog_match_ID(self, song_info: TrackInfo) -> tuple[str, float]:
+        '''
+        Given a source song, return the best match among the search results seen so far (in
+        self.catalog_index, if any) if it scores at least self.confident_score. Catalog entries are
+        scored as unranked results (ie. no points for the position or "Top result" of a search), so
+        a match is only accepted here if it would also have been accepted from a live search.\n
+        Parameters:
+        - (TrackInfo) song_info: record of the source song\n
+        Return:
+        - (tuple[str, float]) ID and score of the catalog match (ID is None if there is no confident match)
+        '''
+        if not self.catalog_index:
+            return None, 0
+        return self.catalog_index.match(self.DESTINATION, song_info,
+            lambda candidates: self.score_batch([song_info] * len(candidates), candidates, np.zeros(len(candidates))),
+            self.confident_score)
+
+    def get_ISRC_match_ID(self, song_info: TrackInfo) -> tuple[str, float]:
+        '''
+        Given a source song, return the song on the destination platform with the same ISRC (ie. the
+        same recording), if there is one. The ISRC of a Spotify song is part of its TrackInfo; the ISRC
+        of a YouTube Music song is only known if it was matched to a Spotify song before. The song is
+        looked up in the ISRC index of self.match_store first, then (on Spotify) with an "isrc:" query.\n
+        Parameters:
+        - (TrackInfo) song_info: record of the source song\n
+        Return:
+        - (tuple[str, float]) ID and score of the song with the same ISRC (ID is None if there is none)
+        '''
+        isrc = song_info.isrc
+        if not isrc and self.match_store and song_info.id:
+            isrc = self.match_store.get_ISRC(self.SOURCE, song_info.id)
+        if not isrc:
+            self.count_ISRC_lookup("unknown")
+            return None, 0
+        if self.match_store:
+            match_ID = self.match_store.get_ID_by_ISRC(self.DESTINATION, isrc)
+            if match_ID:
+                self.count_ISRC_lookup("local")
+                return match_ID, self.confident_score
+        search_res = [res for res in self.search_ISRC(isrc) if res.isrc == isrc]
+        if search_res:
+            self.record_search_results(search_res)
+            # Every result is the same recording, the score only picks the version closest to the source song
+            match_ID, _ = self.score_search_results(song_info, search_res, search_res[0].id, float("-inf"))
+            self.count_ISRC_lookup("query")
+            return match_ID, self.confident_score
+        self.count_ISRC_lookup("misses")
+        return None, 0
+
+    def search_ISRC(self, isrc: str) -> list[TrackInfo]:
+        '''
+        Given an ISRC, search the destination platform for songs with that ISRC. YouTube Music cannot
+        be searched by ISRC, so this returns no results unless a subclass converts to a platform that can.\n
+        Parameters:
+        - (str) isrc: ISRC\n
+        Return:
+        - (list[TrackInfo]) TrackInfo records of the search results
+        '''
+        return []
+
+    def count_ISRC_lookup(self, outcome: str) -> None:
+        '''
+        Count the outcome of an ISRC lookup in self.isrc_stats.\n
+        Parameters:
+        - (str) outcome: "local", "query", "misses" or "unknown" (see print_ISRC_stats)\n
+        Return:
+        - None
+        '''
+        with self.stats_lock:
+            self.isrc_stats[outcome] += 1
+        return
+
+    def record_search_results(self, search_res: list[TrackInfo]) -> None:
+        '''
+        Given the search results of one query, add them to self.catalog_index and store their ISRCs
+        in self.match_store (if any).\n
+        Parameters:
+        - (list[TrackInfo]) search_res: TrackInfo records of the search results\n
+        Return:
+        - None
+        '''
+        self.add_to_catalog(search_res)
+        if self.match_store:
+            ID_ISRC_pairs = [(res.id, res.isrc) for res in search_res if res.isrc]
+            if ID_ISRC_pairs:
+                self.match_store.add_ISRCs(self.DESTINATION, ID_ISRC_pairs)
+        return
+
+    def add_to_catalog(self, search_res: list[TrackInfo]) -> None:
+        '''
+        Given the search results of one query, add them to self.catalog_index (if any).\n
+        Parameters:
+        - (list[TrackInfo]) search_res: TrackInfo records of the search results\n
+        Return:
+        - None
+        '''
+        if self.catalog_index and search_res:
+            self.catalog_index.add(self.DESTINATION, search_res)
+        return
+
+    def get_stored_match_ID(self, song_info: TrackInfo) -> str:
+        '''
+        Given a source song, return its previously resolved match from self.match_store (if any).\n
+        Parameters:
+        - (TrackInfo) song_info: record with song ID on the source platform\n
+        Return:
+        - (str) ID of the stored match, or None if there is no stored match
+        '''
+        if self.match_store and song_info.id:
+            return self.match_store.get_match(self.SOURCE, song_info.id)
+        return None
+
+    def store_match_ID(self, song_info: TrackInfo, best_match_ID: str, best_score: float) -> None:
+        '''
+        Given a source song and its best match, record the match in self.match_store (if any) if it is
+        confident (eg. found by ISRC, or scored at least self.confident_score), since a stored match is used
+        instead of searching in every later run (and by every user it is shared with, see
+        MatchStore.export_matches). If the ISRC of the Spotify side of a confident match is known, it is also
+        stored for its YouTube Music side.\n
+        Parameters:
+        - (TrackInfo) song_info: record with song ID on the source platform
+        - (str) best_match_ID: ID of the best match on the destination platform (None if not found)
+        - (float) best_score: score of the best match\n
+        Return:
+        - None
+        '''
+        if self.match_store and song_info.id and best_match_ID:
+            # A fuzzy match may be another recording, and a stored match or ISRC makes later lookups skip the search
+            confident = best_score >= self.confident_score
+            if confident:
+                self.match_store.add_match(self.SOURCE, song_info.id, best_match_ID, best_score)
+            if self.SOURCE == self.SP_SOURCE:
+                isrc = song_info.isrc
+                if isrc:
+                    self.match_store.add_ISRCs(self.SP_SOURCE, [(song_info.id, isrc)])
+                    if confident:
+                        self.match_store.add_ISRCs(self.YT_SOURCE, [(best_match_ID, isrc)])
+            elif confident:
+                isrc = self.match_store.get_ISRC(self.SP_SOURCE, best_match_ID)
+                if isrc:
+                    self.match_store.add_ISRCs(self.YT_SOURCE, [(song_info.id, isrc)])
+        return
+
+    def get_best_match_IDs(self, songs_info: list, multi_search_func, recorded_matches: dict = None):
+        '''
+        Given a list of songs, yield the best match ID for each song in the same order as the list.
+        Songs are matched concurrently if self.max_workers > 1 (see map_in_order).\n
+        Parameters:
+        - (list) songs_info: list of TrackInfo records, or None for songs that should not be matched
+        - (function) multi_search_func: function to get all search results for a song (see lookup_best_match_ID)
+        - (dict) recorded_matches: {index: (source ID, match ID)} of songs matched by a previous run (eg. 
+            recorded in self.journal); songs still at the same position are not searched again\n
+        Return:
+        - (generator) best match ID for each song in songs_info (None if not found or not matched)
+        '''
+        return self.map_in_order(functools.partial(self.find_best_match_ID, multi_search_func=multi_search_func),
+            songs_info, recorded_matches, operator.attrgetter("id"))
+
+    def map_in_order(self, func, items: list, recorded_results: dict = None, get_key=None):
+        '''
+        Given a function and a list of items, yield the result of the function for each item in the same
+        order as the list. If self.max_workers > 1, items are processed concurrently by a bounded pool of
+        worker threads (up to MATCH_WINDOW_FACTOR items per worker ahead of the item being yielded);
+        otherwise, each item is processed only when its result is requested.\n
+        Parameters:
+        - (function) func: function called with each item (eg. self.find_best_match_ID)
+        - (iterable) items: items (eg. a list or a TrackStream), or None for items that should not be processed
+        - (dict) recorded_results: {index: (key, result)} of items processed by a previous run (eg. recorded in 
+            self.journal); an item whose key is unchanged is not processed again and its recorded result is yielded
+        - (function) get_key: function returning the key of an item (required with recorded_results)\n
+        Return:
+        - (generator) result for each item in items (None for items that are None)
+        '''
+        if recorded_results:
+            # Items are compared as they are read, so that a streamed list is not read ahead of processing
+            known_results = {}
+            def skip_recorded(index: int, item):
+                recorded = recorded_results.get(index)
+                if item and recorded and recorded[0] == get_key(item):
+                    known_results[index] = recorded[1]
+                    return None
+                return item
+            items = (skip_recorded(index, item) for index, item in enumerate(items))
+            for index, result in enumerate(self.map_in_order(func, items)):
+                yield known_results.pop(index) if index in known_results else result
+            return
+        if self.max_workers <= 1:
+            for item in items:
+                yield func(item) if item else None
+            return
+        window = self.max_workers * self.MATCH_WINDOW_FACTOR
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for item in items:
+                # Each item runs in a copy of this context, so that its metrics are attributed to the same playlist
+                pending.append(executor.submit(contextvars.copy_context().run, func, item) if item else None)
+                if len(pending) >= window:
+                    future = pending.popleft()
+                    yield future.result() if future else None
+            while pending:
+                future = pending.popleft()
+                yield future.result() if future else None
+        return
 
     def score(self, params: dict, offset: int) -> float:
         '''
@@ -144,8 +598,8 @@ class Converter():
         assign the result song a holistic quantitative score reflecting how much it 
         matches the original song.\n
         Parameters:
-        - (dict) song_info: dict with info of the original song
-        - (dict) res_info: dict with info of the search result song
+        - (TrackInfo) song_info: record with info of the original song
+        - (TrackInfo) res_info: record with info of the search result song
         - (int) offset: index in the search result list at which this current result appeared\n
         Return:
         - (float) score for the current result song based on how much it matches the 
@@ -185,48 +639,235 @@ class Converter():
         score = (self.SCORE * major) - params["diff_factor"]
         return score
 
-    def check_parameters(self, song_info: dict, res_info: dict) -> dict:
+    def check_parameters(self, song_info: TrackInfo, res_info: TrackInfo) -> dict:
         '''
-        Given two song_info dicts, return a new dict containing info about
+        Given two TrackInfo records, return a new dict containing info about
         how closely certain items in the two input dicts match.\n
         Parameters:
-        - (dict) song_info: dict with info of the original song
-        - (dict) res_info: dict with info of the search result song\n
+        - (TrackInfo) song_info: record with info of the original song
+        - (TrackInfo) res_info: record with info of the search result song\n
         Return:
         - (dict) dict of bools indicating which items in the input dicts do or don't match
         '''
         params = {}
-        params["same_title"] = (song_info["title"] == res_info["title"])
-        params["same_artist"] = (song_info["artist"] == res_info["artist"])
-        params["same_title_lower"] = (song_info["title"].lower() == res_info["title"].lower())
-        params["same_artist_lower"] = (song_info["artist"].lower() == res_info["artist"].lower())
-        params["same_album"] = (res_info["album"] and song_info["album"] and 
-                        res_info["album"] == song_info["album"])
-        params["close_title"] = (song_info["title"] in res_info["title"] or 
-                        res_info["title"] in song_info["title"])
-        params["close_artist"] = (song_info["artist"] in res_info["artist"] or 
-                        res_info["artist"] in song_info["artist"])
-        params["close_title_lower"] = (song_info["title"].lower() in res_info["title"].lower() or 
-                            res_info["title"].lower() in song_info["title"].lower())
-        params["close_artist_lower"] = (song_info["artist"].lower() in res_info["artist"].lower() or 
-                            res_info["artist"].lower() in song_info["artist"].lower())
-        params["is_song"] = ("type" in res_info and
-                    res_info["type"] == "song")
-        params["is_top_result"] = ("top_result" in res_info and 
-                        res_info["top_result"])
+        params["same_title"] = (song_info.title == res_info.title)
+        params["same_artist"] = (song_info.artist == res_info.artist)
+        params["same_title_lower"] = (song_info.title_lower == res_info.title_lower)
+        params["same_artist_lower"] = (song_info.artist_lower == res_info.artist_lower)
+        params["same_album"] = (res_info.album and song_info.album and 
+                        res_info.album == song_info.album)
+        params["close_title"] = (song_info.title in res_info.title or 
+                        res_info.title in song_info.title)
+        params["close_artist"] = (song_info.artist in res_info.artist or 
+                        res_info.artist in song_info.artist)
+        params["close_title_lower"] = (song_info.title_lower in res_info.title_lower or 
+                            res_info.title_lower in song_info.title_lower)
+        params["close_artist_lower"] = (song_info.artist_lower in res_info.artist_lower or 
+                            res_info.artist_lower in song_info.artist_lower)
+        params["is_song"] = (res_info.result_type == "song")
+        params["is_top_result"] = res_info.top_result
         try:
-            params["diff_factor"] = math.exp(abs(song_info["duration_seconds"]-res_info["duration_seconds"]))
+            params["diff_factor"] = math.exp(abs(song_info.duration_seconds-res_info.duration_seconds))
         except OverflowError:
             params["diff_factor"] = float("inf")
         return params
 
+    def score_batch(self, songs_info: list[TrackInfo], results_info: list[TrackInfo], offsets) -> np.ndarray:
+        '''
+        Vectorized version of score(check_parameters(song_info, res_info), offset) for many pairs of
+        original songs and search results at once (eg. all results of a query, or of a whole playlist).
+        The comparisons of each pair are collected into arrays, and the scores are computed from them in
+        one pass with the same rules and results as score().\n
+        Parameters:
+        - (list[TrackInfo]) songs_info: TrackInfo record of the original song of each pair
+        - (list[TrackInfo]) results_info: TrackInfo record of the search result of each pair
+        - (array) offsets: offset (see score()) of the search result of each pair\n
+        Return:
+        - (np.ndarray) score of each pair (-inf for ignored results)
+        '''
+        flags = np.array([self.get_score_flags(song_info, res_info)
+            for song_info, res_info in zip(songs_info, results_info)], dtype=bool).reshape(-1, 9)
+        (same_title, close_title, same_title_lower, same_artist, close_artist, same_artist_lower,
+            same_album, is_song, is_top_result) = flags.T
+        major = (2 * is_top_result + np.maximum(np.asarray(offsets), 0)
+            + np.where(same_title, 2, close_title | same_title_lower)
+            + np.where(same_artist, 2, close_artist | same_artist_lower)
+            + 2 * same_album)
+        # Ignore results with major <= 1 (to be conservative with matches)
+        kept = major > 1
+        # Prefer song types over non-song types
+        major = 2 * (major + np.where(is_song, np.where(major >= 4, 30, 1), 0))
+        scores = np.full(len(major), float("-inf"))
+        scores[kept] = self.SCORE * major[kept] - self.get_diff_factors(
+            [song_info.duration_seconds - res_info.duration_seconds
+                for song_info, res_info, keep in zip(songs_info, results_info, kept) if keep])
+        return scores
+
+    def get_score_flags(self, song_info: TrackInfo, res_info: TrackInfo) -> tuple:
+        '''
+        Given two TrackInfo records, return the comparisons used by score_batch (the same as the
+        bools of check_parameters, with the comparisons that never change a score left out).\n
+        Parameters:
+        - (TrackInfo) song_info: record with info of the original song
+        - (TrackInfo) res_info: record with info of the search result song\n
+        Return:
+        - (tuple) same_title, close_title, same_title_lower, same_artist, close_artist, same_artist_lower,
+            same_album, is_song, is_top_result
+        '''
+        title, res_title = song_info.title, res_info.title
+        artist, res_artist = song_info.artist, res_info.artist
+        return (title == res_title,
+            title in res_title or res_title in title,
+            song_info.title_lower == res_info.title_lower,
+            artist == res_artist,
+            artist in res_artist or res_artist in artist,
+            song_info.artist_lower == res_info.artist_lower,
+            bool(res_info.album and song_info.album and res_info.album == song_info.album),
+            res_info.result_type == "song",
+            res_info.top_result)
+
+    def get_diff_factors(self, duration_diffs: list[float]) -> np.ndarray:
+        '''
+        Given differences in song duration, return the duration penalty of each (see check_parameters).\n
+        Parameters:
+        - (list[float]) duration_diffs: differences in song duration (in seconds)\n
+        Return:
+        - (np.ndarray) exp(|difference|) of each difference (inf if too large)
+        NOTE: np.exp can differ from math.exp in the last bit, which can change which of two close
+        results is the best match, so each penalty is computed with math.exp like in check_parameters.
+        '''
+        diff_factors = np.empty(len(duration_diffs))
+        for index, duration_diff in enumerate(duration_diffs):
+            try:
+                diff_factors[index] = math.exp(abs(duration_diff))
+            except OverflowError:
+                diff_factors[index] = float("inf")
+        return diff_factors
+
+    '''
+    Helper functions: Journal
+    '''
+    def get_journal_key(self, playlist_ID: str) -> str:
+        '''
+        Given a source playlist ID, return the key under which its progress is recorded in self.journal.\n
+        Parameters:
+        - (str) playlist_ID: source playlist ID (or "LIKED_SONGS", "LIKED_ALBUMS", etc.)\n
+        Return:
+        - (str) journal key
+        '''
+        return f"{self.SOURCE}:{playlist_ID}"
+
+    def get_journal_progress(self, playlist_ID: str) -> dict:
+        '''
+        Given a source playlist ID, return its progress recorded in self.journal (see Journal.get_progress).\n
+        Parameters:
+        - (str) playlist_ID: source playlist ID\n
+        Return:
+        - (dict) recorded progress, or None if there is no journal or nothing was recorded
+        '''
+        if self.journal:
+            return self.journal.get_progress(self.get_journal_key(playlist_ID))
+        return None
+
+    def get_playlist_writer(self, playlist_ID: str, playlist_name: str, create_playlist_func, add_items_func,
+                            batch_size: int) -> tuple[str, PlaylistWriter]:
+        '''
+        Given a source playlist, create its destination playlist (or reuse the one recorded in self.journal
+        by a previous run) and return a PlaylistWriter that fills it.\n
+        Parameters:
+        - (str) playlist_ID: source playlist ID
+        - (str) playlist_name: source playlist name
+        - (function) create_playlist_func: function that creates the destination playlist given playlist_name
+            and returns its ID (eg. self.create_YT_playlist)
+        - (function) add_items_func: function that appends a list of IDs to a destination playlist given its ID
+            (eg. self.add_YT_playlist_items)
+        - (int) batch_size: number of IDs written per call to add_items_func\n
+        Return:
+        - (tuple[str, PlaylistWriter]) destination playlist ID and writer
+        '''
+        progress = self.get_journal_progress(playlist_ID)
+        if progress and progress["destination"]:
+            dest_playlist_ID = progress["destination"]
+            already_written = progress["written"]
+        else:
+            dest_playlist_ID = create_playlist_func(playlist_name)
+            already_written = 0
+            if self.journal:
+                self.journal.record_start(self.get_journal_key(playlist_ID), playlist_name, dest_playlist_ID)
+        flush_callback = None
+        if self.journal:
+            flush_callback = functools.partial(self.journal.record_write, self.get_journal_key(playlist_ID))
+        writer = PlaylistWriter(functools.partial(add_items_func, dest_playlist_ID), batch_size,
+            already_written, flush_callback)
+        return dest_playlist_ID, writer
+
+    def record_write_stats(self, playlist_name: str, writer: PlaylistWriter) -> None:
+        '''
+        Given a destination playlist that was filled, add the write counters of its writer to self.write_stats.\n
+        Parameters:
+        - (str) playlist_name: source playlist name (or "Liked Albums")
+        - (PlaylistWriter) writer: writer that filled the destination playlist\n
+        Return:
+        - None
+        '''
+        stats = writer.get_stats()
+        with self.stats_lock:
+            totals = self.write_stats.setdefault(playlist_name, dict.fromkeys(stats, 0))
+            for name, value in stats.items():
+                totals[name] += value
+        return
+
+    def record_journal_track(self, playlist_ID: str, index: int, source_ID: str, match_ID: str) -> None:
+        '''
+        Record the match of a track (or album) in self.journal, unless it was already recorded.\n
+        Parameters:
+        - (str) playlist_ID: source playlist ID
+        - (int) index: position of the track in the source playlist
+        - (str) source_ID: ID of the track on the source platform
+        - (str) match_ID: ID of its match on the destination platform (None if not found or not matched)\n
+        Return:
+        - None
+        '''
+        if self.journal:
+            progress = self.get_journal_progress(playlist_ID)
+            if not progress or progress["matches"].get(index) != (source_ID, match_ID):
+                self.journal.record_track(self.get_journal_key(playlist_ID), index, source_ID, match_ID)
+        return
+
+    def record_journal_done(self, playlist_ID: str, not_added) -> None:
+        '''
+        Record in self.journal that a playlist (or the liked albums) was fully converted.\n
+        Parameters:
+        - (str) playlist_ID: source playlist ID
+        - (dict | list) not_added: songs (NOT_ADDED_SONGS entry) or albums that were not added\n
+        Return:
+        - None
+        '''
+        if self.journal:
+            self.journal.record_done(self.get_journal_key(playlist_ID), not_added)
+        return
+
+    def skip_finished_playlist(self, progress: dict) -> str:
+        '''
+        Given the recorded progress of a playlist that was fully converted by a previous run, restore
+        its songs that were not added and return its destination playlist ID.\n
+        Parameters:
+        - (dict) progress: recorded progress of the playlist\n
+        Return:
+        - (str) playlist ID of the destination playlist
+        '''
+        self.print(f"\nSkipping '{progress['name']}' (already converted)")
+        if progress["not_added"]:
+            self.NOT_ADDED_SONGS[progress["name"]] = progress["not_added"]
+        return progress["destination"]
+
     '''
     Helper functions: Printing
     '''
     def print_not_added_songs(self) -> None:
         '''
         Prints all songs queries that were not added, either because they could not 
-        be found or because they are duplicates, using class variable NOT_ADDED_SONGS.\n
+        be found or because they are duplicates, using self.NOT_ADDED_SONGS.\n
         Parameters:
         - None\n
         Return:
@@ -270,13 +911,219 @@ class Converter():
                 self.print(f"{index + 1}. {album}")
         return
 
+    def print_run_stats(self) -> None:
+        '''
+        Prints how many lookups were answered locally (eg. by the search cache) instead of the API clients.\n
+        NOTE: The report of self.reporter is not written here but by whoever runs the conversion (eg. main,
+            BatchRunner or ConverterWorker), since a library or batch run is made of several conversions.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        self.print_match_memo_stats()
+        self.print_search_cache_stats()
+        self.print_match_store_stats()
+        self.print_ISRC_stats()
+        self.print_catalog_index_stats()
+        self.print_query_planner_stats()
+        self.print_rate_limit_stats()
+        self.print_write_stats()
+        self.print_metrics_summary()
+        return
+
+    def get_run_stats(self) -> dict:
+        '''
+        Return the stats printed by print_run_stats (except the metrics, see self.metrics.get_summary).\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with the stats of the run memo, search cache, match store, ISRC lookups, catalog index,
+            query planner and rate limiters (None for those that are not used) and the write stats of each playlist
+        '''
+        rate_limits = {}
+        for client in (self.sp_client, self.ytm_client):
+            rate_limiter = getattr(client, "rate_limiter", None)
+            if rate_limiter:
+                rate_limits[rate_limiter.name] = rate_limiter.get_stats()
+        return {
+            "match_memo": self.match_memo.get_stats() if self.match_memo else None,
+            "search_cache": self.search_cache.get_stats() if self.search_cache else None,
+            "match_store": self.match_store.get_stats() if self.match_store else None,
+            "isrc": dict(self.isrc_stats),
+            "catalog_index": self.catalog_index.get_stats() if self.catalog_index else None,
+            "query_planner": self.query_planner.get_stats() if self.query_planner else None,
+            "rate_limits": rate_limits,
+            "writes": dict(self.write_stats),
+        }
+
+    def print_match_memo_stats(self) -> None:
+        '''
+        Prints how many lookups were saved by self.match_memo (ie. songs found on more than one playlist).\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.match_memo:
+            stats = self.match_memo.get_stats()
+            self.print(f"\nRun memo: {stats['hits']} lookups saved by songs already matched earlier in this run, "
+                + f"{stats['misses']} songs looked up ({stats['hit_rate']:.0%} hit rate)")
+        return
+
+    def print_search_cache_stats(self) -> None:
+        '''
+        Prints how many searches were answered by self.search_cache instead of the API clients.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.search_cache:
+            stats = self.search_cache.get_stats()
+            self.print(f"\nSearch cache: {stats['hits']} hits, {stats['misses']} misses "
+                + f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} cached searches")
+        return
+
+    def print_match_store_stats(self) -> None:
+        '''
+        Prints how many songs were matched by self.match_store without searching.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.match_store:
+            stats = self.match_store.get_stats()
+            self.print(f"\nMatch store: {stats['hits']} songs matched without searching, "
+                + f"{stats['misses']} searched ({stats['hit_rate']:.0%} hit rate), {stats['entries']} stored matches")
+        return
+
+    def print_ISRC_stats(self) -> None:
+        '''
+        Prints how many songs were matched by ISRC (from the local ISRC index or with an "isrc:" query)
+        instead of with text queries.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        stats = self.isrc_stats
+        lookups = stats["local"] + stats["query"] + stats["misses"]
+        if lookups:
+            hit_rate = (stats["local"] + stats["query"]) / lookups
+            self.print(f"\nISRC lookups: {stats['local']} matched from the ISRC index, {stats['query']} matched "
+                + f"with isrc: queries, {stats['misses']} not found ({hit_rate:.0%} hit rate), "
+                + f"{stats['unknown']} songs without a known ISRC")
+        return
+
+    def print_catalog_index_stats(self) -> None:
+        '''
+        Prints how many songs were matched by self.catalog_index without searching.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.catalog_index:
+            stats = self.catalog_index.get_stats()
+            self.print(f"\nCatalog index: {stats['hits']} songs matched offline, {stats['misses']} searched "
+                + f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} catalog entries")
+        return
+
+    def print_query_planner_stats(self) -> None:
+        '''
+        Prints which search query templates produced the best matches on the destination platform, and how many
+        queries self.query_planner skipped.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.query_planner:
+            stats = self.query_planner.get_stats()
+            platform_stats = stats["platforms"].get(self.DESTINATION)
+            if platform_stats:
+                templates = sorted(platform_stats["templates"].items(), key=lambda item: item[1]["win_rate"],
+                    reverse=True)
+                self.print(f"\nQuery planner: {stats['skipped']} queries skipped, result limit "
+                    + f"{platform_stats['limit']}, {platform_stats['lookups']} lookups recorded; best match found by "
+                    + ", ".join(f"'{template}' {template_stats['win_rate']:.0%}" for template, template_stats in templates))
+        return
+
+    def print_rate_limit_stats(self) -> None:
+        '''
+        Prints how long requests to each platform waited for their rate limiter (if the API clients
+        are wrapped in a RateLimitedClient).\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        for client in (self.sp_client, self.ytm_client):
+            rate_limiter = getattr(client, "rate_limiter", None)
+            if rate_limiter:
+                stats = rate_limiter.get_stats()
+                self.print(f"\n{rate_limiter.name} requests: {stats['calls']} calls, {stats['throttled']} throttled, "
+                    + f"{stats['total_wait']:.1f}s total wait ({stats['average_wait']:.3f}s average, "
+                    + f"{stats['max_wait']:.1f}s max), {stats['rate']:.2f} requests/s")
+        return
+
+    def print_write_stats(self) -> None:
+        '''
+        Prints how many write calls were made to fill each destination playlist and how long they took.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.write_stats:
+            self.print("\nPlaylist writes:")
+            for playlist_name, stats in self.write_stats.items():
+                self.print(f"- {playlist_name}: {stats['written']} items in {stats['calls']} write calls "
+                    + f"({stats['retries']} retries), {stats['latency']:.2f}s total write latency")
+        return
+
+    def print_metrics_summary(self) -> None:
+        '''
+        Prints the latency of each phase (eg. "search", "write") and API call recorded in self.metrics, the
+        time spent in each phase per playlist, and whether searching or writing took most of the run.
+        Totals are summed over worker threads, so they can add up to more than the wall time.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        summary = self.metrics.get_summary()
+        for title, histograms in (("Phases", summary["phases"]), ("API calls", summary["api_calls"])):
+            if histograms:
+                self.print(f"\n{title}:")
+                for name, histogram in histograms.items():
+                    self.print(f"- {name}: {histogram['count']} in {histogram['total']:.2f}s "
+                        + f"({histogram['mean'] * 1000:.1f}ms average, p50 {histogram['p50'] * 1000:.0f}ms, "
+                        + f"p95 {histogram['p95'] * 1000:.0f}ms, max {histogram['max'] * 1000:.0f}ms)")
+        if summary["playlists"]:
+            self.print("\nPer playlist:")
+            for playlist_name, totals in summary["playlists"].items():
+                phases = ", ".join(f"{name} {totals[name]['total']:.2f}s" for name in summary["phases"] if name in totals)
+                songs = ", ".join(f"{totals[name]['count']} {name[len('songs.'):]}" for name in sorted(totals)
+                    if name.startswith("songs."))
+                self.print(f"- {playlist_name}: {' | '.join(part for part in (phases, songs) if part)}")
+        search_time = summary["phases"].get("search", {}).get("total", 0.0)
+        write_time = summary["phases"].get("write", {}).get("total", 0.0)
+        if search_time or write_time:
+            dominant = "Searches" if search_time >= write_time else "Writes"
+            self.print(f"\n{dominant} dominate: {search_time:.2f}s searching, {write_time:.2f}s writing "
+                + f"({search_time / (search_time + write_time):.0%} of search and write time spent searching)")
+        return
+
     def print_unadded_song_error(self, playlist_name: str, reason: str, query: str, ID: str = None) -> None: 
         '''
         Given a playlist name and song query, adds the query to self.NOT_ADDED, and then
-        prints that the song was not found.\n
+        prints that the song was not found (or, with self.reporter, writes a "song_not_added" event).\n
         Parameters:
         - (str) playlist_name: name of source playlist from which song query was derived
-        - (str) query: query string for the song that was not added (eg. f"{song_info['title']} by {song_info['artist']}")
+        - (str) query: query string for the song that was not added (eg. f"{song_info.title} by {song_info.artist}")
         - (str) ID: song/video ID for the song that was not added (only available for "dupes" and "downloaded", not for "unfound)
         - (str) reason: reason for the song not being added (ie. which NOT_ADDED_SONGS bucket to put the song)
             - "unfound": if the song could not be found with the query
@@ -286,11 +1133,14 @@ class Converter():
         Return:
         - None
         '''
+        self.metrics.count(f"songs.{reason}")
         if playlist_name not in self.NOT_ADDED_SONGS:
             self.NOT_ADDED_SONGS[playlist_name] = {"unfound":[], "dupes":[], "downloads":[]}
         query_ID_pair = {"query":query, "id":ID}
         self.NOT_ADDED_SONGS[playlist_name][reason].append(query_ID_pair)
-        if reason == "unfound":
+        if self.reporter:
+            self.reporter.event("song_not_added", reason=reason, query=query, id=ID)
+        elif reason == "unfound":
             self.print(f"ERROR: {query} not found.")
         elif reason == "dupes" and not self.keep_dupes:
             self.print(f"{query} not added because it was a duplicate.")
@@ -298,6 +1148,53 @@ class Converter():
             self.print(f"{query} not added because it was a video type object, not a song type object.")
         return
 
+    def print_progress(self, label: str, done: int, total: int, message: str) -> None:
+        '''
+        Prints a message about one item (eg. a song) of a playlist. With self.reporter, a progress line
+        is printed instead, at most every Reporter.PROGRESS_INTERVAL seconds.\n
+        Parameters:
+        - (str) label: what is in progress (eg. the source playlist name)
+        - (int) done: number of items done, including this one
+        - (int) total: total number of items
+        - (str) message: message about this item\n
+        Return:
+        - None
+        '''
+        if self.reporter:
+            self.reporter.progress(self.metrics, label, done, total)
+        else:
+            self.print(message)
+        return
+
+    def report(self, event_type: str, **fields) -> None:
+        '''
+        Write an event to the events file of self.reporter (if any, see Reporter.event).\n
+        Parameters:
+        - (str) event_type: type of the event
+        - (any) fields: fields of the event\n
+        Return:
+        - None
+        '''
+        if self.reporter:
+            self.reporter.event(event_type, **fields)
+        return
+
+    def report_playlist_done(self, playlist_name: str, playlist_ID: str, total: int) -> None:
+        '''
+        Print the last progress line of a playlist and report how many of its songs were added (if self.reporter).\n
+        Parameters:
+        - (str) playlist_name: name of the source playlist
+        - (str) playlist_ID: playlist ID of the destination playlist
+        - (int) total: number of tracks on the source playlist\n
+        Return:
+        - None
+        '''
+        if self.reporter:
+            self.reporter.progress(self.metrics, playlist_name, total, total)
+            self.reporter.event("playlist_done", destination=playlist_ID,
+                songs=self.reporter.get_song_outcomes(self.metrics.get_counters(playlist_name)))
+        return
+
     def print(self, message: str) -> None:
         '''
         Short helper function to print a colored string and log without the clutter.\n
@@ -3,18 +3,23 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPalette, QColor
 
 import logging
-import urllib
-import spotipy
-from SpotifyConverterClass import SpotifyConverter
-from YouTubeConverterClass import YouTubeMusicConverter
-from ytmusicapi import YTMusic
+import urllib.parse
 from dotenv import load_dotenv
 load_dotenv()
 
+from ConverterWorkerClass import ConverterWorker
+
+# NOTE: spotipy, ytmusicapi and the converters (which import numpy) are imported by the conversion thread when the
+#   convert button is clicked, not when the window is opened.
+
 class ConverterGUI():
+    ''' MAX_RESULT_LINES: max number of songs that were not added listed in the window (the rest are in log.log) '''
+    MAX_RESULT_LINES = 1000
+
     def __init__(self) -> None:
         self.ytm_client = None
         self.sp_client = None
+        self.worker = None
 
         self.app = qt_widgets.QApplication([])
         self.window = qt_widgets.QWidget()
@@ -38,12 +43,20 @@ class ConverterGUI():
 
         self.convert_button = qt_widgets.QPushButton("\nCONVERT\n")
 
+        self.progress_bar = qt_widgets.QProgressBar()
+        self.status_label = qt_widgets.QLabel("")
+        self.results_list = qt_widgets.QListWidget()
+        self.pause_button = qt_widgets.QPushButton("Pause")
+        self.cancel_button = qt_widgets.QPushButton("Cancel")
+
         self.create_window()
         self.create_ytmusic_auth_group()
         self.create_src_dest_group()
         self.create_job_group()
         self.create_options_group()
         self.create_convert_button()
+        self.create_progress_group()
+        self.app.aboutToQuit.connect(self.stop_worker)
         self.app.exec()
         pass
 
@@ -111,6 +124,23 @@ class ConverterGUI():
         self.convert_button.clicked.connect(self.get_arguments)
         return
 
+    def create_progress_group(self):
+        progress_group_layout = qt_widgets.QVBoxLayout()
+        progress_group_box = qt_widgets.QGroupBox("Progress")
+        progress_group_box.setLayout(progress_group_layout)
+        self.window_layout.addWidget(progress_group_box)
+        progress_group_layout.addWidget(self.status_label)
+        progress_group_layout.addWidget(self.progress_bar)
+        progress_group_layout.addWidget(self.results_list)
+        controls_layout = qt_widgets.QHBoxLayout()
+        controls_layout.addWidget(self.pause_button)
+        controls_layout.addWidget(self.cancel_button)
+        progress_group_layout.addLayout(controls_layout)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button.clicked.connect(self.cancel_conversion)
+        self.set_converting(False)
+        return
+
     '''
     Create GUI Window
     '''
@@ -209,35 +239,29 @@ class ConverterGUI():
         #     self.error_message("Invalid YouTube Music authentication")
         #     return
 
-        self.ytm_client = YTMusic('headers_auth.json')
-
-        SP_SCOPE = "playlist-read-private playlist-modify-private user-library-read user-library-modify"
-        SP_TOKEN = spotipy.util.prompt_for_user_token(scope=SP_SCOPE)
-        self.sp_client = spotipy.Spotify(auth=SP_TOKEN)
-
+        if args["job"] not in ("Playlist", "Library", "Liked Albums"):
+            self.error_message(f"Converting {args['job']} is not supported yet")
+            return
         if args["job"] == "Playlist":
-            parsed_URL = self.get_playlist_URL(args["playlist_URL"])
-            if parsed_URL:
-                netloc = parsed_URL.netloc
-                path = parsed_URL.path
-                query = parsed_URL.query
-                if args["source"] == "Spotify":
-                    if netloc == "open.spotify.com" and path[:10] == "/playlist/":
-                        sp_playlist_ID = path[10:]
-                        self.do_playlist_spotify(sp_playlist_ID, args["keep_dupes"])
-                    else:
-                        self.error_message("Make sure the URL leads to a Spotify playlist")
-                elif args["source"] == "YouTube Music":
-                    if netloc == "music.youtube.com" and path == "/playlist":
-                        yt_playlist_ID = query[5:]
-                        self.do_playlist_youtube(yt_playlist_ID, args["keep_dupes"], args["downloads"])
-                    else:
-                        self.error_message("Make sure the URL leads to a YouTube Music playlist")
-        elif args["job"] == "Library":
+            parsed_URL = self.get_playlist_URL(args["playlist_url"])
+            if not parsed_URL:
+                return
+            netloc = parsed_URL.netloc
+            path = parsed_URL.path
+            query = parsed_URL.query
             if args["source"] == "Spotify":
-                self.do_library_spotify(args["keep_dupes"])
+                if netloc == "open.spotify.com" and path[:10] == "/playlist/":
+                    args["playlist_ID"] = path[10:]
+                else:
+                    self.error_message("Make sure the URL leads to a Spotify playlist")
+                    return
             elif args["source"] == "YouTube Music":
-                self.do_library_youtube(args["keep_dupes"], args["downloads"])
+                if netloc == "music.youtube.com" and path == "/playlist":
+                    args["playlist_ID"] = query[5:]
+                else:
+                    self.error_message("Make sure the URL leads to a YouTube Music playlist")
+                    return
+        self.start_worker(args)
         return
 
     def get_playlist_URL(self, input_URL):
@@ -252,12 +276,14 @@ class ConverterGUI():
         return parsed_URL
 
     def do_spotify_auth(self):
+        import spotipy
         SP_SCOPE = "playlist-read-private playlist-modify-private user-library-read user-library-modify"
         SP_TOKEN = spotipy.util.prompt_for_user_token(scope=SP_SCOPE)
         SP_CLIENT = spotipy.Spotify(auth=SP_TOKEN)
         return SP_CLIENT
 
     def do_youtube_auth(self, ytm_auth):
+        from ytmusicapi import YTMusic
         YTMusic.setup(ytm_auth)
         YTM_CLIENT = YTMusic('headers_auth.json')
         return YTM_CLIENT
@@ -268,31 +294,102 @@ class ConverterGUI():
         error_message.exec()
         return
 
-    def do_playlist_spotify(self, sp_playlist_ID: str, keep_dupes: bool) -> None:
-        self.error_message("SUCCESS DO PLAYLIST SPOTIFY")
-        # sp_converter = SpotifyConverter(self.ytm_client, self.sp_client, keep_dupes)
-        # sp_converter.convert_SP_to_YT_playlist(sp_playlist_ID)
-        # sp_converter.print_not_added_songs()
+    '''
+    Conversion thread
+    '''
+    def start_worker(self, args):
+        self.results_list.clear()
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Authenticating...")
+        self.worker = ConverterWorker(args, self.create_clients)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.events.connect(self.add_events)
+        self.worker.paused.connect(self.update_paused)
+        self.worker.done.connect(self.conversion_done)
+        self.worker.failed.connect(self.conversion_failed)
+        self.worker.cancelled.connect(self.conversion_cancelled)
+        self.set_converting(True)
+        self.worker.start()
         return
 
-    def do_playlist_youtube(self, yt_playlist_ID: str, keep_dupes: bool, downloads: bool) -> None:
-        self.error_message("SUCCESS DO PLAYLIST YOUTUBE")
-        # yt_converter = YouTubeMusicConverter(self.ytm_client, self.sp_client, keep_dupes, downloads)
-        # yt_converter.convert_YT_to_SP_playlist(yt_playlist_ID)
-        # yt_converter.print_not_added_songs()
-        # yt_converter.download_YT_videos()
+    def create_clients(self):
+        # Called on the conversion thread, since prompt_for_user_token can wait for input
+        import spotipy
+        from ytmusicapi import YTMusic
+        ytm_client = YTMusic('headers_auth.json')
+        SP_SCOPE = "playlist-read-private playlist-modify-private user-library-read user-library-modify"
+        SP_TOKEN = spotipy.util.prompt_for_user_token(scope=SP_SCOPE)
+        sp_client = spotipy.Spotify(auth=SP_TOKEN)
+        self.ytm_client, self.sp_client = ytm_client, sp_client
+        return ytm_client, sp_client
+
+    def stop_worker(self):
+        if self.worker and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
         return
-    
-    def do_library_spotify(self, keep_dupes: bool) -> None:
-        self.error_message("SUCCESS DO LIBRARY SPOTIFY")
-        # sp_converter = SpotifyConverter(self.ytm_client, self.sp_client, keep_dupes)
-        # sp_converter.convert_SP_to_YT_library()
+
+    def set_converting(self, converting: bool):
+        self.convert_button.setEnabled(not converting)
+        self.pause_button.setEnabled(converting)
+        self.cancel_button.setEnabled(converting)
+        self.pause_button.setText("Pause")
+        return
+
+    def toggle_pause(self):
+        if self.worker.running.is_set():
+            self.worker.pause()
+        else:
+            self.worker.resume()
+        return
+
+    def cancel_conversion(self):
+        self.status_label.setText("Cancelling...")
+        self.cancel_button.setEnabled(False)
+        self.worker.cancel()
+        return
+
+    def update_progress(self, label: str, done: int, total: int):
+        self.status_label.setText(f"{label}: {done}/{total}")
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+        return
+
+    def update_paused(self, paused: bool):
+        self.pause_button.setText("Resume" if paused else "Pause")
+        if paused:
+            self.status_label.setText(f"{self.status_label.text()} (paused)")
+        return
+
+    def add_events(self, events: list):
+        lines = [f"{event['playlist']}: {event['query']} ({event['reason']})" for event in events
+            if event["event"] == "song_not_added"]
+        lines += [f"Failed to download {event['query']}" for event in events
+            if event["event"] == "download" and event["status"] == "failed"]
+        room = self.MAX_RESULT_LINES - self.results_list.count()
+        if lines and room > 0:
+            self.results_list.addItems(lines[:room])
+            self.results_list.scrollToBottom()
+        return
+
+    def conversion_done(self, report: dict):
+        self.set_converting(False)
+        songs = report["songs"]
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self.status_label.setText(f"Finished in {report['elapsed']:.0f}s: {songs['added']} added, "
+            + f"{songs['unfound']} not found, {songs['dupes']} duplicates, {songs['downloads']} videos")
+        return
+
+    def conversion_failed(self, message: str):
+        self.set_converting(False)
+        self.status_label.setText("Failed")
+        self.error_message(message)
         return
 
-    def do_library_youtube(self, keep_dupes: bool, downloads: bool) -> None:
-        self.error_message("SUCCESS DO LIBRARY YOUTUBE")
-        # yt_converter = YouTubeMusicConverter(self.ytm_client, self.sp_client, keep_dupes, downloads)
-        # yt_converter.convert_YT_to_SP_library()
+    def conversion_cancelled(self):
+        self.set_converting(False)
+        self.status_label.setText("Cancelled")
         return
 
-converter_GUI = ConverterGUI()
+if __name__ == '__main__':
+    converter_GUI = ConverterGUI()
@@ -0,0 +1,194 @@
+import time
+import logging
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from MetricsClass import Metrics, CURRENT_PLAYLIST
+from ReporterClass import Reporter
+
+class ConversionCancelled(Exception):
+    '''
+    Raised on the conversion thread at the next song after ConverterWorker.cancel is called.
+    '''
+    pass
+
+class SignalReporter(Reporter):
+    ''' UPDATE_INTERVAL: min number of seconds between two updates sent to the window '''
+    UPDATE_INTERVAL = 0.2
+
+    def __init__(self, worker, update_interval: float = None) -> None:
+        '''
+        Reporter that sends the progress and events of a conversion to the window through the signals of a
+        ConverterWorker instead of printing them. Events are buffered and sent together with the next
+        progress update, and updates are sent at most every update_interval seconds, so that a large
+        playlist does not flood the event loop of the window with one update per song. Every progress
+        update and not-added song is also where the conversion is paused or cancelled (see ConverterWorker).\n
+        Parameters:
+        - (ConverterWorker) worker: worker whose signals are emitted
+        - (float) update_interval: min seconds between two updates (None to use UPDATE_INTERVAL)
+        '''
+        update_interval = self.UPDATE_INTERVAL if update_interval is None else update_interval
+        super().__init__(progress_interval=update_interval)
+        self.worker = worker
+        self.events = []
+        pass
+
+    def event(self, event_type: str, **fields) -> None:
+        if event_type == "song_not_added":
+            self.worker.wait_if_paused()
+        event = {"time": round(time.time(), 3), "event": event_type, "playlist": CURRENT_PLAYLIST.get()}
+        event.update(fields)
+        with self.lock:
+            self.events.append(event)
+        return
+
+    def progress(self, metrics: Metrics, label: str, done: int, total: int) -> None:
+        self.worker.wait_if_paused()
+        now = time.monotonic()
+        with self.lock:
+            finished = done >= total and self.last_done.get(label) != done
+            if not finished and now - self.last_progress < self.progress_interval:
+                return
+            self.last_progress = now
+            self.last_done[label] = done
+        self.worker.progress.emit(label, done, total)
+        self.flush()
+        return
+
+    def flush(self) -> None:
+        with self.lock:
+            events, self.events = self.events, []
+        if events:
+            self.worker.events.emit(events)
+        return
+
+    def close(self) -> None:
+        self.flush()
+        return
+
+class ConverterWorker(QThread):
+    ''' progress: (label, done, total) of the playlist being converted, at most every UPDATE_INTERVAL seconds '''
+    progress = pyqtSignal(str, int, int)
+
+    ''' events: list of events since the last update (see Reporter.__init__), eg. songs that were not added '''
+    events = pyqtSignal(list)
+
+    ''' paused: whether the conversion is now paused '''
+    paused = pyqtSignal(bool)
+
+    ''' failed: error message of a conversion that raised an error '''
+    failed = pyqtSignal(str)
+
+    ''' cancelled: the conversion stopped after cancel was called '''
+    cancelled = pyqtSignal()
+
+    ''' done: report of a finished conversion (see Reporter.get_report, with "not_added_songs" and
+        "not_added_albums" added) '''
+    done = pyqtSignal(dict)
+
+    ''' CONVERT_METHODS: (source, job) -> converter method, and whether it takes the source playlist ID '''
+    CONVERT_METHODS = {
+        ("Spotify", "Playlist"): ("convert_SP_to_YT_playlist", True),
+        ("Spotify", "Library"): ("convert_SP_to_YT_library", False),
+        ("Spotify", "Liked Albums"): ("convert_SP_to_YT_liked_albums", False),
+        ("YouTube Music", "Playlist"): ("convert_YT_to_SP_playlist", True),
+        ("YouTube Music", "Library"): ("convert_YT_to_SP_library", False),
+        ("YouTube Music", "Liked Albums"): ("convert_YT_to_SP_liked_albums", False),
+    }
+
+    def __init__(self, args: dict, create_clients, parent=None) -> None:
+        '''
+        Runs one conversion on a background thread so that the window stays responsive, and reports its
+        progress, not-added songs and result back to the window through signals (which Qt delivers on the
+        thread of the window). The API clients are created on the background thread too, since authenticating
+        can block (eg. spotipy asking for a redirect URL).\n
+        Parameters:
+        - (dict) args: "source", "job", "playlist_ID" (for playlists), "keep_dupes" and "downloads"
+        - (function) create_clients: function that returns the YouTube Music and Spotify API clients
+        - (QObject) parent: parent of the thread
+        '''
+        super().__init__(parent)
+        self.args = args
+        self.create_clients = create_clients
+        self.metrics = Metrics()
+        self.reporter = SignalReporter(self)
+        self.running = threading.Event()
+        self.running.set()
+        self.cancel_requested = threading.Event()
+        pass
+
+    def run(self) -> None:
+        try:
+            converter, method_name, takes_playlist_ID = self.get_converter()
+            convert = getattr(converter, method_name)
+            if takes_playlist_ID:
+                convert(self.args["playlist_ID"])
+            else:
+                convert()
+            if self.args["source"] == "YouTube Music" and self.args["job"] == "Playlist":
+                converter.download_YT_videos()
+            report = self.reporter.finish(self.metrics, converter.get_run_stats())
+            report["not_added_songs"] = converter.NOT_ADDED_SONGS
+            report["not_added_albums"] = converter.NOT_ADDED_ALBUMS
+            self.done.emit(report)
+        except ConversionCancelled:
+            self.reporter.flush()
+            self.cancelled.emit()
+        except Exception as exception:
+            logging.exception("Conversion failed")
+            self.reporter.flush()
+            self.failed.emit(repr(exception))
+        return
+
+    def get_converter(self) -> tuple:
+        '''
+        Create the API clients and the converter of self.args.\n
+        Parameters:
+        - None\n
+        Return:
+        - (tuple) converter, name of its method that runs the job, and whether that method takes the playlist ID
+        '''
+        method_name, takes_playlist_ID = self.CONVERT_METHODS[(self.args["source"], self.args["job"])]
+        ytm_client, sp_client = self.create_clients()
+        if self.args["source"] == "Spotify":
+            from SpotifyConverterClass import SpotifyConverter
+            converter = SpotifyConverter(ytm_client, sp_client, self.args["keep_dupes"], METRICS=self.metrics,
+                REPORTER=self.reporter)
+        else:
+            from YouTubeConverterClass import YouTubeMusicConverter
+            converter = YouTubeMusicConverter(ytm_client, sp_client, self.args["keep_dupes"],
+                self.args["downloads"], METRICS=self.metrics, REPORTER=self.reporter)
+        return converter, method_name, takes_playlist_ID
+
+    '''
+    Controls (called from the window)
+    '''
+    def pause(self) -> None:
+        self.running.clear()
+        self.paused.emit(True)
+        return
+
+    def resume(self) -> None:
+        self.running.set()
+        self.paused.emit(False)
+        return
+
+    def cancel(self) -> None:
+        self.cancel_requested.set()
+        # Wake up a paused conversion so that it can stop
+        self.running.set()
+        return
+
+    def wait_if_paused(self) -> None:
+        '''
+        Called by the conversion for each song: block while the conversion is paused, and raise
+        ConversionCancelled if it was cancelled.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        self.running.wait()
+        if self.cancel_requested.is_set():
+            raise ConversionCancelled()
+        return
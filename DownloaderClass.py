@@ -0,0 +1,164 @@
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+def fetch_YT_audio(video_ID: str, directory: str, ytdl_options: dict) -> tuple[str, str]:
+    '''
+    Download the best audio stream of a YouTube video (without converting it).\n
+    Parameters:
+    - (str) video_ID: YouTube videoId
+    - (str) directory: directory in which the audio file is saved
+    - (dict) ytdl_options: youtube_dl options shared by every download (copied, never modified)\n
+    Return:
+    - (tuple[str, str]) path of the downloaded audio file and title of the video
+    '''
+    # Imported here so that youtube_dl (slow to import) is only loaded when videos are downloaded
+    import youtube_dl
+    options = dict(ytdl_options, outtmpl=os.path.join(directory, "%(id)s.%(ext)s"))
+    with youtube_dl.YoutubeDL(options) as ytdl:
+        info = ytdl.extract_info("https://www.youtube.com/watch?v=" + video_ID, download=True)
+        return ytdl.prepare_filename(info), info["title"]
+
+def transcode_to_mp3(source_path: str, target_path: str, quality: str) -> str:
+    '''
+    Convert an audio file to MP3 with FFmpeg, then delete the original file. The MP3 is written
+    under a temporary name and renamed once complete, so an interrupted conversion is never
+    mistaken for a finished download.\n
+    Parameters:
+    - (str) source_path: path of the downloaded audio file
+    - (str) target_path: path of the MP3 file to create
+    - (str) quality: MP3 bitrate (eg. "192k")\n
+    Return:
+    - (str) target_path
+    '''
+    partial_path = target_path + ".part"
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", source_path, "-vn",
+        "-codec:a", "libmp3lame", "-b:a", quality, "-f", "mp3", partial_path], check=True)
+    os.replace(partial_path, target_path)
+    os.remove(source_path)
+    return target_path
+
+class Downloader():
+    ''' IO_WORKERS: number of videos downloaded at once '''
+    IO_WORKERS = 4
+
+    ''' MP3_QUALITY: bitrate of the converted MP3 files '''
+    MP3_QUALITY = "192k"
+
+    ''' UNSAFE_FILENAME_PATTERN: characters replaced in file and directory names '''
+    UNSAFE_FILENAME_PATTERN = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+    def __init__(self, ytdl_options: dict = None, io_workers: int = IO_WORKERS, transcode_workers: int = None,
+                 fetch_func=None, transcode_func=None) -> None:
+        '''
+        Downloads YouTube videos as MP3 files in two stages: a pool of threads downloads the audio
+        streams, and each finished download is converted to MP3 by a pool of FFmpeg processes (one
+        per CPU core by default) while the next ones are still downloading. Videos whose MP3 file
+        already exists are skipped. MP3 files are named "<title>-<videoId>.mp3".\n
+        Parameters:
+        - (dict) ytdl_options: youtube_dl options used for every download (see Converter.YTDL_OPTIONS)
+        - (int) io_workers: number of videos downloaded at once
+        - (int) transcode_workers: number of FFmpeg processes (None to use the number of CPU cores)
+        - (function) fetch_func: function that downloads a video given its ID and a directory and returns
+            the path of the audio file and the title of the video (None to use fetch_YT_audio), eg. a
+            function that copies local media files when testing without network access
+        - (function) transcode_func: module-level function that converts source_path to the MP3 file
+            target_path given quality (None to use transcode_to_mp3)
+        '''
+        self.ytdl_options = ytdl_options or {}
+        self.io_workers = io_workers
+        self.transcode_workers = transcode_workers or os.cpu_count()
+        self.fetch_func = fetch_func or (
+            lambda video_ID, directory: fetch_YT_audio(video_ID, directory, self.ytdl_options))
+        self.transcode_func = transcode_func or transcode_to_mp3
+        pass
+
+    def download(self, jobs: list[dict], progress_func=None) -> list[dict]:
+        '''
+        Given a list of videos to download, download and convert all of them. A video listed more than
+        once for the same directory (eg. twice in a playlist, or in two playlists whose names give the same
+        directory) is only downloaded once, since both downloads would write the same files.\n
+        Parameters:
+        - (list[dict]) jobs: dicts with the "id" of a video, the "directory" in which its MP3 file is saved,
+            and any other keys used by progress_func (eg. "query")
+        - (function) progress_func: function called with each job and its result as soon as the job
+            finishes (None to not report progress)\n
+        Return:
+        - (list[dict]) result of each job, in the same order as jobs: dicts with "status" ("downloaded",
+            "skipped" or "failed"), "path" of the MP3 file (None if failed) and "error" (None unless failed);
+            duplicates of a job are "skipped" (or "failed" if that job failed)
+        '''
+        results = [None] * len(jobs)
+        # Index of the first job of each (video, directory) -> indexes of the later jobs with the same ones
+        duplicates = {}
+        first_indexes = {}
+        for index, job in enumerate(jobs):
+            key = (job["id"], os.path.normcase(os.path.abspath(job["directory"])))
+            if key in first_indexes:
+                duplicates.setdefault(first_indexes[key], []).append(index)
+            else:
+                first_indexes[key] = index
+        def finish(index: int, status: str, path: str = None, error: Exception = None) -> None:
+            results[index] = {"status": status, "path": path, "error": error}
+            if progress_func:
+                progress_func(jobs[index], results[index])
+            for duplicate_index in duplicates.get(index, []):
+                finish(duplicate_index, "failed" if status == "failed" else "skipped", path, error)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.io_workers) as io_pool, \
+                ProcessPoolExecutor(max_workers=self.transcode_workers) as transcode_pool:
+            fetches = {}
+            for index in first_indexes.values():
+                job = jobs[index]
+                os.makedirs(job["directory"], exist_ok=True)
+                existing_path = self.get_downloaded_path(job["id"], job["directory"])
+                if existing_path:
+                    finish(index, "skipped", existing_path)
+                else:
+                    fetches[io_pool.submit(self.fetch_func, job["id"], job["directory"])] = index
+            transcodes = {}
+            for future in as_completed(fetches):
+                index = fetches[future]
+                try:
+                    source_path, title = future.result()
+                except Exception as exception:
+                    finish(index, "failed", error=exception)
+                    continue
+                target_path = os.path.join(jobs[index]["directory"],
+                    f"{self.get_safe_filename(title)}-{jobs[index]['id']}.mp3")
+                transcodes[transcode_pool.submit(self.transcode_func, source_path, target_path,
+                    self.MP3_QUALITY)] = index
+            for future in as_completed(transcodes):
+                index = transcodes[future]
+                try:
+                    finish(index, "downloaded", future.result())
+                except Exception as exception:
+                    finish(index, "failed", error=exception)
+        return results
+
+    def get_downloaded_path(self, video_ID: str, directory: str) -> str:
+        '''
+        Given a video, return the path of its MP3 file if it was already downloaded.\n
+        Parameters:
+        - (str) video_ID: YouTube videoId
+        - (str) directory: directory in which its MP3 file is saved\n
+        Return:
+        - (str) path of the MP3 file, or None if it was not downloaded yet
+        '''
+        suffix = f"-{video_ID}.mp3"
+        for filename in os.listdir(directory):
+            if filename.endswith(suffix):
+                return os.path.join(directory, filename)
+        return None
+
+    def get_safe_filename(self, name: str) -> str:
+        '''
+        Given a title or playlist name, return it with the characters that cannot be used in file names replaced.\n
+        Parameters:
+        - (str) name: title or playlist name\n
+        Return:
+        - (str) name that can be used as a file or directory name
+        '''
+        return self.UNSAFE_FILENAME_PATTERN.sub("_", name).strip(" .") or "_"
@@ -0,0 +1,131 @@
+import os
+import json
+import threading
+
+class Journal():
+    ''' DEFAULT_PATH: append-only file in which the progress of a library conversion is recorded '''
+    DEFAULT_PATH = "conversion_journal.jsonl"
+
+    def __init__(self, path: str = DEFAULT_PATH, resume: bool = False) -> None:
+        '''
+        Append-only journal of a library conversion. Every event is written as one JSON line as soon
+        as it happens, so the journal survives a crash at any point (a partially written last line
+        is ignored). If resume is True, the progress recorded by a previous run is loaded and new
+        events are appended; otherwise a new journal is started.\n
+        Events (each with the "key" of the source playlist, see Converter.get_journal_key):
+        - "start": destination playlist was created ("name", "destination")
+        - "track": track/album at "index" with ID "source_id" was matched to "match" (None if not found)
+        - "write": "written" IDs have been written to the destination playlist so far
+        - "done": playlist was fully converted ("not_added" = its songs/albums that were not added)
+        '''
+        self.path = path
+        self.progress = {}
+        self.lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self.load()
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        pass
+
+    def load(self) -> None:
+        '''
+        Read the events of a previous run and rebuild the progress of each playlist. Anything after
+        the last complete event (ie. a line the previous run crashed while writing) is cut off so that
+        new events are appended after it.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with open(self.path, "rb+") as file:
+            end = 0
+            for line in file:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self.apply(event)
+                end += len(line)
+            file.truncate(end)
+        return
+
+    def apply(self, event: dict) -> None:
+        '''
+        Update the progress of a playlist with one event.\n
+        Parameters:
+        - (dict) event: journal event\n
+        Return:
+        - None
+        '''
+        progress = self.progress.setdefault(event["key"],
+            {"name": None, "destination": None, "matches": {}, "written": 0, "done": False, "not_added": None})
+        if event["event"] == "start":
+            progress["name"] = event["name"]
+            progress["destination"] = event["destination"]
+        elif event["event"] == "track":
+            progress["matches"][event["index"]] = (event["source_id"], event["match"])
+        elif event["event"] == "write":
+            progress["written"] = event["written"]
+        elif event["event"] == "done":
+            progress["done"] = True
+            progress["not_added"] = event["not_added"]
+        return
+
+    def record(self, event: dict, sync: bool = False) -> None:
+        '''
+        Append an event to the journal.\n
+        Parameters:
+        - (dict) event: journal event
+        - (bool) sync: whether to also force the event to disk (used for events that follow a write
+            to the destination playlist)\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.apply(event)
+            self.file.write(json.dumps(event) + "\n")
+            self.file.flush()
+            if sync:
+                os.fsync(self.file.fileno())
+        return
+
+    def get_progress(self, key: str) -> dict:
+        '''
+        Return the recorded progress of a playlist.\n
+        Parameters:
+        - (str) key: journal key of the source playlist\n
+        Return:
+        - (dict) dict with "name", "destination", "matches" ({index: (source_id, match)}), "written",
+            "done" and "not_added", or None if nothing was recorded for the playlist
+        '''
+        with self.lock:
+            return self.progress.get(key)
+
+    def record_start(self, key: str, name: str, destination: str) -> None:
+        self.record({"event": "start", "key": key, "name": name, "destination": destination}, sync=True)
+        return
+
+    def record_track(self, key: str, index: int, source_ID: str, match_ID: str) -> None:
+        self.record({"event": "track", "key": key, "index": index, "source_id": source_ID, "match": match_ID})
+        return
+
+    def record_write(self, key: str, written: int) -> None:
+        self.record({"event": "write", "key": key, "written": written}, sync=True)
+        return
+
+    def record_done(self, key: str, not_added) -> None:
+        self.record({"event": "done", "key": key, "not_added": not_added}, sync=True)
+        return
+
+    def close(self) -> None:
+        '''
+        Close the journal file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.file.close()
+        return
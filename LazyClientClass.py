@@ -0,0 +1,31 @@
+import threading
+
+class LazyClient():
+    def __init__(self, create_client) -> None:
+        '''
+        Wraps a function that creates an API client (eg. authenticates and returns a spotipy.Spotify) so
+        that the client is only created (and its library only imported) when it is first used, instead
+        of when the program starts.\n
+        NOTE: Any attribute lookup creates the client, including hasattr and getattr with a default.
+        '''
+        self.create_client = create_client
+        self.client = None
+        self.lock = threading.Lock()
+        pass
+
+    def __getattr__(self, name: str):
+        return getattr(self.get_client(), name)
+
+    def get_client(self):
+        '''
+        Return the client, creating it first if this is the first time it is used.\n
+        Parameters:
+        - None\n
+        Return:
+        - (any) API client returned by create_client
+        '''
+        if self.client is None:
+            with self.lock:
+                if self.client is None:
+                    self.client = self.create_client()
+        return self.client
@@ -0,0 +1,76 @@
+import threading
+from TrackInfoClass import TrackInfo
+
+class MatchMemo():
+    def __init__(self) -> None:
+        '''
+        In-memory memo of the matches resolved during one run (eg. one library conversion), so that a
+        song found on several playlists is only matched once. Songs are looked up by their source ID,
+        and otherwise by their normalized title, artist and duration (eg. the same song on Spotify
+        under a different ID, or a YouTube Music upload of the same song).
+        '''
+        self.matches = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        pass
+
+    def get(self, song_info: TrackInfo) -> tuple[bool, str]:
+        '''
+        Given a source song, return its memoized match.\n
+        Parameters:
+        - (TrackInfo) song_info: record of the source song\n
+        Return:
+        - (tuple[bool, str]) whether the song was matched earlier in this run, and the ID of its match
+            (None if it was not found)
+        '''
+        with self.lock:
+            for key in self.get_keys(song_info):
+                if key in self.matches:
+                    self.hits += 1
+                    return True, self.matches[key]
+            self.misses += 1
+        return False, None
+
+    def put(self, song_info: TrackInfo, match_ID: str) -> None:
+        '''
+        Given a source song and the ID of its match, memoize the match.\n
+        Parameters:
+        - (TrackInfo) song_info: record of the source song
+        - (str) match_ID: ID of the match on the destination platform (None if not found)\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            for key in self.get_keys(song_info):
+                self.matches[key] = match_ID
+        return
+
+    def get_keys(self, song_info: TrackInfo) -> list[tuple]:
+        '''
+        Given a source song, return the keys under which its match is memoized, in lookup order.\n
+        Parameters:
+        - (TrackInfo) song_info: record of the source song\n
+        Return:
+        - (list[tuple]) source ID key (if the song has an ID) and title/artist/duration key
+        '''
+        keys = [("id", song_info.id)] if song_info.id else []
+        keys.append(("song", song_info.title_normalized, song_info.artist_normalized,
+            round(song_info.duration_seconds)))
+        return keys
+
+    def get_stats(self) -> dict:
+        '''
+        Return the hit/miss counters of this memo.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of hits (ie. lookups saved), misses, memoized songs and hit rate
+        '''
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.matches),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
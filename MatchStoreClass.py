@@ -0,0 +1,200 @@
+import json
+import sqlite3
+import threading
+import time
+
+class MatchStore():
+    ''' DEFAULT_PATH: file in which resolved Spotify <-> YouTube Music matches are stored '''
+    DEFAULT_PATH = "match_store.sqlite"
+
+    ''' SP_SOURCE: string constant for the word "Spotify" (same as Converter.SP_SOURCE) '''
+    SP_SOURCE = "Spotify"
+
+    ''' YT_SOURCE: string constant for the words "YouTube Music" (same as Converter.YT_SOURCE) '''
+    YT_SOURCE = "YouTube Music"
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS matches (
+                sp_id TEXT NOT NULL,
+                yt_id TEXT NOT NULL,
+                score REAL NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (sp_id, yt_id))''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS matches_yt_id ON matches (yt_id)")
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS isrcs (
+                platform TEXT NOT NULL,
+                id TEXT NOT NULL,
+                isrc TEXT NOT NULL,
+                PRIMARY KEY (platform, id))''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS isrcs_isrc ON isrcs (platform, isrc)")
+        self.conn.commit()
+        pass
+
+    def get_match(self, source: str, source_ID: str) -> str:
+        '''
+        Given a source platform and a song ID on that platform, return the ID of the song it was
+        most recently matched to on the other platform.\n
+        Parameters:
+        - (str) source: platform of source_ID (self.SP_SOURCE or self.YT_SOURCE)
+        - (str) source_ID: Spotify track ID or YouTube Music videoId\n
+        Return:
+        - (str) matched YouTube Music videoId or Spotify track ID, or None if there is no stored match
+        '''
+        if source == self.SP_SOURCE:
+            sql = "SELECT yt_id FROM matches WHERE sp_id=? ORDER BY updated DESC LIMIT 1"
+        else:
+            sql = "SELECT sp_id FROM matches WHERE yt_id=? ORDER BY updated DESC LIMIT 1"
+        with self.lock:
+            row = self.conn.execute(sql, (source_ID,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def add_match(self, source: str, source_ID: str, match_ID: str, score: float) -> None:
+        '''
+        Given a source song ID and the ID of its best match on the other platform, store the match.\n
+        Parameters:
+        - (str) source: platform of source_ID (self.SP_SOURCE or self.YT_SOURCE)
+        - (str) source_ID: Spotify track ID or YouTube Music videoId of the source song
+        - (str) match_ID: YouTube Music videoId or Spotify track ID of the matched song
+        - (float) score: score with which match_ID was chosen\n
+        Return:
+        - None
+        '''
+        if source == self.SP_SOURCE:
+            sp_ID, yt_ID = source_ID, match_ID
+        else:
+            sp_ID, yt_ID = match_ID, source_ID
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matches (sp_id, yt_id, score, updated) VALUES (?, ?, ?, ?)",
+                (sp_ID, yt_ID, score, time.time()))
+            self.conn.commit()
+        return
+
+    def add_ISRCs(self, platform: str, ID_ISRC_pairs: list[tuple[str, str]]) -> None:
+        '''
+        Given songs on a platform and their ISRCs, store the ISRC of each song.\n
+        Parameters:
+        - (str) platform: platform of the songs (self.SP_SOURCE or self.YT_SOURCE)
+        - (list[tuple[str, str]]) ID_ISRC_pairs: (Spotify track ID or YouTube Music videoId, ISRC) pairs\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO isrcs (platform, id, isrc) VALUES (?, ?, ?)",
+                [(platform, ID, isrc) for ID, isrc in ID_ISRC_pairs])
+            self.conn.commit()
+        return
+
+    def get_ISRC(self, platform: str, ID: str) -> str:
+        '''
+        Given a song on a platform, return its stored ISRC.\n
+        Parameters:
+        - (str) platform: platform of the song (self.SP_SOURCE or self.YT_SOURCE)
+        - (str) ID: Spotify track ID or YouTube Music videoId\n
+        Return:
+        - (str) ISRC, or None if it is not known
+        '''
+        with self.lock:
+            row = self.conn.execute("SELECT isrc FROM isrcs WHERE platform=? AND id=?", (platform, ID)).fetchone()
+        return row[0] if row else None
+
+    def get_ID_by_ISRC(self, platform: str, isrc: str) -> str:
+        '''
+        Given an ISRC, return the most recently stored song with that ISRC on a platform.\n
+        Parameters:
+        - (str) platform: platform of the song to return (self.SP_SOURCE or self.YT_SOURCE)
+        - (str) isrc: ISRC\n
+        Return:
+        - (str) Spotify track ID or YouTube Music videoId, or None if no song with the ISRC is stored
+        '''
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM isrcs WHERE platform=? AND isrc=? ORDER BY rowid DESC LIMIT 1",
+                (platform, isrc)).fetchone()
+        return row[0] if row else None
+
+    def export_matches(self, path: str) -> int:
+        '''
+        Write all stored matches (and ISRCs) to a JSON file so that they can be shared with other users.\n
+        Parameters:
+        - (str) path: path of the JSON file to write\n
+        Return:
+        - (int) number of matches written
+        '''
+        with self.lock:
+            rows = self.conn.execute("SELECT sp_id, yt_id, score, updated FROM matches").fetchall()
+            isrc_rows = self.conn.execute("SELECT platform, id, isrc FROM isrcs").fetchall()
+        matches = [{"sp_id": sp_ID, "yt_id": yt_ID, "score": score, "updated": updated}
+            for sp_ID, yt_ID, score, updated in rows]
+        isrcs = [{"platform": platform, "id": ID, "isrc": isrc} for platform, ID, isrc in isrc_rows]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"matches": matches, "isrcs": isrcs}, file)
+        return len(matches)
+
+    def import_matches(self, path: str) -> int:
+        '''
+        Merge matches (and ISRCs) from a JSON file written by self.export_matches into this store. When
+        a match already exists, the more recently updated copy is kept. Files written before ISRCs were
+        exported (a plain list of matches) are also accepted.\n
+        Parameters:
+        - (str) path: path of the JSON file to read\n
+        Return:
+        - (int) number of matches read
+        '''
+        with open(path, encoding="utf-8") as file:
+            exported = json.load(file)
+        if isinstance(exported, list):
+            exported = {"matches": exported, "isrcs": []}
+        matches = exported["matches"]
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO isrcs (platform, id, isrc) VALUES (?, ?, ?)",
+                [(isrc["platform"], isrc["id"], isrc["isrc"]) for isrc in exported["isrcs"]])
+            self.conn.executemany(
+                '''INSERT INTO matches (sp_id, yt_id, score, updated) VALUES (?, ?, ?, ?)
+                ON CONFLICT (sp_id, yt_id) DO UPDATE SET score=excluded.score, updated=excluded.updated
+                WHERE excluded.updated > matches.updated''',
+                [(match["sp_id"], match["yt_id"], match["score"], match["updated"]) for match in matches])
+            self.conn.commit()
+        return len(matches)
+
+    def get_stats(self) -> dict:
+        '''
+        Return the hit/miss counters of this store.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of hits, misses, stored matches and hit rate
+        '''
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        '''
+        Close the connection to the store file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.conn.close()
+        return
@@ -0,0 +1,222 @@
+import time
+import bisect
+import threading
+import contextlib
+import contextvars
+
+''' CURRENT_PLAYLIST: name of the playlist being converted by the current thread or task (see Metrics.playlist) '''
+CURRENT_PLAYLIST = contextvars.ContextVar("CURRENT_PLAYLIST", default=None)
+
+class Metrics():
+    ''' BUCKETS: upper bounds (in seconds) of the buckets of every latency histogram '''
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    ''' API_PREFIX: prefix of the names of timings of API client calls (see InstrumentedClient) '''
+    API_PREFIX = "api "
+
+    def __init__(self) -> None:
+        '''
+        Thread-safe collector of run metrics: a latency histogram for every timed phase (eg. "search")
+        and API client call, counters, and a breakdown of both per playlist. Recording a timing costs a
+        few microseconds, so metrics are always collected.\n
+        NOTE: Timings are attributed to the playlist set with self.playlist in the current context.
+        Worker threads and tasks inherit it only if they run in a copy of the context of the code that
+        started them (see Converter.map_in_order).
+        '''
+        self.histograms = {}
+        self.counters = {}
+        self.playlists = {}
+        self.start_time = time.perf_counter()
+        self.lock = threading.Lock()
+        pass
+
+    @contextlib.contextmanager
+    def time(self, name: str):
+        '''
+        Context manager that records how long its block took in the histogram of name.\n
+        Parameters:
+        - (str) name: name of the phase (eg. "search") or API call\n
+        Return:
+        - (context manager) timer
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def playlist(self, playlist_name: str):
+        '''
+        Context manager that attributes the metrics recorded in its block to a playlist.\n
+        Parameters:
+        - (str) playlist_name: name of the source playlist\n
+        Return:
+        - (context manager) playlist context
+        '''
+        token = CURRENT_PLAYLIST.set(playlist_name)
+        try:
+            yield
+        finally:
+            CURRENT_PLAYLIST.reset(token)
+
+    def observe(self, name: str, seconds: float) -> None:
+        '''
+        Record one timing.\n
+        Parameters:
+        - (str) name: name of the phase or API call
+        - (float) seconds: duration\n
+        Return:
+        - None
+        '''
+        bucket = bisect.bisect_left(self.BUCKETS, seconds)
+        playlist_name = CURRENT_PLAYLIST.get()
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {"buckets": [0] * (len(self.BUCKETS) + 1),
+                    "count": 0, "total": 0.0, "max": 0.0}
+            histogram["buckets"][bucket] += 1
+            histogram["count"] += 1
+            histogram["total"] += seconds
+            histogram["max"] = max(histogram["max"], seconds)
+            if playlist_name is not None:
+                totals = self.playlists.setdefault(playlist_name, {}).setdefault(name, [0, 0.0])
+                totals[0] += 1
+                totals[1] += seconds
+        return
+
+    def count(self, name: str, amount: int = 1) -> None:
+        '''
+        Add to a counter (eg. "songs.unfound").\n
+        Parameters:
+        - (str) name: name of the counter
+        - (int) amount: amount added\n
+        Return:
+        - None
+        '''
+        playlist_name = CURRENT_PLAYLIST.get()
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            if playlist_name is not None:
+                totals = self.playlists.setdefault(playlist_name, {}).setdefault(name, [0, 0.0])
+                totals[0] += amount
+        return
+
+    def reset(self) -> None:
+        '''
+        Discard every metric collected so far (eg. before starting another conversion with the same clients).\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+            self.playlists = {}
+            self.start_time = time.perf_counter()
+        return
+
+    def get_counters(self, playlist_name: str = None) -> dict:
+        '''
+        Return the counters of the whole run or of one playlist.\n
+        Parameters:
+        - (str) playlist_name: name of the playlist (None for the whole run)\n
+        Return:
+        - (dict) counter name -> count
+        '''
+        with self.lock:
+            if playlist_name is None:
+                return dict(self.counters)
+            return {name: count for name, (count, total) in self.playlists.get(playlist_name, {}).items()
+                if name not in self.histograms}
+
+    def get_elapsed(self) -> float:
+        '''
+        Return the number of seconds since the metrics were created or last reset.
+        '''
+        return time.perf_counter() - self.start_time
+
+    def get_histogram(self, name: str) -> dict:
+        '''
+        Return the summary of a latency histogram.\n
+        Parameters:
+        - (str) name: name of the phase or API call\n
+        Return:
+        - (dict) dict with count, total, mean and max seconds, 50th/95th/99th percentiles (upper bound of
+            the bucket they fall in) and the count of each bucket ("le" upper bound -> count)
+        '''
+        with self.lock:
+            histogram = self.histograms[name]
+            buckets = list(histogram["buckets"])
+            count, total, maximum = histogram["count"], histogram["total"], histogram["max"]
+        summary = {"count": count, "total": total, "mean": total / count if count else 0.0, "max": maximum}
+        for quantile in (50, 95, 99):
+            summary[f"p{quantile}"] = self.get_quantile(buckets, count, quantile / 100, maximum)
+        summary["buckets"] = {str(bound): bucket_count for bound, bucket_count
+            in zip(self.BUCKETS + (float("inf"),), buckets)}
+        return summary
+
+    def get_quantile(self, buckets: list[int], count: int, quantile: float, maximum: float) -> float:
+        '''
+        Given the bucket counts of a histogram, return the upper bound of the bucket that a quantile falls in.\n
+        Parameters:
+        - (list[int]) buckets: count of each bucket
+        - (int) count: total count
+        - (float) quantile: quantile between 0 and 1
+        - (float) maximum: largest timing (returned instead of the upper bound of the last bucket)\n
+        Return:
+        - (float) estimated quantile in seconds
+        '''
+        cumulative = 0
+        for index, bucket_count in enumerate(buckets):
+            cumulative += bucket_count
+            if count and cumulative >= quantile * count:
+                return min(self.BUCKETS[index], maximum) if index < len(self.BUCKETS) else maximum
+        return 0.0
+
+    def get_summary(self) -> dict:
+        '''
+        Return every metric collected so far.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with "elapsed" seconds, "phases" and "api_calls" (name -> histogram summary, see
+            get_histogram), "counters" and "playlists" (playlist name -> name -> {"count", "total"})
+        '''
+        with self.lock:
+            names = list(self.histograms)
+            counters = dict(self.counters)
+            playlists = {playlist_name: {name: {"count": count, "total": total} for name, (count, total)
+                in totals.items()} for playlist_name, totals in self.playlists.items()}
+        summary = {"elapsed": self.get_elapsed(), "phases": {}, "api_calls": {}, "counters": counters,
+            "playlists": playlists}
+        for name in sorted(names):
+            if name.startswith(self.API_PREFIX):
+                summary["api_calls"][name[len(self.API_PREFIX):]] = self.get_histogram(name)
+            else:
+                summary["phases"][name] = self.get_histogram(name)
+        return summary
+
+class InstrumentedClient():
+    def __init__(self, client, metrics: Metrics, platform: str) -> None:
+        '''
+        Wraps an API client (eg. spotipy.Spotify or ytmusicapi.YTMusic) so that the latency of every
+        method call is recorded in metrics (as "api <platform>.<method>").
+        '''
+        self.client = client
+        self.metrics = metrics
+        self.platform = platform
+        pass
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+        timer_name = f"{Metrics.API_PREFIX}{self.platform}.{name}"
+        def instrumented_method(*args, **kwargs):
+            with self.metrics.time(timer_name):
+                return attribute(*args, **kwargs)
+        instrumented_method.__name__ = name
+        return instrumented_method
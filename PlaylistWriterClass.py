@@ -0,0 +1,182 @@
+import time
+import logging
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+class PlaylistWriter():
+    ''' PIPELINE_DEPTH: max number of full batches queued or being written in the background while more IDs are
+        added (0 to write each batch before add returns) '''
+    PIPELINE_DEPTH = 2
+
+    ''' MAX_RETRIES: number of times a batch whose write could not be sent (see is_undelivered) is written again
+        before the error is raised. Other errors are not retried, since a write that reached the platform may
+        have been applied (eg. a timeout or HTTP 5xx after the items were added), and writing it again would
+        add its items twice; throttled requests are already retried by RateLimitedClient '''
+    MAX_RETRIES = 2
+
+    ''' RETRY_DELAY: number of seconds to wait before writing a failed batch again (doubled for each retry) '''
+    RETRY_DELAY = 1.0
+
+    def __init__(self, add_items_func, batch_size: int, already_written: int = 0, flush_callback=None,
+                 pipeline_depth: int = None) -> None:
+        '''
+        Incrementally fills a destination playlist that has already been created. IDs are buffered and
+        written with add_items_func in batches of batch_size as soon as a batch is full, and an ordered
+        set of every ID added so far is kept for O(1) duplicate checks. Full batches are written one after
+        another on a background thread (in the order they were filled), so that matching continues while
+        a batch is being written; flush waits until every batch is written.\n
+        Parameters:
+        - (function) add_items_func: function that appends a list of IDs to the destination playlist
+        - (int) batch_size: number of IDs written per call to add_items_func
+        - (int) already_written: number of IDs already on the destination playlist (eg. written by a
+            previous run that is being resumed); the first already_written IDs added are not written again
+        - (function) flush_callback: function called with the total number of IDs written after each write
+        - (int) pipeline_depth: max number of batches written in the background (None to use PIPELINE_DEPTH)
+        '''
+        self.add_items_func = add_items_func
+        self.batch_size = batch_size
+        self.items = {}
+        self.pending = []
+        self.written = already_written
+        self.skipped = 0
+        self.already_written = already_written
+        self.flush_callback = flush_callback
+        self.pipeline_depth = self.PIPELINE_DEPTH if pipeline_depth is None else pipeline_depth
+        self.executor = None
+        self.in_flight = deque()
+        self.write_calls = 0
+        self.write_retries = 0
+        self.write_latency = 0.0
+        pass
+
+    def __contains__(self, ID: str) -> bool:
+        return ID in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, ID: str) -> None:
+        '''
+        Add an ID to the destination playlist, writing a batch if enough IDs are pending.\n
+        Parameters:
+        - (str) ID: Spotify track ID or YouTube Music videoId\n
+        Return:
+        - None
+        '''
+        self.items[ID] = None
+        if self.skipped < self.already_written:
+            self.skipped += 1
+            return
+        self.pending.append(ID)
+        if len(self.pending) >= self.batch_size:
+            batch, self.pending = self.pending, []
+            self.submit(batch)
+        return
+
+    def submit(self, batch: list[str]) -> None:
+        '''
+        Queue a full batch to be written on the background thread (in a copy of the current context, see
+        Metrics.playlist), first waiting for the oldest queued batch if self.pipeline_depth batches are
+        already queued (or writing it now if pipeline_depth is 0).\n
+        Parameters:
+        - (list[str]) batch: IDs to write\n
+        Return:
+        - None
+        '''
+        if self.pipeline_depth <= 0:
+            self.write(batch)
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        while len(self.in_flight) >= self.pipeline_depth:
+            self.in_flight.popleft().result()
+        self.in_flight.append(self.executor.submit(contextvars.copy_context().run, self.write, batch))
+        return
+
+    def flush(self) -> None:
+        '''
+        Write all pending IDs to the destination playlist and wait until every queued batch is written.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        try:
+            while self.in_flight:
+                self.in_flight.popleft().result()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+        for start in range(0, len(self.pending), self.batch_size):
+            self.write(self.pending[start:start + self.batch_size])
+        self.pending = []
+        return
+
+    def write(self, batch: list[str]) -> None:
+        '''
+        Write one batch with add_items_func, writing it again (up to MAX_RETRIES times) if it could not be sent.\n
+        Parameters:
+        - (list[str]) batch: IDs to write\n
+        Return:
+        - None
+        '''
+        for attempt in range(self.MAX_RETRIES + 1):
+            start = time.perf_counter()
+            try:
+                self.add_items_func(batch)
+                error = None
+            except Exception as exception:
+                error = exception
+            self.write_calls += 1
+            self.write_latency += time.perf_counter() - start
+            if error is None:
+                break
+            if attempt == self.MAX_RETRIES or not self.is_undelivered(error):
+                raise error
+            delay = self.RETRY_DELAY * (2 ** attempt)
+            logging.warning(f"Writing {len(batch)} items failed ({error!r}), retrying in {delay:.1f}s")
+            self.write_retries += 1
+            time.sleep(delay)
+        self.written += len(batch)
+        if self.flush_callback:
+            self.flush_callback(self.written)
+        return
+
+    def is_undelivered(self, exception: Exception) -> bool:
+        '''
+        Given an error raised by add_items_func, return whether it proves that the write never reached the
+        platform, ie. the connection was refused before the request was sent.\n
+        Parameters:
+        - (Exception) exception: exception raised by the API client (eg. requests.ConnectionError)\n
+        Return:
+        - (bool) True if the write can safely be sent again
+        '''
+        seen = set()
+        while exception is not None and id(exception) not in seen:
+            if isinstance(exception, ConnectionRefusedError):
+                return True
+            seen.add(id(exception))
+            # urllib3 keeps the underlying error of a failed connection in MaxRetryError.reason
+            reason = getattr(exception, "reason", None)
+            if isinstance(reason, BaseException):
+                exception = reason
+            else:
+                exception = exception.__cause__ or exception.__context__
+        return False
+
+    def get_stats(self) -> dict:
+        '''
+        Return the write counters of this writer.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of IDs written, write calls (including retries), retries and total write latency
+        '''
+        return {
+            "written": self.written - self.already_written,
+            "calls": self.write_calls,
+            "retries": self.write_retries,
+            "latency": self.write_latency,
+        }
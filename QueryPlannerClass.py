@@ -0,0 +1,210 @@
+import sqlite3
+import threading
+
+class QueryPlanner():
+    ''' DEFAULT_PATH: file in which the stats of the search query templates are stored '''
+    DEFAULT_PATH = "query_planner.sqlite"
+
+    ''' MIN_LOOKUPS: number of lookups recorded for a platform before its queries are reordered, dropped or
+        limited (until then, every template is searched with the full result limit) '''
+    MIN_LOOKUPS = 100
+
+    ''' MIN_SENT: number of times a template must have been searched before its win rate is trusted (a
+        template with fewer searches is kept, after the templates that win more often) '''
+    MIN_SENT = 20
+
+    ''' MIN_WIN_RATE: share of its searches in which a template must produce the best match to be kept '''
+    MIN_WIN_RATE = 0.02
+
+    ''' EXPLORE_INTERVAL: every EXPLORE_INTERVAL-th lookup of a platform searches every template with the full
+        result limit, so that dropped templates and lower ranks keep being measured '''
+    EXPLORE_INTERVAL = 20
+
+    ''' RANK_COVERAGE: share of the best matches whose rank must be within the result limit '''
+    RANK_COVERAGE = 0.99
+
+    ''' MIN_LIMIT: smallest result limit a search is shrunk to '''
+    MIN_LIMIT = 3
+
+    ''' FLUSH_INTERVAL: number of lookups recorded between two writes of the stats to disk (the stats of at most
+        that many lookups are lost if the program stops without calling close) '''
+    FLUSH_INTERVAL = 100
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        '''
+        Learns which search query templates (eg. "title by artist") produce the best match of a song,
+        and at which rank of the search results, and plans the queries of later lookups accordingly:
+        templates are searched in order of how often they win, templates that rarely win are not searched,
+        and the number of results requested is shrunk to the ranks at which best matches are found. Stats are
+        stored on disk, so that what is learned in one run is used by the next ones.
+        '''
+        self.path = path
+        self.explored = 0
+        self.skipped = 0
+        self.planned = {}
+        self.default_limits = {}
+        self.unflushed = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS lookups (
+                platform TEXT NOT NULL PRIMARY KEY,
+                lookups INTEGER NOT NULL)''')
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS templates (
+                platform TEXT NOT NULL,
+                template TEXT NOT NULL,
+                sent INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                PRIMARY KEY (platform, template))''')
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS ranks (
+                platform TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                PRIMARY KEY (platform, rank))''')
+        self.conn.commit()
+        self.lookups = dict(self.conn.execute("SELECT platform, lookups FROM lookups"))
+        self.templates = {}
+        for platform, template, sent, wins in self.conn.execute("SELECT platform, template, sent, wins FROM templates"):
+            self.templates.setdefault(platform, {})[template] = [sent, wins]
+        self.ranks = {}
+        for platform, rank, wins in self.conn.execute("SELECT platform, rank, wins FROM ranks"):
+            self.ranks.setdefault(platform, {})[rank] = wins
+        pass
+
+    def plan(self, platform: str, queries: dict, limit: int) -> tuple[list[tuple[str, str]], int]:
+        '''
+        Given the search queries of a song, return the ones to search, in order, and the result limit.\n
+        Parameters:
+        - (str) platform: platform being searched (eg. Converter.YT_SOURCE)
+        - (dict) queries: template name -> search query, in default order
+        - (int) limit: default number of results requested per search\n
+        Return:
+        - (tuple[list[tuple[str, str]], int]) (template name, query) pairs to search and number of results
+            to request per search
+        '''
+        with self.lock:
+            planned = self.planned[platform] = self.planned.get(platform, 0) + 1
+            self.default_limits[platform] = limit
+            if self.lookups.get(platform, 0) < self.MIN_LOOKUPS:
+                return list(queries.items()), limit
+            if planned % self.EXPLORE_INTERVAL == 0:
+                self.explored += 1
+                return list(queries.items()), limit
+            win_rates = {template: self.get_win_rate(platform, template) for template in queries}
+            # sorted is stable, so templates that win equally often stay in default order
+            ordered = sorted(queries, key=lambda template: win_rates[template], reverse=True)
+            kept = [template for template in ordered if win_rates[template] >= self.MIN_WIN_RATE] or ordered[:1]
+            self.skipped += len(queries) - len(kept)
+            return [(template, queries[template]) for template in kept], self.get_limit(platform, limit)
+
+    def record(self, platform: str, sent: list[str], winner: str = None, rank: int = None) -> None:
+        '''
+        Given the templates searched for a song, record which one produced its best match and at which rank.\n
+        Parameters:
+        - (str) platform: platform that was searched
+        - (list[str]) sent: names of the templates that were searched
+        - (str) winner: name of the template whose results contained the best match (None if not found)
+        - (int) rank: position of the best match in the response of the search of winner, counting results
+            that are filtered out (see TrackInfo.rank), so that a result limit of rank + 1 includes it\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.lookups[platform] = self.lookups.get(platform, 0) + 1
+            templates = self.templates.setdefault(platform, {})
+            for template in sent:
+                stats = templates.setdefault(template, [0, 0])
+                stats[0] += 1
+                stats[1] += template == winner
+            if winner is not None:
+                ranks = self.ranks.setdefault(platform, {})
+                ranks[rank] = ranks.get(rank, 0) + 1
+            self.unflushed += 1
+            if self.unflushed >= self.FLUSH_INTERVAL:
+                self.flush()
+        return
+
+    def flush(self) -> None:
+        '''
+        Write the stats to disk (the caller must hold self.lock).\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        self.conn.executemany("INSERT OR REPLACE INTO lookups (platform, lookups) VALUES (?, ?)",
+            list(self.lookups.items()))
+        self.conn.executemany("INSERT OR REPLACE INTO templates (platform, template, sent, wins) VALUES (?, ?, ?, ?)",
+            [(platform, template, sent, wins) for platform, templates in self.templates.items()
+                for template, (sent, wins) in templates.items()])
+        self.conn.executemany("INSERT OR REPLACE INTO ranks (platform, rank, wins) VALUES (?, ?, ?)",
+            [(platform, rank, wins) for platform, ranks in self.ranks.items() for rank, wins in ranks.items()])
+        self.conn.commit()
+        self.unflushed = 0
+        return
+
+    def get_win_rate(self, platform: str, template: str) -> float:
+        '''
+        Given a template, return the share of its searches that produced the best match (MIN_WIN_RATE if it
+        was searched fewer than MIN_SENT times).
+        '''
+        sent, wins = self.templates.get(platform, {}).get(template, (0, 0))
+        return wins / sent if sent >= self.MIN_SENT else self.MIN_WIN_RATE
+
+    def get_limit(self, platform: str, limit: int) -> int:
+        '''
+        Given a platform, return the smallest result limit (at least MIN_LIMIT and at most limit) within
+        which RANK_COVERAGE of its best matches were found.
+        '''
+        ranks = self.ranks.get(platform, {})
+        wins = sum(ranks.values())
+        if wins < self.MIN_LOOKUPS:
+            return limit
+        covered = 0
+        for rank in sorted(ranks):
+            covered += ranks[rank]
+            if covered >= self.RANK_COVERAGE * wins:
+                return min(limit, max(self.MIN_LIMIT, rank + 1))
+        return limit
+
+    def get_stats(self) -> dict:
+        '''
+        Return the stats of this planner.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of queries skipped and lookups that searched every template in this run,
+            and for each platform the number of lookups recorded, the win rate of each template and the
+            result limit planned in this run (None if the platform was not searched)
+        '''
+        with self.lock:
+            platforms = {}
+            for platform, lookups in self.lookups.items():
+                templates = self.templates.get(platform, {})
+                platforms[platform] = {
+                    "lookups": lookups,
+                    "templates": {template: {"sent": sent, "wins": wins, "win_rate": wins / sent if sent else 0.0}
+                        for template, (sent, wins) in templates.items()},
+                    "limit": self.get_limit(platform, self.default_limits[platform])
+                        if platform in self.default_limits and lookups >= self.MIN_LOOKUPS
+                        else self.default_limits.get(platform),
+                }
+            return {"skipped": self.skipped, "explored": self.explored, "platforms": platforms}
+
+    def close(self) -> None:
+        '''
+        Write the stats to disk and close the connection to the planner file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            if self.unflushed:
+                self.flush()
+            self.conn.close()
+        return
@@ -0,0 +1,118 @@
+import re
+import time
+import logging
+import functools
+
+class RateLimitedClient():
+    ''' MAX_RETRIES: number of times a throttled or failed request is retried before the error is raised '''
+    MAX_RETRIES = 5
+
+    ''' THROTTLE_STATUSES: HTTP status codes of requests that the platform refused because too many requests were
+        sent (429 = too many requests), which slow down every request to the platform and are retried for every
+        method, since a refused request was not applied '''
+    THROTTLE_STATUSES = (429,)
+
+    ''' SERVER_ERROR_STATUSES: HTTP status codes of requests that failed on the platform's side, which are only
+        retried for READ_METHODS, since a write may have been applied before it failed (eg. retrying
+        playlist_add_items would add its tracks twice) '''
+    SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+    ''' READ_METHODS: client methods that only read, and can safely be called again after a server error '''
+    READ_METHODS = frozenset((
+        "search", "next", "me", "playlist", "playlist_tracks", "playlist_items", "current_user_playlists",
+        "current_user_saved_tracks", "current_user_saved_albums", "get_album", "get_playlist",
+        "get_library_playlists", "get_library_songs", "get_liked_songs", "get_library_albums"))
+
+    ''' SERVER_ERROR_DELAY: seconds to wait before retrying a read that failed with a server error (doubled for
+        each retry) '''
+    SERVER_ERROR_DELAY = 1.0
+
+    def __init__(self, client, rate_limiter) -> None:
+        '''
+        Wraps an API client (eg. spotipy.Spotify or ytmusicapi.YTMusic) so that every method call
+        waits for rate_limiter and is retried when the platform throttles it.\n
+        NOTE: A method that makes several requests internally (eg. ytm_client.get_playlist with 
+        limit=None) only takes one token from rate_limiter.
+        '''
+        self.client = client
+        self.rate_limiter = rate_limiter
+        pass
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+        @functools.wraps(attribute)
+        def rate_limited_method(*args, **kwargs):
+            return self.call(attribute, *args, **kwargs)
+        return rate_limited_method
+
+    def call(self, method, *args, **kwargs):
+        '''
+        Call a client method once rate_limiter allows it, retrying throttled requests and reads that failed
+        with a server error (see THROTTLE_STATUSES and SERVER_ERROR_STATUSES).\n
+        Parameters:
+        - (function) method: method of self.client
+        - (list) args, (dict) kwargs: arguments of the method\n
+        Return:
+        - (any) return value of the method
+        '''
+        for attempt in range(self.MAX_RETRIES + 1):
+            waited = self.rate_limiter.acquire()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as exception:
+                status_code = self.get_status_code(exception)
+                if attempt == self.MAX_RETRIES:
+                    raise
+                if status_code in self.THROTTLE_STATUSES:
+                    delay = self.rate_limiter.throttle(self.get_retry_after(exception), attempt)
+                    logging.warning(f"{self.rate_limiter.name} {method.__name__} returned HTTP {status_code}, "
+                        + f"retrying in {delay:.1f}s (rate: {self.rate_limiter.rate:.2f} requests/s)")
+                elif status_code in self.SERVER_ERROR_STATUSES and method.__name__ in self.READ_METHODS:
+                    # A server error says nothing about the request rate, so only this request waits
+                    delay = self.SERVER_ERROR_DELAY * (2 ** attempt)
+                    logging.warning(f"{self.rate_limiter.name} {method.__name__} returned HTTP {status_code}, "
+                        + f"retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                else:
+                    raise
+                continue
+            self.rate_limiter.succeed()
+            logging.debug(f"{self.rate_limiter.name} {method.__name__} waited {waited:.3f}s")
+            return result
+
+    def get_status_code(self, exception: Exception) -> int:
+        '''
+        Given an exception raised by an API client, return the HTTP status code of the failed request.\n
+        Parameters:
+        - (Exception) exception: exception raised by spotipy (SpotifyException), ytmusicapi or requests\n
+        Return:
+        - (int) HTTP status code, or None if the exception is not an HTTP error
+        '''
+        status_code = getattr(exception, "http_status", None)
+        if status_code is None:
+            status_code = getattr(getattr(exception, "response", None), "status_code", None)
+        if status_code is None:
+            # ytmusicapi only reports the status code in the error message
+            match = re.search(r"HTTP (\d{3})", str(exception))
+            status_code = int(match.group(1)) if match else None
+        return status_code
+
+    def get_retry_after(self, exception: Exception) -> float:
+        '''
+        Given an exception raised by an API client, return the Retry-After header of the failed request.\n
+        Parameters:
+        - (Exception) exception: exception raised by spotipy (SpotifyException), ytmusicapi or requests\n
+        Return:
+        - (float) number of seconds to wait before retrying, or None if there is no Retry-After header
+        '''
+        headers = getattr(exception, "headers", None)
+        if headers is None:
+            headers = getattr(getattr(exception, "response", None), "headers", None)
+        if not headers or headers.get("Retry-After") is None:
+            return None
+        try:
+            return float(headers.get("Retry-After"))
+        except ValueError:
+            return None
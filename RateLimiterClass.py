@@ -0,0 +1,124 @@
+import threading
+import time
+
+class RateLimiter():
+    ''' BACKOFF_FACTOR: factor by which the request rate is multiplied each time the platform throttles a request '''
+    BACKOFF_FACTOR = 0.5
+
+    ''' RECOVERY_STEP: requests/second added back to the request rate after each successful request
+        (until the rate is back to max_rate) '''
+    RECOVERY_STEP = 0.1
+
+    ''' MIN_RATE: lowest request rate (requests/second) to which the rate limiter backs off '''
+    MIN_RATE = 0.2
+
+    ''' BASE_DELAY: seconds to pause all requests after a throttled request without a Retry-After header
+        (doubled for each consecutive retry of the same request) '''
+    BASE_DELAY = 1.0
+
+    def __init__(self, name: str, max_rate: float, burst: int = None) -> None:
+        '''
+        Token bucket shared by every request to one platform. Tokens are added at self.rate tokens per 
+        second (up to self.capacity) and each request takes one token. The rate is halved every time the
+        platform throttles a request and slowly recovers towards max_rate after successful requests.
+        '''
+        self.name = name
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.capacity = burst if burst else max(1, int(max_rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.calls = 0
+        self.throttled = 0
+        self.total_wait = 0
+        self.max_wait = 0
+        self.lock = threading.Lock()
+        pass
+
+    def acquire(self) -> float:
+        '''
+        Block until a request may be sent to the platform, then take a token.\n
+        Parameters:
+        - None\n
+        Return:
+        - (float) number of seconds the request waited
+        '''
+        start = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        waited = now - start
+                        self.calls += 1
+                        self.total_wait += waited
+                        self.max_wait = max(self.max_wait, waited)
+                        return waited
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def refill(self, now: float) -> None:
+        '''
+        Add the tokens earned since the last refill (must be called while holding self.lock).\n
+        Parameters:
+        - (float) now: current time.monotonic()\n
+        Return:
+        - None
+        '''
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return
+
+    def throttle(self, retry_after: float = None, attempt: int = 0) -> float:
+        '''
+        Record that the platform throttled a request: back off the request rate and pause all requests
+        for retry_after seconds (or an exponential delay if the platform did not send Retry-After).\n
+        Parameters:
+        - (float) retry_after: value of the Retry-After header in seconds (None if not sent)
+        - (int) attempt: number of times the throttled request has already been retried\n
+        Return:
+        - (float) number of seconds for which requests are paused
+        '''
+        delay = retry_after if retry_after is not None else self.BASE_DELAY * (2 ** attempt)
+        with self.lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self.rate = max(self.MIN_RATE, self.rate * self.BACKOFF_FACTOR)
+            self.tokens = 0
+            self.updated = now
+            self.blocked_until = max(self.blocked_until, now + delay)
+        return delay
+
+    def succeed(self) -> None:
+        '''
+        Record that a request succeeded, letting the request rate recover towards max_rate.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.RECOVERY_STEP)
+        return
+
+    def get_stats(self) -> dict:
+        '''
+        Return how long requests waited for this rate limiter.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of calls and throttled calls, total/average/max wait and current rate
+        '''
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "total_wait": self.total_wait,
+                "average_wait": self.total_wait / self.calls if self.calls else 0.0,
+                "max_wait": self.max_wait,
+                "rate": self.rate,
+            }
@@ -0,0 +1,259 @@
+import sys
+import json
+import time
+import logging
+import threading
+
+from MetricsClass import Metrics, CURRENT_PLAYLIST
+
+class Reporter():
+    ''' PROGRESS_INTERVAL: min number of seconds between two progress lines '''
+    PROGRESS_INTERVAL = 5.0
+
+    ''' SONG_OUTCOMES: counters (see Metrics.count) of the outcome of each song, in report order '''
+    SONG_OUTCOMES = ("added", "unfound", "dupes", "downloads")
+
+    ''' PROMETHEUS_PREFIX: prefix of the names of the metrics written in Prometheus text format '''
+    PROMETHEUS_PREFIX = "playlist_converter"
+
+    def __init__(self, events_path: str = None, metrics_path: str = None, progress_interval: float = None,
+                 stream=None) -> None:
+        '''
+        Structured output of unattended runs. Instead of one console line per song, a progress line is
+        printed at most every progress_interval seconds, and everything that happens is written as one
+        JSON line per event to events_path (if any). At the end of a run, a report of the metrics of the
+        run (throughput, match rates, outcomes per playlist, phase and API latencies) is written to
+        metrics_path (if any), in Prometheus text format if it ends in ".prom" and as JSON otherwise.\n
+        Events (each with the "time" it happened and the "playlist" being converted, if any):
+        - "playlist_start": a playlist is being converted ("tracks" = number of tracks)
+        - "song_not_added": a song was not added ("reason" = "unfound", "dupes" or "downloads", "query", "id")
+        - "playlist_done": a playlist was converted ("destination" playlist ID, "songs" = outcome counts)
+        - "albums_done": liked albums were saved ("added", "not_added" = queries of albums not found)
+        - "download": a video was downloaded ("status", "id", "query", "error")
+        - "progress": a progress line was printed ("done", "total", "songs_per_second")
+        - "run_done": a run finished ("report" = see get_report)
+        '''
+        self.events_path = events_path
+        self.metrics_path = metrics_path
+        self.progress_interval = self.PROGRESS_INTERVAL if progress_interval is None else progress_interval
+        self.stream = stream or sys.stdout
+        # Events are buffered and flushed with each progress line, so writing them costs no system call per song
+        self.file = open(events_path, "a", encoding="utf-8") if events_path else None
+        self.last_progress = 0.0
+        self.last_done = {}
+        self.lock = threading.Lock()
+        pass
+
+    def event(self, event_type: str, **fields) -> None:
+        '''
+        Write an event to the events file (if any).\n
+        Parameters:
+        - (str) event_type: type of the event (eg. "song_not_added")
+        - (any) fields: fields of the event (must be JSON serializable)\n
+        Return:
+        - None
+        '''
+        if self.file:
+            event = {"time": round(time.time(), 3), "event": event_type, "playlist": CURRENT_PLAYLIST.get()}
+            event.update(fields)
+            line = json.dumps(event, default=str) + "\n"
+            with self.lock:
+                self.file.write(line)
+        return
+
+    def progress(self, metrics: Metrics, label: str, done: int, total: int) -> None:
+        '''
+        Print a progress line if progress_interval seconds passed since the last one (or once when done == total).
+        Cheap enough to call for every song.\n
+        Parameters:
+        - (Metrics) metrics: metrics of the run (used for the song counts and throughput)
+        - (str) label: what is in progress (eg. a playlist name)
+        - (int) done: number of items done
+        - (int) total: total number of items\n
+        Return:
+        - None
+        '''
+        now = time.monotonic()
+        with self.lock:
+            finished = done >= total and self.last_done.get(label) != done
+            if not finished and now - self.last_progress < self.progress_interval:
+                return
+            self.last_progress = now
+            self.last_done[label] = done
+        counters = metrics.get_counters(CURRENT_PLAYLIST.get())
+        songs_per_second = self.get_songs_done(metrics.get_counters()) / max(metrics.get_elapsed(), 1e-9)
+        outcomes = ", ".join(f"{counters[f'songs.{outcome}']} {outcome}" for outcome in self.SONG_OUTCOMES
+            if counters.get(f"songs.{outcome}"))
+        message = f"[{metrics.get_elapsed():.0f}s] {label}: {done}/{total} ({songs_per_second:.1f} songs/s)"
+        if outcomes:
+            message += f", {outcomes}"
+        print(message, file=self.stream, flush=True)
+        logging.info(message)
+        self.event("progress", label=label, done=done, total=total, songs_per_second=round(songs_per_second, 2))
+        self.flush()
+        return
+
+    def finish(self, metrics: Metrics, run_stats: dict = None) -> dict:
+        '''
+        Write the report of a run to the metrics file (if any) and as a "run_done" event.\n
+        Parameters:
+        - (Metrics) metrics: metrics of the run
+        - (dict) run_stats: stats of the local stores and API clients (see Converter.get_run_stats)\n
+        Return:
+        - (dict) report of the run (see get_report)
+        '''
+        report = self.get_report(metrics.get_summary(), run_stats)
+        self.event("run_done", report=report)
+        self.flush()
+        if self.metrics_path:
+            with open(self.metrics_path, "w", encoding="utf-8") as file:
+                if self.metrics_path.endswith(".prom"):
+                    file.write(self.get_prometheus_text(report))
+                else:
+                    json.dump(report, file, indent=2, default=str)
+        return report
+
+    def flush(self) -> None:
+        '''
+        Write the buffered events to the events file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.file:
+            with self.lock:
+                self.file.flush()
+        return
+
+    def close(self) -> None:
+        '''
+        Flush and close the events file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.file:
+            with self.lock:
+                self.file.close()
+                self.file = None
+        return
+
+    '''
+    Helper functions: Report
+    '''
+    def get_report(self, summary: dict, run_stats: dict = None) -> dict:
+        '''
+        Given the metrics summary of a run, return its report.\n
+        Parameters:
+        - (dict) summary: see Metrics.get_summary
+        - (dict) run_stats: stats of the local stores and API clients (see Converter.get_run_stats)\n
+        Return:
+        - (dict) dict with "elapsed" seconds, "songs" (outcome counts, "songs_per_second" and "match_rate"),
+            "playlists" (playlist name -> outcome counts, "match_rate" and seconds spent in each "phase"),
+            "phases" and "api_calls" (name -> latency histogram, see Metrics.get_histogram) and "run_stats"
+        '''
+        songs = self.get_song_outcomes(summary["counters"])
+        songs["songs_per_second"] = self.get_songs_done(summary["counters"]) / max(summary["elapsed"], 1e-9)
+        playlists = {}
+        for playlist_name, totals in summary["playlists"].items():
+            playlists[playlist_name] = self.get_song_outcomes({name: totals[name]["count"] for name in totals})
+            playlists[playlist_name]["phases"] = {name: totals[name]["total"] for name in summary["phases"]
+                if name in totals}
+        return {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed": summary["elapsed"],
+            "songs": songs,
+            "playlists": playlists,
+            "phases": summary["phases"],
+            "api_calls": summary["api_calls"],
+            "counters": summary["counters"],
+            "run_stats": run_stats or {},
+        }
+
+    def get_song_outcomes(self, counters: dict) -> dict:
+        '''
+        Given counters (of a run or playlist), return the number of songs with each outcome and the match rate.\n
+        Parameters:
+        - (dict) counters: counter name -> count (see Metrics.count)\n
+        Return:
+        - (dict) dict with the count of each of SONG_OUTCOMES and "match_rate" (share of the songs that were
+            searched that were found, ie. added or duplicates; None if no song was searched)
+        '''
+        outcomes = {outcome: counters.get(f"songs.{outcome}", 0) for outcome in self.SONG_OUTCOMES}
+        found = outcomes["added"] + outcomes["dupes"]
+        searched = found + outcomes["unfound"]
+        outcomes["match_rate"] = found / searched if searched else None
+        return outcomes
+
+    def get_songs_done(self, counters: dict) -> int:
+        '''
+        Given the counters of a run, return the number of songs whose outcome is known.
+        '''
+        return sum(counters.get(f"songs.{outcome}", 0) for outcome in self.SONG_OUTCOMES)
+
+    def get_prometheus_text(self, report: dict) -> str:
+        '''
+        Given the report of a run, return its metrics in Prometheus text exposition format.\n
+        Parameters:
+        - (dict) report: see get_report\n
+        Return:
+        - (str) metrics (eg. to be collected by the node_exporter textfile collector)
+        '''
+        prefix = self.PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {prefix}_run_seconds Wall time of the run.",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {report['elapsed']:.3f}",
+            f"# HELP {prefix}_songs_per_second Songs converted per second.",
+            f"# TYPE {prefix}_songs_per_second gauge",
+            f"{prefix}_songs_per_second {report['songs']['songs_per_second']:.3f}",
+            f"# HELP {prefix}_songs Songs of each playlist by outcome.",
+            f"# TYPE {prefix}_songs gauge",
+        ]
+        for playlist_name, outcomes in report["playlists"].items():
+            for outcome in self.SONG_OUTCOMES:
+                lines.append(f"{prefix}_songs{self.get_labels(playlist=playlist_name, outcome=outcome)} "
+                    + f"{outcomes[outcome]}")
+        lines += [f"# HELP {prefix}_match_rate Share of the searched songs of each playlist that were found.",
+            f"# TYPE {prefix}_match_rate gauge"]
+        for playlist_name, outcomes in report["playlists"].items():
+            if outcomes["match_rate"] is not None:
+                lines.append(f"{prefix}_match_rate{self.get_labels(playlist=playlist_name)} "
+                    + f"{outcomes['match_rate']:.4f}")
+        lines += self.get_prometheus_histograms(f"{prefix}_phase_seconds", "Latency of each phase.",
+            {self.get_labels(phase=name): histogram for name, histogram in report["phases"].items()})
+        lines += self.get_prometheus_histograms(f"{prefix}_api_call_seconds", "Latency of each API call.",
+            {self.get_labels(platform=name.rsplit(".", 1)[0], method=name.rsplit(".", 1)[1]): histogram
+                for name, histogram in report["api_calls"].items()})
+        return "\n".join(lines) + "\n"
+
+    def get_prometheus_histograms(self, metric: str, description: str, histograms: dict) -> list[str]:
+        '''
+        Given latency histograms, return them as a Prometheus histogram metric.\n
+        Parameters:
+        - (str) metric: name of the metric
+        - (str) description: HELP text of the metric
+        - (dict) histograms: labels (see get_labels) -> histogram (see Metrics.get_histogram)\n
+        Return:
+        - (list[str]) lines of the metric
+        '''
+        lines = [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+        for labels, histogram in histograms.items():
+            cumulative = 0
+            for bound, bucket_count in histogram["buckets"].items():
+                cumulative += bucket_count
+                le = "+Inf" if bound == "inf" else bound
+                lines.append(f"{metric}_bucket{labels[:-1]},le=\"{le}\"}} {cumulative}")
+            lines.append(f"{metric}_sum{labels} {histogram['total']:.6f}")
+            lines.append(f"{metric}_count{labels} {histogram['count']}")
+        return lines
+
+    def get_labels(self, **labels) -> str:
+        '''
+        Return Prometheus labels (eg. '{playlist="Liked Songs"}') with their values escaped.
+        '''
+        escaped = {name: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            for name, value in labels.items()}
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
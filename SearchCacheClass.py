@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import threading
+import time
+
+class SearchCache():
+    ''' DEFAULT_PATH: file in which cached search responses are stored '''
+    DEFAULT_PATH = "search_cache.sqlite"
+
+    ''' DEFAULT_TTL: number of seconds after which a cached search response expires (1 week) '''
+    DEFAULT_TTL = 7 * 24 * 60 * 60
+
+    ''' DEFAULT_MAX_ENTRIES: number of cached search responses to keep before evicting the
+        least recently used ones '''
+    DEFAULT_MAX_ENTRIES = 200000
+
+    ''' ACCESS_FLUSH_INTERVAL: number of cache hits whose access times are kept in memory before they are written
+        to disk together (so that a hit does not write to the cache file) '''
+    ACCESS_FLUSH_INTERVAL = 100
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.accessed = {}
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            '''CREATE TABLE IF NOT EXISTS search_cache (
+                platform TEXT NOT NULL,
+                query TEXT NOT NULL,
+                result_limit TEXT NOT NULL,
+                filter TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (platform, query, result_limit, filter))''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS search_cache_accessed ON search_cache (accessed)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        pass
+
+    def search(self, platform: str, search_func, search_kwargs: dict, query: str, limit: int = None, filter: str = None,
+               normalize: bool = True):
+        '''
+        Given a platform and its native search function, return the cached response for the
+        search if there is an unexpired one, otherwise call the search function and cache its response.\n
+        Parameters:
+        - (str) platform: name of the platform being searched (eg. Converter.SP_SOURCE)
+        - (function) search_func: native search function of the API client (eg. ytm_client.search)
+        - (dict) search_kwargs: keyword arguments with which search_func is called on a cache miss
+        - (str) query: search query
+        - (int) limit: number of results requested (None to use the client's default)
+        - (str) filter: search filter or type (eg. "albums" for YouTube Music, "track" for Spotify)
+        - (bool) normalize: whether to normalize the query (False for case-sensitive lookups, eg. by album ID)\n
+        Return:
+        - (list | dict) search response, exactly as returned by search_func
+        '''
+        key = self.get_key(platform, query, limit, filter, normalize)
+        response = self.get(key)
+        if response is None:
+            response = search_func(**search_kwargs)
+            self.put(key, response)
+        return response
+
+    def get(self, key: tuple):
+        '''
+        Given a cache key, return the cached response if it exists and has not expired.\n
+        Parameters:
+        - (tuple) key: cache key created by self.get_key\n
+        Return:
+        - (list | dict) cached search response, or None on a cache miss
+        '''
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                '''SELECT response, created FROM search_cache
+                WHERE platform=? AND query=? AND result_limit=? AND filter=?''', key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created = row
+            if now - created > self.ttl:
+                self.accessed.pop(key, None)
+                self.conn.execute(
+                    "DELETE FROM search_cache WHERE platform=? AND query=? AND result_limit=? AND filter=?", key)
+                self.conn.commit()
+                self.size -= 1
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.accessed[key] = now
+            if len(self.accessed) >= self.ACCESS_FLUSH_INTERVAL:
+                self.write_accessed()
+                self.conn.commit()
+            self.hits += 1
+        return json.loads(response)
+
+    def put(self, key: tuple, response) -> None:
+        '''
+        Given a cache key and a search response, store the response and evict the least recently
+        used responses if the cache holds more than self.max_entries responses.\n
+        Parameters:
+        - (tuple) key: cache key created by self.get_key
+        - (list | dict) response: JSON-serializable search response\n
+        Return:
+        - None
+        '''
+        now = time.time()
+        with self.lock:
+            existing = self.conn.execute(
+                "SELECT 1 FROM search_cache WHERE platform=? AND query=? AND result_limit=? AND filter=?",
+                key).fetchone()
+            self.conn.execute(
+                '''INSERT OR REPLACE INTO search_cache
+                (platform, query, result_limit, filter, response, created, accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)''', (*key, json.dumps(response), now, now))
+            if not existing:
+                self.size += 1
+            if self.size > self.max_entries:
+                # Evict by the latest access times
+                self.write_accessed()
+                overflow = self.size - self.max_entries
+                self.conn.execute(
+                    '''DELETE FROM search_cache WHERE rowid IN
+                    (SELECT rowid FROM search_cache ORDER BY accessed LIMIT ?)''', (overflow,))
+                self.size -= overflow
+                self.evicted += overflow
+            self.conn.commit()
+        return
+
+    def write_accessed(self) -> None:
+        '''
+        Write the access times of the cache hits kept in memory (the caller must hold self.lock and commit).\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        if self.accessed:
+            self.conn.executemany(
+                '''UPDATE search_cache SET accessed=?
+                WHERE platform=? AND query=? AND result_limit=? AND filter=?''',
+                [(accessed, *key) for key, accessed in self.accessed.items()])
+            self.accessed = {}
+        return
+
+    def get_key(self, platform: str, query: str, limit: int = None, filter: str = None, normalize: bool = True) -> tuple:
+        '''
+        Given the parameters of a search, return the key under which its response is cached.
+        Queries are normalized so that searches differing only in case or whitespace share a key.\n
+        Parameters:
+        - (str) platform: name of the platform being searched
+        - (str) query: search query
+        - (int) limit: number of results requested
+        - (str) filter: search filter or type
+        - (bool) normalize: whether to normalize the query\n
+        Return:
+        - (tuple) cache key
+        '''
+        normalized_query = " ".join(query.lower().split()) if normalize else query
+        return (platform, normalized_query, "" if limit is None else str(limit), filter or "")
+
+    def get_stats(self) -> dict:
+        '''
+        Return the hit/miss counters of this cache.\n
+        Parameters:
+        - None\n
+        Return:
+        - (dict) dict with number of hits, misses, expired and evicted entries, entries and hit rate
+        '''
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "entries": self.size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        '''
+        Write the access times of recent cache hits and close the connection to the cache file.\n
+        Parameters:
+        - None\n
+        Return:
+        - None
+        '''
+        with self.lock:
+            self.write_accessed()
+            self.conn.commit()
+            self.conn.close()
+        return
@@ -1,6 +1,24 @@
+import math
+import logging
+import itertools
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from ConverterClass import Converter
+from TrackInfoClass import TrackInfo
+from TrackStreamClass import TrackStream
+from MatchMemoClass import MatchMemo
 
 class SpotifyConverter(Converter):
+    ''' SOURCE: platform from which this converter converts '''
+    SOURCE = Converter.SP_SOURCE
+
+    ''' DESTINATION: platform to which this converter converts '''
+    DESTINATION = Converter.YT_SOURCE
+
+    ''' CONFIDENT_SCORE: score of a "song" type YouTube Music result with the same title and artist as the 
+        Spotify song and a duration CONFIDENT_DURATION_DIFF seconds apart (see Converter.score) '''
+    CONFIDENT_SCORE = Converter.SCORE * 2 * (2 + 2 + 30) - math.exp(Converter.CONFIDENT_DURATION_DIFF)
 
     '''
     Convert all Spotify playlists, liked songs, and liked albums to YouTube Music
@@ -14,6 +32,10 @@ class SpotifyConverter(Converter):
         Return:
         - None
         '''
+        # Match songs found on several playlists only once (keep the run memo of a batch, see BatchRunner)
+        shared_memo = self.match_memo
+        self.match_memo = shared_memo or MatchMemo()
+
         # Convert Spotify Liked Songs to YouTube Music playlist
         sp_playlist_ID = "LIKED_SONGS"
         self.convert_SP_to_YT_playlist(sp_playlist_ID)
@@ -31,6 +53,10 @@ class SpotifyConverter(Converter):
 
         # Print unadded Spotify albums
         self.print_not_added_albums()
+
+        # Print lookups saved by the run memo, search cache and match store hit rates
+        self.print_run_stats()
+        self.match_memo = shared_memo
         return 
 
     '''
@@ -44,126 +70,247 @@ class SpotifyConverter(Converter):
         Return:
         - (str) playlist ID for newly created YouTube Music playlist
         '''
-        if sp_playlist_ID == "LIKED_SONGS":
-            sp_playlist_name = "Liked Songs"
-        else:
-            sp_playlist_name = self.sp_client.playlist(playlist_id=sp_playlist_ID)["name"]
+        progress = self.get_journal_progress(sp_playlist_ID)
+        if progress and progress["done"]:
+            return self.skip_finished_playlist(progress)
+        sp_playlist_name = self.get_SP_playlist_name(sp_playlist_ID)
         self.print(f"\nSpotify playlist detected: '{sp_playlist_name}'")
-        sp_tracks = self.get_all_SP_tracks(sp_playlist_ID)
-        yt_playlist = []
         self.print("Copying contents into Youtube playlist...")
-        for index, sp_track in enumerate(sp_tracks):
-            song = sp_track["track"]
-            if song:
-                song_info = self.get_SP_song_info(song)
-                full_yt_query = f"\"{song['name']}\" by {song['artists'][0]['name']}"
-                best_match_ID = self.find_best_match_ID(song_info, self.get_multiple_YT_search_results)
+        with self.metrics.playlist(sp_playlist_name):
+            # Tracks are matched (and their matches written) as their pages arrive, see get_SP_songs_info
+            songs_info = self.get_SP_songs_info(sp_playlist_ID)
+            best_match_IDs = self.get_best_match_IDs(songs_info, self.get_multiple_YT_search_results,
+                progress["matches"] if progress else None)
+            yt_playlist_ID = self.add_matches_to_YT_playlist(sp_playlist_ID, sp_playlist_name, songs_info, best_match_IDs)
+        return yt_playlist_ID
+
+    def add_matches_to_YT_playlist(self, sp_playlist_ID: str, sp_playlist_name: str, songs_info: list,
+                                   best_match_IDs) -> str:
+        '''
+        Given the tracks of a Spotify playlist and their best YouTube Music matches (in the same order),
+        create the YouTube Music playlist and add each match to it in batches as soon as it arrives, 
+        handling unfound songs and duplicates. Progress is recorded in self.journal (if any), and a
+        playlist already started by a previous run is continued instead of created again.\n
+        Parameters:
+        - (str) sp_playlist_ID: playlist ID of source Spotify playlist
+        - (str) sp_playlist_name: name of source Spotify playlist
+        - (list) songs_info: TrackInfo record for each track on the Spotify playlist (None for missing tracks)
+        - (iterable) best_match_IDs: best YouTube Music match ID for each track (None if not found)\n
+        Return:
+        - (str) playlist ID for newly created YouTube Music playlist
+        '''
+        yt_playlist_ID, yt_playlist = self.get_playlist_writer(sp_playlist_ID, sp_playlist_name,
+            self.create_YT_playlist, self.add_YT_playlist_items, self.YT_BATCH_SIZE)
+        self.report("playlist_start", tracks=len(songs_info))
+        for index, (song_info, best_match_ID) in enumerate(zip(songs_info, best_match_IDs)):
+            self.record_journal_track(sp_playlist_ID, index, song_info.id if song_info else None, best_match_ID)
+            if song_info:
+                full_yt_query = f"\"{song_info.title}\" by {song_info.artist}"
                 if best_match_ID:
                     if best_match_ID not in yt_playlist:
-                        yt_playlist.append(best_match_ID)
-                        self.print(f"Copying song {index + 1}/{len(sp_tracks)}")
+                        yt_playlist.add(best_match_ID)
+                        self.metrics.count("songs.added")
+                        self.print_progress(sp_playlist_name, index + 1, len(songs_info),
+                            f"Copying song {index + 1}/{len(songs_info)}")
                     else:
                         self.print_unadded_song_error(sp_playlist_name, "dupes", full_yt_query, best_match_ID)
                         if self.keep_dupes:
-                            self.print(f"Copying song {index + 1}/{len(sp_tracks)}")
+                            self.print_progress(sp_playlist_name, index + 1, len(songs_info),
+                                f"Copying song {index + 1}/{len(songs_info)}")
                 else:
                     self.print_unadded_song_error(sp_playlist_name, "unfound", full_yt_query)
             else:
                 self.print_unadded_song_error(sp_playlist_name, "unfound", f"Song #{index + 1}")
-        yt_playlist_ID = self.create_YT_playlist(yt_playlist, sp_playlist_name)
+        self.print("Finishing up...")
+        yt_playlist.flush()
+        self.record_write_stats(sp_playlist_name, yt_playlist)
+        # HANDLE DUPLICATES
+        if sp_playlist_name in self.NOT_ADDED_SONGS:
+            dupes = [dupe["id"] for dupe in self.NOT_ADDED_SONGS[sp_playlist_name]["dupes"]]
+            if self.keep_dupes and dupes:
+                self.add_YT_playlist_items(yt_playlist_ID, dupes, duplicates=True)
+        self.record_journal_done(sp_playlist_ID, self.NOT_ADDED_SONGS.get(sp_playlist_name))
+        self.report_playlist_done(sp_playlist_name, yt_playlist_ID, len(songs_info))
+        self.print("Finished!")
         return yt_playlist_ID
     
-    def get_multiple_YT_search_results(self, song_info: dict) -> list[list[dict]]:
+    def get_multiple_YT_search_results(self, song_info: TrackInfo):
+        '''
+        Given a song name and artist, lazily perform multiple YouTube Music queries. For each query, 
+        filter the search results to keep only videoTypes of "song" and "video", then yield the song
+        info of all remaining search results. A query is only sent when its results are requested, and
+        queries are sent in the order planned by plan_queries.\n
+        Parameters:
+        - (TrackInfo) song_info: record with info about the target Spotify song\n
+        Return:
+        - (generator) (template name, list of TrackInfo records) pairs (each list is the search result of a
+            query and contains multiple TrackInfo records of songs from that search result) 
         '''
-        Given a song name and artist, perform multiple YouTube Music queries. Next, filter all 
-        search results to keep only videoTypes of "song" and "video". Then, get the song info of all
-        remaining search results and aggregate them into a single list of search result song info dicts.\n
+        queries, limit = self.plan_queries(self.get_YT_search_queries(song_info))
+        for template, query in queries:
+            single_search_raw = self.search_YT(query, limit=self.get_request_limit(limit))
+            yield template, self.process_YT_search_results(single_search_raw, limit)
+
+    def get_YT_search_queries(self, song_info: TrackInfo) -> dict:
+        '''
+        Given a Spotify song, return the YouTube Music search queries used to find it.\n
+        Parameters:
+        - (TrackInfo) song_info: record with info about the target Spotify song\n
+        Return:
+        - (dict) template name -> search query, in default order
+        '''
+        query_1 = f"{song_info.title} {song_info.artist}"
+        query_2 = f"{song_info.title} by {song_info.artist}"
+        return {"title artist": query_1, "title by artist": query_2}
+
+    def process_YT_search_results(self, single_search_raw: list[dict], limit: int = None) -> list[TrackInfo]:
+        '''
+        Given the raw results of a YouTube Music search, keep only the first limit results, then only results
+        with resultTypes of "song" and "video", and return their song info (with their rank in single_search_raw).\n
         Parameters:
-        - (dict) song_info: dictionary with info about the target Spotify song\n
+        - (list[dict]) single_search_raw: search results returned by ytm_client.search
+        - (int) limit: number of raw results to keep (None to keep all of them)\n
         Return:
-        - (list) list of lists of song_info dicts (each inner list is the search result of 
-            a query and contains multiple song_info dicts of songs from that search result) 
+        - (list[TrackInfo]) list of TrackInfo records of the remaining search results
         '''
-        query_1 = f"{song_info['title']} {song_info['artist']}"
-        query_2 = f"{song_info['title']} by {song_info['artist']}"
-        queries_lst = [query_1, query_2]
-        all_yt_search_res = []
-        for query in queries_lst:
-            single_search_raw = self.ytm_client.search(query=query, limit=self.LIMIT)
-            single_search_processed = [self.get_YT_song_info(res) for res in single_search_raw
-                if (res and (res["resultType"] == "video" or res["resultType"] == "song"))]
-            all_yt_search_res.append(single_search_processed)
-        return all_yt_search_res
+        return [self.get_YT_song_info(res, rank) for rank, res in enumerate(single_search_raw[:limit])
+            if (res and (res["resultType"] == "video" or res["resultType"] == "song"))]
 
-    def create_YT_playlist(self, yt_playlist: list, sp_playlist_name: str) -> str:
+    def create_YT_playlist(self, sp_playlist_name: str) -> str:
         '''
-        Creates a YouTube playlist and handles duplicates based on self.keep_dupes.\n
+        Creates an empty YouTube Music playlist for the songs of a Spotify playlist.\n
         Parameters:
-        - (list) YT_PLAYLIST: list of YouTube Music song/video IDs to add to new YouTube Music playlist
         - (str) SP_PLAYLIST_NAME: name of Spotify playlist\n
         Return:
         - (str) playlist ID of newly created YouTube Music playlist\n
         '''
-        self.print("Finishing up...")
-        # CREATE YOUTUBE MUSIC PLAYLIST WITH LIST OF SONGS (NO DUPLICATES YET)
-        yt_playlist_ID = self.ytm_client.create_playlist(
-            title=f"{sp_playlist_name} (copied from Spotify)",
-            description="Includes duplicates" if self.keep_dupes else "Does not include duplicates",
-            video_ids=yt_playlist)
-        # HANDLE DUPLICATES
-        if sp_playlist_name in self.NOT_ADDED_SONGS:
-            dupes = [dupe["id"] for dupe in self.NOT_ADDED_SONGS[sp_playlist_name]["dupes"]]
-            if self.keep_dupes and dupes:
-                self.ytm_client.add_playlist_items(playlistId=yt_playlist_ID, videoIds=dupes, duplicates=True)
-            self.print("Finished!")
+        with self.metrics.time("create"):
+            yt_playlist_ID = self.ytm_client.create_playlist(
+                title=f"{sp_playlist_name} (copied from Spotify)",
+                description="Includes duplicates" if self.keep_dupes else "Does not include duplicates")
         return yt_playlist_ID
 
+    def add_YT_playlist_items(self, yt_playlist_ID: str, video_IDs: list[str], duplicates: bool = False) -> None:
+        '''
+        Adds videos to the end of a YouTube Music playlist, YT_BATCH_SIZE videos per request.\n
+        Parameters:
+        - (str) yt_playlist_ID: playlist ID of YouTube Music playlist
+        - (list[str]) video_IDs: list of YouTube Music song/video IDs to add
+        - (bool) duplicates: whether to add videos that are already on the playlist\n
+        Return:
+        - None
+        '''
+        for start in range(0, len(video_IDs), self.YT_BATCH_SIZE):
+            with self.metrics.time("write"):
+                self.ytm_client.add_playlist_items(playlistId=yt_playlist_ID,
+                    videoIds=video_IDs[start:start + self.YT_BATCH_SIZE], duplicates=duplicates)
+        return
+
     '''
     Convert Spotify liked albums to YouTube Music
     '''
     def convert_SP_to_YT_liked_albums(self) -> None:
         '''
         Given a list of Spotify Liked Albums, add all albums to YouTube Music 
-        Liked Albums, and add all unadded albums to self.NOT_ADDED_ALBUMS.\n
+        Liked Albums, and add all unadded albums to self.NOT_ADDED_ALBUMS. Albums are
+        matched and liked concurrently (see map_in_order).\n
         Parameters:
         - None\n
         Return:
         - None\n
         '''
+        progress = self.get_journal_progress("LIKED_ALBUMS")
+        if progress and progress["done"]:
+            self.NOT_ADDED_ALBUMS.extend(progress["not_added"])
+            return
+        recorded_albums = progress["matches"] if progress else {}
+        not_added_albums = []
         liked_albums = self.get_all_SP_tracks("LIKED_ALBUMS")
         if liked_albums:
-            self.print(f"\nAdding Spotify saved albums to YouTube Music library...")
-            for album in liked_albums:
-                found = {}
-                album_name = album['album']['name']
-                album_artist = album['album']['artists'][0]['name']
-                album_year = album['album']['release_date'][:3]
-                yt_query = f"{album_name} by {album_artist}"
-                yt_search_res = self.ytm_client.search(query=yt_query, filter="albums")
-                for res in yt_search_res:
-                    res_browse_ID = res["browseId"]
-                    found[res_browse_ID] = 0
-                    if res["artists"][0]["name"] == album_artist:
-                        found[res_browse_ID] += self.SCORE
-                    if res["title"] == album_name:
-                        found[res_browse_ID] += self.SCORE
-                    if res["title"] in album_name or album_name in res["title"]:
-                        found[res_browse_ID] += self.SCORE
-                    if res["year"] == album_year:
-                        found[res_browse_ID] += self.SCORE
-                if found:
-                    res_browse_ID = max(found, key=found.get)
-                    res_album = self.ytm_client.get_album(res_browse_ID)
-                    res_playlist_ID = res_album["audioPlaylistId"]
-                    self.ytm_client.rate_playlist(res_playlist_ID, "LIKE")
-                    self.print(f"Added album: {yt_query}")
-                else:
-                    self.NOT_ADDED_ALBUMS.append(yt_query)
+            with self.metrics.playlist("Liked Albums"):
+                self.print(f"\nAdding Spotify saved albums to YouTube Music library...")
+                albums_info = [(album['album']['name'], album['album']['artists'][0]['name'],
+                    album['album']['release_date'][:3]) for album in liked_albums]
+                yt_queries = [f"{album_name} by {album_artist}" for album_name, album_artist, _ in albums_info]
+                res_browse_IDs = self.map_in_order(lambda album_info: self.like_YT_album(*album_info),
+                    albums_info, recorded_albums, lambda album_info: f"{album_info[0]} by {album_info[1]}")
+                for index, (yt_query, res_browse_ID) in enumerate(zip(yt_queries, res_browse_IDs)):
+                    if res_browse_ID:
+                        if recorded_albums.get(index) != (yt_query, res_browse_ID):
+                            self.record_journal_track("LIKED_ALBUMS", index, yt_query, res_browse_ID)
+                            self.print_progress("Liked Albums", index + 1, len(albums_info), f"Added album: {yt_query}")
+                    else:
+                        self.record_journal_track("LIKED_ALBUMS", index, yt_query, None)
+                        not_added_albums.append(yt_query)
+                self.report("albums_done", added=len(albums_info) - len(not_added_albums), not_added=not_added_albums)
+        self.NOT_ADDED_ALBUMS.extend(not_added_albums)
+        self.record_journal_done("LIKED_ALBUMS", not_added_albums)
         return
 
+    def like_YT_album(self, album_name: str, album_artist: str, album_year: str) -> str:
+        '''
+        Given a Spotify album, find its best match on YouTube Music and add it to YouTube Music Liked Albums.
+        Safe to call from several threads at once (see map_in_order).\n
+        Parameters:
+        - (str) album_name: name of the Spotify album
+        - (str) album_artist: name of the first artist of the album
+        - (str) album_year: first 3 digits of the album release year\n
+        Return:
+        - (str) browseId of the YouTube Music album that was liked (None if not found)
+        '''
+        found = {}
+        yt_search_res = self.search_YT(f"{album_name} by {album_artist}", filter="albums")
+        for res in yt_search_res:
+            res_browse_ID = res["browseId"]
+            found[res_browse_ID] = 0
+            if res["artists"][0]["name"] == album_artist:
+                found[res_browse_ID] += self.SCORE
+            if res["title"] == album_name:
+                found[res_browse_ID] += self.SCORE
+            if res["title"] in album_name or album_name in res["title"]:
+                found[res_browse_ID] += self.SCORE
+            if res["year"] == album_year:
+                found[res_browse_ID] += self.SCORE
+        if not found:
+            return None
+        res_browse_ID = max(found, key=found.get)
+        res_album = self.get_YT_album(res_browse_ID)
+        res_playlist_ID = res_album["audioPlaylistId"]
+        with self.metrics.time("write"):
+            self.ytm_client.rate_playlist(res_playlist_ID, "LIKE")
+        return res_browse_ID
+
     '''
     Helper functions: Utils
     '''
+    def get_SP_playlist_name(self, sp_playlist_ID: str) -> str:
+        '''
+        Given a Spotify playlist ID, return the name of the playlist.\n
+        Parameters:
+        - (str) SP_PLAYLIST_ID: playlist ID for a Spotify playlist, or "LIKED_SONGS" for liked songs\n
+        Return:
+        - (str) name of the Spotify playlist
+        '''
+        if sp_playlist_ID == "LIKED_SONGS":
+            return "Liked Songs"
+        return self.sp_client.playlist(playlist_id=sp_playlist_ID)["name"]
+
+    def get_SP_songs_info(self, sp_playlist_ID: str) -> TrackStream:
+        '''
+        Given a Spotify playlist ID, return the TrackInfo record of each song in the playlist, read page
+        by page as the songs are matched (see iter_SP_tracks). Only the TrackInfo records are kept, so the
+        raw tracks of each page can be freed as soon as they are read.\n
+        Parameters:
+        - (str) SP_PLAYLIST_ID: playlist ID for a Spotify playlist, or "LIKED_SONGS" for liked songs\n
+        Return:
+        - (TrackStream) TrackInfo record of each song (None for missing tracks), whose length is the total
+            reported by the first page
+        '''
+        sp_playlist = self.get_SP_page(sp_playlist_ID, 0)
+        songs_info = (self.get_SP_song_info(sp_track["track"]) if sp_track["track"] else None
+            for sp_track in self.iter_SP_tracks(sp_playlist_ID, sp_playlist))
+        return TrackStream(songs_info, sp_playlist["total"])
+
     def get_all_SP_tracks(self, sp_playlist_ID: str) -> list[dict]:
         '''
         Given a Spotify API client and playlist ID, return a list of all songs in the playlist.\n
@@ -173,20 +320,115 @@ class SpotifyConverter(Converter):
             - "LIKED_SONGS" for liked songs
             - "LIKED_ALBUMS" for liked albums\n
         Return:
-        - (list[dict]) list of all songs (dicts) on a Spotify playlist\n
+        - (list[dict]) list of all songs (dicts) on a Spotify playlist
+        '''
+        return list(self.iter_SP_tracks(sp_playlist_ID, self.get_SP_page(sp_playlist_ID, 0)))
+
+    def iter_SP_tracks(self, sp_playlist_ID: str, sp_playlist: dict):
+        '''
+        Given a Spotify playlist ID (see get_all_SP_tracks) and the first page of the playlist, yield 
+        every song in the playlist in order, as soon as its page arrives.\n
+        Parameters:
+        - (str) SP_PLAYLIST_ID: playlist ID for a Spotify playlist, "LIKED_SONGS" or "LIKED_ALBUMS"
+        - (dict) sp_playlist: first page of the playlist (see get_SP_page)\n
+        Return:
+        - (generator) every song (dict) on the Spotify playlist\n
         NOTE: Spotify playlists are paginated, meaning sp_playlist["items"] only retrieves the
-        first 100 items. If there are more than 100 items on the playlist, then we must 
-        request the next page using self.sp_client.next(sp_playlist). Here, we simply do that
-        for every page, add all items from each page to a list, and return that list.
+        first 100 items. The first page reports the total number of items, so the offsets of all
+        remaining pages are known and up to self.page_workers pages are requested ahead of the page
+        being read (so at most that many pages are held in memory while the songs are matched). If
+        the total changes while the pages are requested (eg. a song was added to the playlist), the 
+        offsets are no longer reliable: the page that reported the new total is dropped, reading resumes
+        right after the last song already read (see get_SP_page_after), and from there on we request the
+        next page using self.sp_client.next(sp_playlist) for every page, one at a time.
         '''
-        if sp_playlist_ID == "LIKED_SONGS":
-            sp_playlist = self.sp_client.current_user_saved_tracks(limit=50)
-        elif sp_playlist_ID == "LIKED_ALBUMS":
-            sp_playlist = self.sp_client.current_user_saved_albums(limit=50)
-        else:
-            sp_playlist = self.sp_client.playlist_tracks(sp_playlist_ID)
-        sp_tracks = sp_playlist["items"]
+        total = sp_playlist["total"]
+        page_size = sp_playlist["limit"]
+        offsets = iter(range(len(sp_playlist["items"]), total, page_size))
+        yield from sp_playlist["items"]
+        if sp_playlist["next"] and self.page_workers > 1:
+            read = len(sp_playlist["items"])
+            last_item = sp_playlist["items"][-1] if sp_playlist["items"] else None
+            with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+                # Each page is requested in a copy of this context, so that it is timed for the same playlist
+                pending = deque(executor.submit(contextvars.copy_context().run, self.get_SP_page, sp_playlist_ID,
+                    offset) for offset in itertools.islice(offsets, self.page_workers))
+                while pending:
+                    sp_page = pending.popleft().result()
+                    if sp_page["total"] != total:
+                        logging.info(f"Spotify playlist '{sp_playlist_ID}' changed while its pages were requested")
+                        for future in pending:
+                            future.cancel()
+                        break
+                    yield from sp_page["items"]
+                    read += len(sp_page["items"])
+                    if sp_page["items"]:
+                        last_item = sp_page["items"][-1]
+                    for offset in itertools.islice(offsets, 1):
+                        pending.append(executor.submit(contextvars.copy_context().run, self.get_SP_page,
+                            sp_playlist_ID, offset))
+                else:
+                    return
+            sp_playlist = self.get_SP_page_after(sp_playlist_ID, read, last_item, page_size)
+            yield from sp_playlist["items"]
         while sp_playlist["next"]:
-            sp_playlist = self.sp_client.next(sp_playlist)
-            sp_tracks.extend(sp_playlist["items"])
-        return sp_tracks
+            with self.metrics.time("fetch"):
+                sp_playlist = self.sp_client.next(sp_playlist)
+            yield from sp_playlist["items"]
+        return
+
+    def get_SP_page_after(self, sp_playlist_ID: str, read: int, last_item: dict, page_size: int) -> dict:
+        '''
+        Given a Spotify playlist that changed while it was read, the number of songs already read and the
+        last of them, return a page of the changed playlist that starts right after that song. Songs added
+        or removed before it shift it by up to half a page, so the page is requested around its old offset
+        and its items are trimmed to the ones after it (the page's "next" is unaffected).\n
+        Parameters:
+        - (str) sp_playlist_ID: playlist ID for a Spotify playlist, "LIKED_SONGS" or "LIKED_ALBUMS"
+        - (int) read: number of songs already read
+        - (dict) last_item: last song (dict) already read (None if none was read)
+        - (int) page_size: number of songs per page\n
+        Return:
+        - (dict) Spotify paging object whose items start after last_item (or at offset read if last_item
+            is not found near its old offset)
+        '''
+        if last_item is None:
+            return self.get_SP_page(sp_playlist_ID, read)
+        last_key = self.get_SP_item_key(last_item)
+        sp_page = self.get_SP_page(sp_playlist_ID, max(0, read - 1 - page_size // 2))
+        keys = [self.get_SP_item_key(item) for item in sp_page["items"]]
+        if last_key not in keys:
+            logging.info(f"Could not find where to resume Spotify playlist '{sp_playlist_ID}' after it changed, "
+                + f"resuming at song {read + 1}")
+            return self.get_SP_page(sp_playlist_ID, read)
+        # The last occurrence, in case the same song was added to the playlist twice at once
+        sp_page["items"] = sp_page["items"][len(keys) - keys[::-1].index(last_key):]
+        return sp_page
+
+    def get_SP_item_key(self, sp_item: dict) -> tuple:
+        '''
+        Given a song (or album) of a Spotify playlist, return what identifies it within the playlist.\n
+        Parameters:
+        - (dict) sp_item: item of a Spotify paging object\n
+        Return:
+        - (tuple) when the item was added and the ID of its track or album
+        '''
+        content = sp_item.get("track") or sp_item.get("album") or {}
+        return sp_item.get("added_at"), content.get("id")
+
+    def get_SP_page(self, sp_playlist_ID: str, offset: int) -> dict:
+        '''
+        Given a Spotify playlist ID (see get_all_SP_tracks) and an offset, return the page of the
+        playlist starting at that offset.\n
+        Parameters:
+        - (str) sp_playlist_ID: playlist ID for a Spotify playlist, "LIKED_SONGS" or "LIKED_ALBUMS"
+        - (int) offset: index of the first item of the page\n
+        Return:
+        - (dict) Spotify paging object ("items", "total", "limit", "next", ...)
+        '''
+        with self.metrics.time("fetch"):
+            if sp_playlist_ID == "LIKED_SONGS":
+                return self.sp_client.current_user_saved_tracks(limit=50, offset=offset)
+            elif sp_playlist_ID == "LIKED_ALBUMS":
+                return self.sp_client.current_user_saved_albums(limit=50, offset=offset)
+            return self.sp_client.playlist_tracks(sp_playlist_ID, offset=offset)
@@ -0,0 +1,61 @@
+import re
+import sys
+
+class TrackInfo():
+    ''' NON_WORD_PATTERN: runs of characters removed from the normalized forms of titles and artists '''
+    NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+    __slots__ = ("title", "artist", "album", "duration_seconds", "id", "result_type", "top_result", "video_type",
+                 "isrc", "rank", "title_lower", "artist_lower", "title_normalized", "artist_normalized")
+
+    def __init__(self, title: str, artist: str, album: str, duration_seconds: float, ID: str,
+                 result_type: str = None, top_result: bool = False, video_type: str = None, isrc: str = None,
+                 rank: int = None) -> None:
+        '''
+        Compact record of the information about a song (a source track or a search result) used to
+        match it. The lowercased and normalized forms of the title and artist are computed once here,
+        and artist and album names (which repeat across a library and its search results) are interned
+        so that every record of the same artist or album shares one string.\n
+        Parameters:
+        - (str) title: song name
+        - (str) artist: name of the first artist
+        - (str) album: album name (None if unknown)
+        - (float) duration_seconds: song duration in seconds
+        - (str) ID: Spotify track ID or YouTube Music videoId
+        - (str) result_type: YouTube Music resultType of a search result (eg. "song" or "video")
+        - (bool) top_result: whether the search result is the YouTube Music "Top result"
+        - (str) video_type: YouTube Music videoType (eg. "MUSIC_VIDEO_TYPE_ATV")
+        - (str) isrc: International Standard Recording Code of a Spotify track (None if unknown)
+        - (int) rank: position of a search result in the response of its search, counting the results that
+            were filtered out (eg. YouTube Music albums), ie. the number of results to request to get it
+            (None if not a search result)
+        '''
+        self.title = title
+        self.artist = sys.intern(artist)
+        self.album = sys.intern(album) if album else album
+        self.duration_seconds = duration_seconds
+        self.id = ID
+        self.result_type = result_type
+        self.top_result = top_result
+        self.video_type = video_type
+        self.isrc = isrc
+        self.rank = rank
+        self.title_lower = title.lower()
+        self.artist_lower = sys.intern(artist.lower())
+        self.title_normalized = self.normalize(self.title_lower)
+        self.artist_normalized = sys.intern(self.normalize(self.artist_lower))
+        pass
+
+    def __repr__(self) -> str:
+        return f"TrackInfo({self.title!r}, {self.artist!r}, {self.album!r}, {self.duration_seconds!r}, {self.id!r})"
+
+    def normalize(self, text: str) -> str:
+        '''
+        Given lowercased text, return it with punctuation and repeated whitespace collapsed into
+        single spaces (eg. "don't stop (live)" -> "don t stop live").\n
+        Parameters:
+        - (str) text: lowercased text\n
+        Return:
+        - (str) normalized text
+        '''
+        return self.NON_WORD_PATTERN.sub(" ", text).strip()
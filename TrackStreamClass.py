@@ -0,0 +1,38 @@
+import threading
+
+class TrackStream():
+    def __init__(self, tracks, total: int) -> None:
+        '''
+        Sequence of the tracks of a source playlist that are read from an iterator (eg. the tracks of each
+        page of the playlist, as the pages are requested) only when they are first needed, so that matching
+        starts with the first page while later pages are still being requested. It can be iterated several
+        times at once (eg. by map_in_order and by the loop that adds the matches to the destination playlist),
+        and every iteration sees the same tracks in the same order.\n
+        Parameters:
+        - (iterator) tracks: tracks (eg. TrackInfo records) in playlist order
+        - (int) total: number of tracks the playlist reports (the length of the stream until it is fully read)
+        '''
+        self.tracks = iter(tracks)
+        self.total = total
+        self.items = []
+        self.exhausted = False
+        self.lock = threading.Lock()
+        pass
+
+    def __len__(self) -> int:
+        return len(self.items) if self.exhausted else max(self.total, len(self.items))
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self.lock:
+                while index >= len(self.items) and not self.exhausted:
+                    try:
+                        self.items.append(next(self.tracks))
+                    except StopIteration:
+                        self.exhausted = True
+                if index >= len(self.items):
+                    return
+                item = self.items[index]
+            yield item
+            index += 1
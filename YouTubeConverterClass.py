@@ -1,7 +1,24 @@
-import youtube_dl
+import os
+import math
+import logging
+import functools
 from ConverterClass import Converter
+from DownloaderClass import Downloader
+from PlaylistWriterClass import PlaylistWriter
+from TrackInfoClass import TrackInfo
+from MatchMemoClass import MatchMemo
 
 class YouTubeMusicConverter(Converter):
+    ''' SOURCE: platform from which this converter converts '''
+    SOURCE = Converter.YT_SOURCE
+
+    ''' DESTINATION: platform to which this converter converts '''
+    DESTINATION = Converter.SP_SOURCE
+
+    ''' CONFIDENT_SCORE: score of a Spotify result with the same title and artist as the YouTube Music song
+        and a duration CONFIDENT_DURATION_DIFF seconds apart (see Converter.score; Spotify results have no type) '''
+    CONFIDENT_SCORE = Converter.SCORE * 2 * (2 + 2) - math.exp(Converter.CONFIDENT_DURATION_DIFF)
+
     '''
     Convert all YouTube Music playlists and liked albums to Spotify
     '''
@@ -14,6 +31,10 @@ class YouTubeMusicConverter(Converter):
         Return:
         - None
         '''
+        # Match songs found on several playlists only once (keep the run memo of a batch, see BatchRunner)
+        shared_memo = self.match_memo
+        self.match_memo = shared_memo or MatchMemo()
+
         # Convert all YouTube Music playlists to Spotify playlists
         # NOTE: YouTube Music liked songs behave as playlists, unlike Spotify liked songs, which
         #   are not playlists, but rather a separate object type.
@@ -36,6 +57,10 @@ class YouTubeMusicConverter(Converter):
         # Print unadded Spotify albums
         self.print_not_added_albums()
 
+        # Print lookups saved by the run memo, search cache and match store hit rates
+        self.print_run_stats()
+        self.match_memo = shared_memo
+
         # Download YouTube Music videos that are not song types or official music videos
         self.download_YT_videos()
         return 
@@ -51,150 +76,305 @@ class YouTubeMusicConverter(Converter):
         Return:
         - (str) playlist ID for newly created Spotify playlist
         '''
-        if yt_playlist_ID == "LIKED_SONGS":
-            yt_playlist_name = "Liked Songs"
-            yt_playlist = self.ytm_client.get_library_songs(limit=None)
-        elif yt_playlist_ID == "LIKED_VIDS":
-            yt_playlist_name = "Liked Videos"
-            yt_playlist = self.ytm_client.get_liked_songs(limit=None)
-        else:
-            yt_playlist_name = self.ytm_client.get_playlist(yt_playlist_ID)["title"]
-            yt_playlist = self.ytm_client.get_playlist(yt_playlist_ID, limit=None)
+        progress = self.get_journal_progress(yt_playlist_ID)
+        if progress and progress["done"]:
+            return self.skip_finished_playlist(progress)
+        yt_playlist_name, yt_tracks = self.get_YT_playlist(yt_playlist_ID)
         self.print(f"\nYouTube Music playlist detected: '{yt_playlist_name}'")
-        yt_tracks = yt_playlist["tracks"]
-        sp_playlist = []
         self.print("Copying contents into Spotify playlist...")
-        for index, yt_song in enumerate(yt_tracks):
-            if yt_song:
-                song_info = self.get_YT_song_info(yt_song)
-                full_sp_query = f"\"{yt_song['title']}\" by {yt_song['artists'][0]['name']}"
-                if (yt_song["videoType"] == "MUSIC_VIDEO_TYPE_ATV" or 
-                    yt_song["videoType"] == "MUSIC_VIDEO_TYPE_OMV"):
-                    best_match_ID = self.find_best_match_ID(song_info, self.get_multiple_SP_search_results)
+        with self.metrics.playlist(yt_playlist_name):
+            songs_info = [self.get_YT_song_info(yt_song) if yt_song else None for yt_song in yt_tracks]
+            # Only the TrackInfo records are needed from here on, so let the raw tracks be freed
+            del yt_tracks
+            best_match_IDs = self.get_best_match_IDs(self.get_YT_songs_to_match(songs_info),
+                self.get_multiple_SP_search_results, progress["matches"] if progress else None)
+            sp_playlist_ID = self.add_matches_to_SP_playlist(yt_playlist_ID, yt_playlist_name, songs_info, best_match_IDs)
+        return sp_playlist_ID
+
+    def add_matches_to_SP_playlist(self, yt_playlist_ID: str, yt_playlist_name: str, songs_info: list,
+                                   best_match_IDs) -> str:
+        '''
+        Given the tracks of a YouTube Music playlist and their best Spotify matches (in the same order),
+        create the Spotify playlist and add each match to it in batches as soon as it arrives, handling
+        unfound songs, duplicates and videos to download. Progress is recorded in self.journal (if any),
+        and a playlist already started by a previous run is continued instead of created again.\n
+        Parameters:
+        - (str) yt_playlist_ID: playlist ID of source YouTube Music playlist
+        - (str) yt_playlist_name: name of source YouTube Music playlist
+        - (list) songs_info: TrackInfo record for each track on the YouTube Music playlist (None for missing tracks)
+        - (iterable) best_match_IDs: best Spotify match ID for each track (None if not found or not matched)\n
+        Return:
+        - (str) playlist ID for newly created Spotify playlist
+        '''
+        sp_playlist_ID, sp_playlist = self.get_playlist_writer(yt_playlist_ID, yt_playlist_name,
+            self.create_SP_playlist, self.add_SP_playlist_items, self.SP_BATCH_SIZE)
+        self.report("playlist_start", tracks=len(songs_info))
+        for index, (song_info, best_match_ID) in enumerate(zip(songs_info, best_match_IDs)):
+            self.record_journal_track(yt_playlist_ID, index, song_info.id if song_info else None, best_match_ID)
+            if song_info:
+                full_sp_query = f"\"{song_info.title}\" by {song_info.artist}"
+                if self.is_YT_song_type(song_info):
                     if best_match_ID:
                         if best_match_ID not in sp_playlist or self.keep_dupes:
-                            sp_playlist.append(best_match_ID)
-                            self.print(f"Copying song {index + 1}/{len(yt_tracks)}")
+                            sp_playlist.add(best_match_ID)
+                            self.metrics.count("songs.added")
+                            self.print_progress(yt_playlist_name, index + 1, len(songs_info),
+                                f"Copying song {index + 1}/{len(songs_info)}")
                         else:
                             self.print_unadded_song_error(yt_playlist_name, "dupes", full_sp_query, best_match_ID)
                             if self.keep_dupes:
-                                self.print(f"Copying song {index + 1}/{len(yt_tracks)}")
+                                self.print_progress(yt_playlist_name, index + 1, len(songs_info),
+                                    f"Copying song {index + 1}/{len(songs_info)}")
                     else:
                         self.print_unadded_song_error(yt_playlist_name, "unfound", full_sp_query)
                 else:
-                    self.print_unadded_song_error(yt_playlist_name, "downloads", full_sp_query, song_info["id"])
+                    self.print_unadded_song_error(yt_playlist_name, "downloads", full_sp_query, song_info.id)
             else:
                 self.print_unadded_song_error(yt_playlist_name, "unfound", f"Song #{index + 1}")
-        sp_playlist_ID = self.create_SP_playlist(sp_playlist, yt_playlist_name)
+        self.print("Finishing up...")
+        sp_playlist.flush()
+        self.record_write_stats(yt_playlist_name, sp_playlist)
+        # HANDLE DUPLICATES
+        if yt_playlist_name in self.NOT_ADDED_SONGS:
+            dupes = [dupe["id"] for dupe in self.NOT_ADDED_SONGS[yt_playlist_name]["dupes"]]
+            if self.keep_dupes and dupes:
+                self.add_SP_playlist_items(sp_playlist_ID, dupes)
+        self.record_journal_done(yt_playlist_ID, self.NOT_ADDED_SONGS.get(yt_playlist_name))
+        self.report_playlist_done(yt_playlist_name, sp_playlist_ID, len(songs_info))
+        self.print("Finished!")
         return sp_playlist_ID
 
-    def get_multiple_SP_search_results(self, song_info: dict) -> list[list[dict]]:
+    def get_multiple_SP_search_results(self, song_info: TrackInfo):
         '''
-        Given a song name and artist, perform multiple Spotify queries and aggregate 
-        the search results of all queries into a single list of search results.\n
+        Given a song name and artist, lazily perform multiple Spotify queries and yield the search
+        results of each query. A query is only sent when its results are requested, and queries are
+        sent in the order planned by plan_queries.\n
         Parameters:
-        - (dict) song_info: dict with info about the target YouTube Music song\n
+        - (TrackInfo) song_info: record with info about the target YouTube Music song\n
         Return:
-        - (list) list of lists of song_info dicts (each inner list is the search result of 
-            a query and contains multiple song_info dicts of songs from that search result)
+        - (generator) (template name, list of TrackInfo records) pairs (each list is the search result of a
+            query and contains multiple TrackInfo records of songs from that search result)
         '''
-        query_1 = f"{song_info['title']}"
-        query_2 = f"{song_info['title']} {song_info['artist']}"
-        query_3 = f"{song_info['title']} by {song_info['artist']}"
-        queries_lst = [query_1, query_2, query_3]
-        if "(" in song_info["title"] or "(" in song_info["artist"]:
-            queries_lst.append(self.remove_parentheses(query_2))
-        all_sp_search_res = []
-        for query in queries_lst:
-            single_search_raw = self.sp_client.search(
-                query, type="track", limit=self.LIMIT)["tracks"]["items"]
-            single_search_processed = [self.get_SP_song_info(res) for res in single_search_raw if res]
-            all_sp_search_res.append(single_search_processed)
-        return all_sp_search_res
+        queries, limit = self.plan_queries(self.get_SP_search_queries(song_info))
+        for template, query in queries:
+            single_search_raw = self.search_SP(query, "track", limit=self.get_request_limit(limit))
+            yield template, self.process_SP_search_results(single_search_raw, limit)
 
-    def create_SP_playlist(self, sp_playlist: list, yt_playlist_name: str) -> str:
+    def get_SP_search_queries(self, song_info: TrackInfo) -> dict:
         '''
-        Creates a Spotify playlist and handles duplicates based on self.keep_dupes.\n
+        Given a YouTube Music song, return the Spotify search queries used to find it.\n
         Parameters:
-        - (list) SP_PLAYLIST: list of Spotify song IDs to add to new Spotify playlist
-        - (str) YT_PLAYLIST_NAME: name of Spotify playlist
+        - (TrackInfo) song_info: record with info about the target YouTube Music song\n
+        Return:
+        - (dict) template name -> search query, in default order
+        '''
+        query_1 = f"{song_info.title}"
+        query_2 = f"{song_info.title} {song_info.artist}"
+        query_3 = f"{song_info.title} by {song_info.artist}"
+        queries = {"title": query_1, "title artist": query_2, "title by artist": query_3}
+        if "(" in song_info.title or "(" in song_info.artist:
+            queries["title artist without parentheses"] = self.remove_parentheses(query_2)
+        return queries
+
+    def process_SP_search_results(self, single_search_raw: dict, limit: int = None) -> list[TrackInfo]:
+        '''
+        Given the raw response of a Spotify track search, return the song info of its first limit results
+        (with their rank in the response).\n
+        Parameters:
+        - (dict) single_search_raw: search response returned by sp_client.search
+        - (int) limit: number of results to keep (None to keep all of them)\n
+        Return:
+        - (list[TrackInfo]) list of TrackInfo records of the search results
+        '''
+        return [self.get_SP_song_info(res, rank) for rank, res in enumerate(single_search_raw["tracks"]["items"][:limit])
+            if res]
+
+    def search_ISRC(self, isrc: str) -> list[TrackInfo]:
+        '''
+        Given an ISRC, search Spotify for tracks with that ISRC (see Converter.get_ISRC_match_ID).\n
+        Parameters:
+        - (str) isrc: ISRC\n
+        Return:
+        - (list[TrackInfo]) TrackInfo records of the search results
+        '''
+        return self.process_SP_search_results(self.search_SP(f"isrc:{isrc}", "track", limit=self.LIMIT))
+
+    def create_SP_playlist(self, yt_playlist_name: str) -> str:
+        '''
+        Creates an empty Spotify playlist for the songs of a YouTube Music playlist.\n
+        Parameters:
+        - (str) YT_PLAYLIST_NAME: name of YouTube Music playlist
         Return:
         - (str) playlist ID of newly created Spotify playlist
         '''
-        self.print("Finishing up...")
-        # CREATE EMPTY SPOTIFY PLAYLIST
-        user_ID = self.sp_client.me()["id"]
-        sp_playlist_ID = self.sp_client.user_playlist_create(
-                        user=user_ID, 
-                        name=f"{yt_playlist_name} (copied from YouTube Music)",
-                        public=False,
-                        collaborative=False,
-                        description="Includes duplicates" if self.keep_dupes else "Does not include duplicates")["id"]
-        # ADD LIST OF SONGS TO SPOTIFY PLAYLIST (NO DUPLICATES YET)
-        if sp_playlist:
-            while len(sp_playlist) > 100:
-                self.sp_client.user_playlist_add_tracks(user_ID, sp_playlist_ID, sp_playlist[:100])
-                sp_playlist = sp_playlist[100:]
-            self.sp_client.user_playlist_add_tracks(user_ID, sp_playlist_ID, sp_playlist)
-        # HANDLE DUPLICATES
-        dupes = [dupe["id"] for dupe in self.NOT_ADDED_SONGS[yt_playlist_name]["dupes"]]
-        if self.keep_dupes and dupes:
-            while len(dupes) > 100:
-                self.sp_client.user_playlist_add_tracks(user_ID, sp_playlist_ID, dupes[:100])
-                dupes = dupes[100:]
-        self.print("Finished!")
+        with self.metrics.time("create"):
+            user_ID = self.sp_client.me()["id"]
+            sp_playlist_ID = self.sp_client.user_playlist_create(
+                            user=user_ID, 
+                            name=f"{yt_playlist_name} (copied from YouTube Music)",
+                            public=False,
+                            collaborative=False,
+                            description="Includes duplicates" if self.keep_dupes else "Does not include duplicates")["id"]
         return sp_playlist_ID
 
+    def add_SP_playlist_items(self, sp_playlist_ID: str, track_IDs: list[str]) -> None:
+        '''
+        Adds tracks to the end of a Spotify playlist, SP_BATCH_SIZE tracks per request.\n
+        Parameters:
+        - (str) sp_playlist_ID: playlist ID of Spotify playlist
+        - (list[str]) track_IDs: list of Spotify track IDs to add\n
+        Return:
+        - None
+        '''
+        for start in range(0, len(track_IDs), self.SP_BATCH_SIZE):
+            with self.metrics.time("write"):
+                self.sp_client.playlist_add_items(sp_playlist_ID, track_IDs[start:start + self.SP_BATCH_SIZE])
+        return
+
     ''' 
     Convert YouTube Music liked albums to Spotify
     '''
     def convert_YT_to_SP_liked_albums(self) -> None:
         '''
         Given a list of YouTube Music Liked Albums, add all albums to Spotify 
-        Liked Albums, and add all unadded albums to self.NOT_ADDED_ALBUMS.\n
+        Liked Albums, and add all unadded albums to self.NOT_ADDED_ALBUMS. Albums are
+        matched concurrently (see map_in_order) and saved in batches of self.SP_ALBUM_BATCH_SIZE.\n
         Parameters:
         - None\n
         Return:
         - None\n     
         '''
+        progress = self.get_journal_progress("LIKED_ALBUMS")
+        if progress and progress["done"]:
+            self.NOT_ADDED_ALBUMS.extend(progress["not_added"])
+            return
+        recorded_albums = progress["matches"] if progress else {}
+        not_added_albums = []
         liked_albums = self.ytm_client.get_library_albums(limit=None)
         if liked_albums:
-            self.print(f"\nAdding YouTube Music saved albums to Spotify library...")
-            for album in liked_albums:
-                found = {}
-                album_name = album["title"]
-                album_artist = album["artists"][0]["name"]
-                album_year = album["year"]
-                sp_query = f"{album_name} by {album_artist}"
-                sp_search_res = self.sp_client.search(sp_query, type="album")["albums"]["items"]
-                for res in sp_search_res:
-                    res_ID = res["id"]
-                    found[res_ID] = 0
-                    if res['artists'][0]['name'] == album_artist:
-                        found[res_ID] += self.SCORE
-                    if res['name'] == album_name:
-                        found[res_ID] += self.SCORE
-                    if res['name'] in album_name or album_name in res['name']:
-                        found[res_ID] += self.SCORE
-                    if res['release_date'][:3] == album_year:
-                        found[res_ID] += self.SCORE
-                if found:
-                    self.sp_client.current_user_saved_albums_add([max(found, key=found.get)])
-                    self.print(f"Added album: {sp_query}")
-                else:
-                    self.NOT_ADDED_ALBUMS.append(sp_query)
+            with self.metrics.playlist("Liked Albums"):
+                self.print(f"\nAdding YouTube Music saved albums to Spotify library...")
+                albums_info = [(album["title"], album["artists"][0]["name"], album["year"]) for album in liked_albums]
+                sp_queries = [f"{album_name} by {album_artist}" for album_name, album_artist, _ in albums_info]
+                res_IDs = self.map_in_order(lambda album_info: self.find_best_SP_album_ID(*album_info),
+                    albums_info, recorded_albums, lambda album_info: f"{album_info[0]} by {album_info[1]}")
+                # Albums are saved in batches, so the journal records how many were saved (like playlist writes)
+                flush_callback = None
+                if self.journal:
+                    flush_callback = functools.partial(self.journal.record_write, self.get_journal_key("LIKED_ALBUMS"))
+                saved_albums = PlaylistWriter(self.add_SP_saved_albums, self.SP_ALBUM_BATCH_SIZE,
+                    progress["written"] if progress else 0, flush_callback)
+                for index, (sp_query, res_ID) in enumerate(zip(sp_queries, res_IDs)):
+                    recorded = recorded_albums.get(index) == (sp_query, res_ID)
+                    self.record_journal_track("LIKED_ALBUMS", index, sp_query, res_ID)
+                    if res_ID:
+                        saved_albums.add(res_ID)
+                        if not recorded:
+                            self.print_progress("Liked Albums", index + 1, len(albums_info), f"Added album: {sp_query}")
+                    else:
+                        not_added_albums.append(sp_query)
+                saved_albums.flush()
+                self.record_write_stats("Liked Albums", saved_albums)
+                self.report("albums_done", added=len(albums_info) - len(not_added_albums), not_added=not_added_albums)
+        self.NOT_ADDED_ALBUMS.extend(not_added_albums)
+        self.record_journal_done("LIKED_ALBUMS", not_added_albums)
+        return
+
+    def add_SP_saved_albums(self, album_IDs: list[str]) -> None:
+        '''
+        Adds albums to Spotify Liked Albums (at most SP_ALBUM_BATCH_SIZE albums).\n
+        Parameters:
+        - (list[str]) album_IDs: list of Spotify album IDs to add\n
+        Return:
+        - None
+        '''
+        with self.metrics.time("write"):
+            self.sp_client.current_user_saved_albums_add(album_IDs)
         return
 
+    def find_best_SP_album_ID(self, album_name: str, album_artist: str, album_year: str) -> str:
+        '''
+        Given a YouTube Music album, return the ID of its best match on Spotify.\n
+        Parameters:
+        - (str) album_name: name of the YouTube Music album
+        - (str) album_artist: name of the first artist of the album
+        - (str) album_year: album release year\n
+        Return:
+        - (str) Spotify album ID of the best match (None if not found)
+        '''
+        found = {}
+        sp_search_res = self.search_SP(f"{album_name} by {album_artist}", "album")["albums"]["items"]
+        for res in sp_search_res:
+            res_ID = res["id"]
+            found[res_ID] = 0
+            if res['artists'][0]['name'] == album_artist:
+                found[res_ID] += self.SCORE
+            if res['name'] == album_name:
+                found[res_ID] += self.SCORE
+            if res['name'] in album_name or album_name in res['name']:
+                found[res_ID] += self.SCORE
+            if res['release_date'][:3] == album_year:
+                found[res_ID] += self.SCORE
+        if not found:
+            return None
+        return max(found, key=found.get)
+
     '''
     Helper functions: Utils
     '''
+    def get_YT_playlist(self, yt_playlist_ID: str) -> tuple[str, list[dict]]:
+        '''
+        Given a YouTube Music playlist ID, return the name and all tracks of the playlist.\n
+        Parameters:
+        - (str) yt_playlist_ID: playlist ID for a YouTube Music playlist, "LIKED_SONGS" for liked songs
+            or "LIKED_VIDS" for liked videos\n
+        Return:
+        - (tuple[str, list[dict]]) name of the playlist and list of all tracks on the playlist
+        '''
+        with self.metrics.time("fetch"):
+            if yt_playlist_ID == "LIKED_SONGS":
+                yt_playlist_name = "Liked Songs"
+                yt_playlist = self.ytm_client.get_library_songs(limit=None)
+            elif yt_playlist_ID == "LIKED_VIDS":
+                yt_playlist_name = "Liked Videos"
+                yt_playlist = self.ytm_client.get_liked_songs(limit=None)
+            else:
+                yt_playlist_name = self.ytm_client.get_playlist(yt_playlist_ID)["title"]
+                yt_playlist = self.ytm_client.get_playlist(yt_playlist_ID, limit=None)
+        return yt_playlist_name, yt_playlist["tracks"]
+
+    def get_YT_songs_to_match(self, songs_info: list) -> list:
+        '''
+        Given the song info of the tracks of a YouTube Music playlist, return the song info of the
+        tracks that should be searched for on Spotify (ie. songs and official music videos).\n
+        Parameters:
+        - (list) songs_info: TrackInfo record for each track (None for missing tracks)\n
+        Return:
+        - (list) TrackInfo record for each track to search for, None for every other track
+        '''
+        return [song_info if song_info and self.is_YT_song_type(song_info) else None
+            for song_info in songs_info]
+
+    def is_YT_song_type(self, song_info: TrackInfo) -> bool:
+        '''
+        Given a YouTube Music song, return whether it is a song or an official music video 
+        (and can therefore be searched for on Spotify) rather than a user-uploaded video.\n
+        Parameters:
+        - (TrackInfo) song_info: record of a YouTube Music song\n
+        Return:
+        - (bool) True if the song has a videoType of MUSIC_VIDEO_TYPE_ATV or MUSIC_VIDEO_TYPE_OMV
+        '''
+        return (song_info.video_type == "MUSIC_VIDEO_TYPE_ATV" or 
+            song_info.video_type == "MUSIC_VIDEO_TYPE_OMV")
+
     def download_YT_videos(self) -> None:
         '''
-        Given a list of video IDs of YouTube videos, download all videos using youtube_dl.\n
+        Download the YouTube videos of every playlist that were not added to Spotify (ie. the "downloads"
+        of self.NOT_ADDED_SONGS) as MP3 files, in one folder per playlist in self.DOWNLOAD_DIRECTORY. Videos
+        are downloaded and converted in parallel by self.downloader (see Downloader), and videos that were
+        already downloaded are skipped.\n
         Parameters:
-        - (str) yt_playlist_name: name of the YouTube playlist currently being converted
-        - (list) yt_download_IDs: list of YouTube videos in the playlist that were not added
-            to the Spotify playlist and must be downloaded\n
+        - None\n
         Return:
         - None\n
         NOTE: YouTube Music results can have video types (ie. song["videoType"] values) of 
@@ -206,29 +386,40 @@ class YouTubeMusicConverter(Converter):
         song to the newly created Spotify playlist. Thus, we simply download the YouTube Music
         result instead.
         '''
-        def print_YT_download_progress(d):
+        def print_YT_download_progress(job: dict, result: dict) -> None:
             '''
-            Print "Finished downloading" after every completed YouTube video download.\n
+            Print the outcome of each YouTube video download as soon as it finishes (or, with self.reporter,
+            write it as a "download" event and print a progress line every few seconds).\n
             Parameters:
-            - (?) d: download progress object from youtube_dl (not sure of object type)\n
+            - (dict) job: download job (see Downloader.download)
+            - (dict) result: result of the job\n
             Return:
             - None
             '''
-            if d["status"] == "finished":
-                self.print(f"\nFinished downloading song {index + 1}: {video_dict['query']}")
+            self.metrics.count(f"downloads.{result['status']}")
+            self.report("download", status=result["status"], id=job["id"], query=job["query"],
+                error=repr(result["error"]) if result["error"] else None)
+            finished.append(job["id"])
+            if result["status"] == "failed":
+                message = f"\nFailed to download song {job['index'] + 1}: {job['query']}"
+                logging.info(f"Download of {job['id']} failed: {result['error']!r}")
+            elif result["status"] == "skipped":
+                message = f"\nAlready downloaded song {job['index'] + 1}: {job['query']}"
+            else:
+                message = f"\nFinished downloading song {job['index'] + 1}: {job['query']}"
+            self.print_progress("Downloads", len(finished), len(jobs), message)
             return
 
         if self.download_videos:
+            downloader = self.downloader or Downloader(self.YTDL_OPTIONS)
+            jobs = []
+            finished = []
             for playlist in self.NOT_ADDED_SONGS:
-                self.YTDL_OPTIONS['outtmpl'] = f"/{playlist}/%(title)s.%(ext)s"
-                # self.YTDL_OPTIONS['progress_hooks'] = [print_YT_download_progress]
                 yt_downloads = self.NOT_ADDED_SONGS[playlist]["downloads"]
+                directory = os.path.join(self.DOWNLOAD_DIRECTORY, downloader.get_safe_filename(playlist))
                 self.print(f"\n{'_'*5}Downloading {len(yt_downloads)} videos for playlist: {playlist}{'_'*5}...")
-                for index, video_dict in enumerate(yt_downloads):
-                    try:
-                        with youtube_dl.YoutubeDL(self.YTDL_OPTIONS) as ytdl:
-                            ytdl.download(["https://www.youtube.com/watch?v=" + video_dict["id"]])
-                        self.print(f"\nFinished downloading song {index + 1}: {video_dict['query']}")
-                    except:
-                        self.print(f"\nFailed to download song {index + 1}: {video_dict['query']}")
+                jobs.extend({"index": index, "id": video_dict["id"], "query": video_dict["query"],
+                    "directory": directory} for index, video_dict in enumerate(yt_downloads))
+            with self.metrics.time("download"):
+                downloader.download(jobs, print_YT_download_progress)
         return
@@ -0,0 +1,348 @@
+import json
+import random
+import threading
+import time
+from SearchCacheClass import SearchCache
+
+class SyntheticLibrary():
+    ''' SYLLABLES: syllables from which the words of titles, artists and albums are made '''
+    SYLLABLES = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "da", "pe", "zu", "an", "el", "or", "is", "um"]
+
+    ''' MISSING_RATE: fraction of tracks that are only available on one of the two platforms '''
+    MISSING_RATE = 0.05
+
+    ''' VIDEO_RATE: fraction of YouTube Music tracks that are user-uploaded videos (MUSIC_VIDEO_TYPE_UGC) '''
+    VIDEO_RATE = 0.05
+
+    ''' DUPE_RATE: fraction of playlist entries that repeat an earlier track of the same playlist '''
+    DUPE_RATE = 0.02
+
+    ''' CATALOG_FACTOR: number of catalog tracks per library track (the others only show up in search results) '''
+    CATALOG_FACTOR = 3
+
+    ''' PLAYLISTS: number of playlists (besides liked songs) that the library tracks are spread over '''
+    PLAYLISTS = 4
+
+    ''' ALBUMS: number of liked albums '''
+    ALBUMS = 20
+
+    def __init__(self, size: int, seed: int = 0) -> None:
+        '''
+        Deterministic synthetic music catalog shared by FakeSpotifyClient and FakeYTMusicClient, with a
+        library of size tracks on each platform: a "benchmark" playlist with all of them, liked songs,
+        PLAYLISTS playlists that overlap with the liked songs, and ALBUMS liked albums.
+        '''
+        self.size = size
+        self.rng = random.Random(seed)
+        self.words = self.make_words(max(200, size // 2))
+        self.artists = [self.make_name(self.rng.randint(1, 2)) for _ in range(max(10, size // 10))]
+        self.tracks = []
+        self.postings = {}
+        for index in range(size * self.CATALOG_FACTOR):
+            artist = self.rng.choice(self.artists)
+            track = {
+                "index": index,
+                "title": self.make_name(self.rng.randint(1, 4)),
+                "artist": artist,
+                "album": f"{artist} {self.make_name(1)}",
+                "year": str(self.rng.randint(1970, 2024)),
+                "duration": self.rng.randint(90, 420),
+                "isrc": f"QZ{seed % 100:02d}{index:08d}",
+                "on_sp": self.rng.random() >= self.MISSING_RATE,
+                "on_yt": self.rng.random() >= self.MISSING_RATE,
+                "video": self.rng.random() < self.VIDEO_RATE,
+            }
+            self.tracks.append(track)
+            title_words = set(track["title"].lower().split())
+            track["title_words"] = len(title_words)
+            for word in title_words:
+                self.postings.setdefault(word, []).append(index)
+        library = self.rng.sample(range(len(self.tracks)), size)
+        self.playlists = {"benchmark": self.add_dupes(library)}
+        self.liked_songs = self.add_dupes(library[:size // 2])
+        for number in range(self.PLAYLISTS):
+            # Each playlist shares half of its tracks with the liked songs
+            start = (size // 2) + number * (size // (2 * self.PLAYLISTS))
+            shared = library[number::2 * self.PLAYLISTS][:size // (4 * self.PLAYLISTS)]
+            self.playlists[f"playlist{number}"] = self.add_dupes(
+                library[start:start + size // (4 * self.PLAYLISTS)] + shared)
+        self.albums = [self.tracks[index] for index in library[:self.ALBUMS]]
+        pass
+
+    def count_playlist_entries(self) -> int:
+        return sum(len(entries) for playlist_ID, entries in self.playlists.items() if playlist_ID != "benchmark")
+
+    def make_words(self, count: int) -> list[str]:
+        words = set()
+        while len(words) < count:
+            words.add("".join(self.rng.choice(self.SYLLABLES) for _ in range(self.rng.randint(2, 4))))
+        return sorted(words)
+
+    def make_name(self, length: int) -> str:
+        return " ".join(self.rng.choice(self.words).capitalize() for _ in range(length))
+
+    def add_dupes(self, indices: list[int]) -> list[int]:
+        entries = list(indices)
+        for _ in range(int(len(indices) * self.DUPE_RATE)):
+            entries.insert(self.rng.randint(1, len(entries)), self.rng.choice(indices))
+        return entries
+
+    def search(self, query: str, platform: str, limit: int) -> list[dict]:
+        '''
+        Given a query, return the tracks of a platform whose title words are all in the query, most
+        artist words in the query first.\n
+        Parameters:
+        - (str) query: search query
+        - (str) platform: "on_sp" or "on_yt"
+        - (int) limit: max number of results\n
+        Return:
+        - (list[dict]) matching catalog tracks
+        '''
+        words = set(query.lower().replace('"', " ").split())
+        counts = {}
+        for word in words:
+            for index in self.postings.get(word, ()):
+                counts[index] = counts.get(index, 0) + 1
+        found = [self.tracks[index] for index, count in counts.items()
+            if self.tracks[index][platform] and count == self.tracks[index]["title_words"]]
+        found.sort(key=lambda track: (-len(words & set(track["artist"].lower().split())), track["index"]))
+        return found[:limit]
+
+class FakeClient():
+    ''' WRITE_METHODS: methods that modify the library (their latency is write_latency) '''
+    WRITE_METHODS = ()
+
+    def __init__(self, library: SyntheticLibrary, latency: float = 0.0, write_latency: float = None,
+                 recorded_searches_path: str = None) -> None:
+        '''
+        Base class of the fake API clients. Every method call sleeps for the configured latency and is
+        counted. If a search cache file recorded by real conversions is given (see SearchCache), its
+        recorded responses are replayed for the searches it covers, and the synthetic library answers
+        every other call.
+        '''
+        self.library = library
+        self.latency = latency
+        self.write_latency = latency if write_latency is None else write_latency
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.recorded_searches = {}
+        self.get_search_key = None
+        if recorded_searches_path:
+            search_cache = SearchCache(recorded_searches_path)
+            self.get_search_key = search_cache.get_key
+            for platform, query, limit, filter, response in search_cache.conn.execute(
+                    "SELECT platform, query, result_limit, filter, response FROM search_cache"):
+                self.recorded_searches[(platform, query, limit, filter)] = response
+            search_cache.close()
+        pass
+
+    def call(self, method: str, synthetic_func, *args, **kwargs):
+        time.sleep(self.write_latency if method in self.WRITE_METHODS else self.latency)
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        return synthetic_func(*args, **kwargs)
+
+    def replay_search(self, platform: str, query: str, limit: int, filter: str):
+        if not self.recorded_searches:
+            return None
+        response = self.recorded_searches.get(self.get_search_key(platform, query, limit, filter))
+        return json.loads(response) if response else None
+
+    def get_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def get_write_calls(self) -> int:
+        return sum(count for method, count in self.calls.items() if method in self.WRITE_METHODS)
+
+class FakeSpotifyClient(FakeClient):
+    ''' PAGE_SIZE: number of items per page of a playlist '''
+    PAGE_SIZE = 100
+
+    WRITE_METHODS = ("user_playlist_create", "playlist_add_items", "current_user_saved_albums_add")
+
+    def __init__(self, library: SyntheticLibrary, latency: float = 0.0, write_latency: float = None,
+                 recorded_searches_path: str = None) -> None:
+        super().__init__(library, latency, write_latency, recorded_searches_path)
+        self.created = {}
+        self.saved_albums = []
+        self.entries = {}
+        pass
+
+    def get_track(self, index: int) -> dict:
+        track = self.library.tracks[index]
+        return {"name": track["title"], "artists": [{"name": track["artist"]}], "id": f"sp{index}",
+            "album": {"name": track["album"]}, "duration_ms": track["duration"] * 1000,
+            "external_ids": {"isrc": track["isrc"]}}
+
+    def get_page(self, kind: str, playlist_ID: str, offset: int, limit: int) -> dict:
+        entries = self.get_entries(kind, playlist_ID)
+        end = offset + limit
+        if kind == "albums":
+            items = [{"album": {"name": track["album"], "artists": [{"name": track["artist"]}],
+                "release_date": f"{track['year']}-01-01"}} for track in entries[offset:end]]
+        else:
+            items = [{"track": self.get_track(index)} for index in entries[offset:end]]
+        return {"items": items, "total": len(entries), "offset": offset, "limit": limit,
+            "next": f"{kind}:{playlist_ID}:{end}:{limit}" if end < len(entries) else None}
+
+    def get_entries(self, kind: str, playlist_ID: str) -> list:
+        with self.lock:
+            if (kind, playlist_ID) not in self.entries:
+                if kind == "albums":
+                    entries = self.library.albums
+                else:
+                    indices = self.library.liked_songs if kind == "saved" else self.library.playlists[playlist_ID]
+                    entries = [index for index in indices if self.library.tracks[index]["on_sp"]]
+                self.entries[(kind, playlist_ID)] = entries
+            return self.entries[(kind, playlist_ID)]
+
+    def search(self, q: str, type: str = "track", limit: int = 10, **kwargs) -> dict:
+        def synthetic_search(q, type="track", limit=10, **kwargs):
+            recorded_response = self.replay_search("Spotify", q, limit, type)
+            if recorded_response is not None:
+                return recorded_response
+            if type == "album":
+                return {"albums": {"items": [{"id": f"spalbum{track['index']}", "name": track["album"],
+                    "artists": [{"name": track["artist"]}], "release_date": f"{track['year']}-01-01"}
+                    for track in self.library.search(q.split(" by ")[0], "on_sp", limit)]}}
+            if q.startswith("isrc:"):
+                tracks = [track for track in self.library.tracks if track["isrc"] == q[5:] and track["on_sp"]]
+            else:
+                tracks = self.library.search(q, "on_sp", limit)
+            return {"tracks": {"items": [self.get_track(track["index"]) for track in tracks]}}
+        return self.call("search", synthetic_search, q, type=type, limit=limit, **kwargs)
+
+    def playlist(self, playlist_id: str, **kwargs) -> dict:
+        return self.call("playlist", lambda playlist_id, **kwargs: {"name": f"Spotify {playlist_id}"},
+            playlist_id, **kwargs)
+
+    def playlist_tracks(self, playlist_id: str, limit: int = PAGE_SIZE, offset: int = 0, **kwargs) -> dict:
+        return self.call("playlist_tracks", lambda playlist_id, limit, offset, **kwargs: self.get_page(
+            "playlist", playlist_id, offset, limit),
+            playlist_id, limit=limit, offset=offset, **kwargs)
+
+    def current_user_saved_tracks(self, limit: int = 20, offset: int = 0, **kwargs) -> dict:
+        return self.call("current_user_saved_tracks", lambda limit, offset, **kwargs: self.get_page(
+            "saved", None, offset, limit), limit=limit, offset=offset, **kwargs)
+
+    def current_user_saved_albums(self, limit: int = 20, offset: int = 0, **kwargs) -> dict:
+        return self.call("current_user_saved_albums", lambda limit, offset, **kwargs: self.get_page(
+            "albums", None, offset, limit), limit=limit, offset=offset, **kwargs)
+
+    def next(self, result: dict) -> dict:
+        def synthetic_next(result):
+            if not result["next"]:
+                return None
+            kind, playlist_ID, offset, limit = result["next"].split(":")
+            playlist_ID = None if playlist_ID == "None" else playlist_ID
+            return self.get_page(kind, playlist_ID, int(offset), int(limit))
+        return self.call("next", synthetic_next, result)
+
+    def current_user_playlists(self, **kwargs) -> dict:
+        return self.call("current_user_playlists", lambda **kwargs: {"items": [{"id": playlist_ID}
+            for playlist_ID in self.library.playlists if playlist_ID != "benchmark"], "next": None}, **kwargs)
+
+    def me(self) -> dict:
+        return self.call("me", lambda: {"id": "benchmark"})
+
+    def user_playlist_create(self, user: str, name: str, **kwargs) -> dict:
+        def synthetic_create(user, name, **kwargs):
+            with self.lock:
+                playlist_ID = f"spcreated{len(self.created)}"
+                self.created[playlist_ID] = []
+            return {"id": playlist_ID}
+        return self.call("user_playlist_create", synthetic_create, user, name, **kwargs)
+
+    def playlist_add_items(self, playlist_id: str, items: list, position: int = None) -> dict:
+        def synthetic_add(playlist_id, items, position=None):
+            assert len(items) <= 100, "Spotify accepts at most 100 tracks per request"
+            self.created[playlist_id].extend(items)
+            return {"snapshot_id": str(len(self.created[playlist_id]))}
+        return self.call("playlist_add_items", synthetic_add, playlist_id, items, position=position)
+
+    def current_user_saved_albums_add(self, albums: list = []) -> None:
+        def synthetic_save(albums):
+            assert len(albums) <= 20, "Spotify accepts at most 20 albums per request"
+            self.saved_albums.extend(albums)
+        return self.call("current_user_saved_albums_add", synthetic_save, albums)
+
+class FakeYTMusicClient(FakeClient):
+    WRITE_METHODS = ("create_playlist", "add_playlist_items", "rate_playlist")
+
+    def __init__(self, library: SyntheticLibrary, latency: float = 0.0, write_latency: float = None,
+                 recorded_searches_path: str = None) -> None:
+        super().__init__(library, latency, write_latency, recorded_searches_path)
+        self.created = {}
+        self.liked_albums = []
+        pass
+
+    def get_track(self, index: int, category: str = "Songs") -> dict:
+        track = self.library.tracks[index]
+        return {"title": track["title"], "artists": [{"name": track["artist"]}], "album": {"name": track["album"]},
+            "duration": f"{track['duration'] // 60}:{track['duration'] % 60:02d}", "videoId": f"yt{index}",
+            "resultType": "video" if track["video"] else "song", "category": category,
+            "videoType": "MUSIC_VIDEO_TYPE_UGC" if track["video"] else "MUSIC_VIDEO_TYPE_ATV"}
+
+    def get_tracks(self, indices: list[int]) -> list[dict]:
+        return [self.get_track(index) for index in indices if self.library.tracks[index]["on_yt"]]
+
+    def search(self, query: str, filter: str = None, limit: int = 20, **kwargs) -> list[dict]:
+        def synthetic_search(query, filter=None, limit=20, **kwargs):
+            recorded_response = self.replay_search("YouTube Music", query, limit, filter)
+            if recorded_response is not None:
+                return recorded_response
+            if filter == "albums":
+                return [{"browseId": f"ytalbum{track['index']}", "title": track["album"],
+                    "artists": [{"name": track["artist"]}], "year": track["year"]}
+                    for track in self.library.search(query.split(" by ")[0], "on_yt", limit)]
+            return [self.get_track(track["index"], "Top result" if rank == 0 else "Songs")
+                for rank, track in enumerate(self.library.search(query, "on_yt", limit))]
+        return self.call("search", synthetic_search, query, filter=filter, limit=limit, **kwargs)
+
+    def get_playlist(self, playlistId: str, limit: int = 100, **kwargs) -> dict:
+        return self.call("get_playlist", lambda playlistId, limit=100, **kwargs: {"title": f"YouTube Music {playlistId}",
+            "tracks": self.get_tracks(self.library.playlists[playlistId])}, playlistId, limit=limit, **kwargs)
+
+    def get_library_songs(self, limit: int = 25, **kwargs) -> dict:
+        return self.call("get_library_songs", lambda limit=25, **kwargs: {"tracks":
+            self.get_tracks(self.library.liked_songs)}, limit=limit, **kwargs)
+
+    def get_liked_songs(self, limit: int = 100) -> dict:
+        return self.call("get_liked_songs", lambda limit=100: {"tracks": self.get_tracks(self.library.liked_songs)},
+            limit=limit)
+
+    def get_library_playlists(self, limit: int = 25) -> list[dict]:
+        # The first library playlist is "Your Likes", which the converter skips
+        return self.call("get_library_playlists", lambda limit=25: [{"playlistId": "LM"}] + [{"playlistId": playlist_ID}
+            for playlist_ID in self.library.playlists if playlist_ID != "benchmark"], limit=limit)
+
+    def get_library_albums(self, limit: int = 25, **kwargs) -> list[dict]:
+        return self.call("get_library_albums", lambda limit=25, **kwargs: [{"browseId": f"ytalbum{track['index']}",
+            "title": track["album"], "artists": [{"name": track["artist"]}], "year": track["year"]}
+            for track in self.library.albums], limit=limit, **kwargs)
+
+    def get_album(self, browseId: str) -> dict:
+        return self.call("get_album", lambda browseId: {"audioPlaylistId": "OLAK" + browseId}, browseId)
+
+    def rate_playlist(self, playlistId: str, rating: str = "INDIFFERENT") -> dict:
+        def synthetic_rate(playlistId, rating="INDIFFERENT"):
+            self.liked_albums.append(playlistId)
+            return {}
+        return self.call("rate_playlist", synthetic_rate, playlistId, rating)
+
+    def create_playlist(self, title: str, description: str, privacy_status: str = "PRIVATE",
+                        video_ids: list = None, **kwargs) -> str:
+        def synthetic_create(title, description, privacy_status="PRIVATE", video_ids=None, **kwargs):
+            with self.lock:
+                playlist_ID = f"ytcreated{len(self.created)}"
+                self.created[playlist_ID] = list(video_ids or [])
+            return playlist_ID
+        return self.call("create_playlist", synthetic_create, title, description, privacy_status=privacy_status,
+            video_ids=video_ids, **kwargs)
+
+    def add_playlist_items(self, playlistId: str, videoIds: list = None, duplicates: bool = False, **kwargs) -> dict:
+        def synthetic_add(playlistId, videoIds=None, duplicates=False, **kwargs):
+            self.created[playlistId].extend(videoIds or [])
+            return {"status": "STATUS_SUCCEEDED"}
+        return self.call("add_playlist_items", synthetic_add, playlistId, videoIds=videoIds, duplicates=duplicates,
+            **kwargs)
@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from FakeClientsClass import SyntheticLibrary, FakeSpotifyClient, FakeYTMusicClient
+from SpotifyConverterClass import SpotifyConverter
+from YouTubeConverterClass import YouTubeMusicConverter
+from SearchCacheClass import SearchCache
+from MatchStoreClass import MatchStore
+from CatalogIndexClass import CatalogIndex
+from QueryPlannerClass import QueryPlanner
+
+''' SCENARIOS: conversions that can be benchmarked: the converter class, the entry point that each one drives,
+    and the number of playlist entries it converts '''
+SCENARIOS = {
+    "sp_playlist": (SpotifyConverter, lambda converter: converter.convert_SP_to_YT_playlist("benchmark"),
+        lambda library: len(library.playlists["benchmark"])),
+    "yt_playlist": (YouTubeMusicConverter, lambda converter: converter.convert_YT_to_SP_playlist("benchmark"),
+        lambda library: len(library.playlists["benchmark"])),
+    "sp_library": (SpotifyConverter, lambda converter: converter.convert_SP_to_YT_library(),
+        lambda library: len(library.liked_songs) + library.count_playlist_entries()),
+    "yt_library": (YouTubeMusicConverter, lambda converter: converter.convert_YT_to_SP_library(),
+        lambda library: library.count_playlist_entries()),
+}
+
+''' RESULTS_DIRECTORY: directory in which the results of each run are saved (one file per commit) '''
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def main():
+    args = get_args()
+    results = {"commit": get_commit(), "date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+        "options": vars(args), "runs": []}
+    print(f"{'scenario':<12} {'tracks':>7} {'wall (s)':>9} {'tracks/s':>9} {'calls/track':>12} "
+        + f"{'writes':>7} {'peak MB':>8}")
+    for size in args.sizes:
+        library = SyntheticLibrary(size, seed=args.seed)
+        for scenario in args.scenarios:
+            run = run_scenario(scenario, library, args)
+            results["runs"].append(run)
+            print(f"{scenario:<12} {run['tracks']:>7} {run['wall_time']:>9.2f} {run['tracks_per_second']:>9.1f} "
+                + f"{run['calls_per_track']:>12.2f} {run['write_calls']:>7} {run['peak_memory_mb']:>8.1f}")
+    output = args.output or os.path.join(RESULTS_DIRECTORY, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults saved to {output}")
+    if args.compare:
+        compare_results(args.compare, results)
+    return
+
+'''
+Helper functions: Running scenarios
+'''
+def run_scenario(scenario: str, library: SyntheticLibrary, args: argparse.Namespace) -> dict:
+    '''
+    Given a scenario and a synthetic library, convert the library once to measure wall time and API
+    calls, and once more under tracemalloc to measure peak memory (tracemalloc slows down the run).\n
+    Parameters:
+    - (str) scenario: key of SCENARIOS
+    - (SyntheticLibrary) library: library that the fake clients serve
+    - (argparse.Namespace) args: benchmark options\n
+    Return:
+    - (dict) measurements of the scenario
+    '''
+    wall_time, sp_client, ytm_client = convert(scenario, library, args)
+    peak_memory = 0
+    if not args.skip_memory:
+        tracemalloc.start()
+        convert(scenario, library, args)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    calls = sp_client.get_calls() + ytm_client.get_calls()
+    tracks = SCENARIOS[scenario][2](library)
+    return {
+        "scenario": scenario,
+        "library_size": library.size,
+        "tracks": tracks,
+        "wall_time": wall_time,
+        "tracks_per_second": tracks / wall_time,
+        "api_calls": calls,
+        "calls_per_track": calls / tracks,
+        "write_calls": sp_client.get_write_calls() + ytm_client.get_write_calls(),
+        "peak_memory_mb": peak_memory / 2**20,
+        "spotify_calls": sp_client.calls,
+        "youtube_music_calls": ytm_client.calls,
+    }
+
+def convert(scenario: str, library: SyntheticLibrary, args: argparse.Namespace) -> tuple:
+    '''
+    Given a scenario, run it once with fresh fake clients, converter and (if enabled) local stores.\n
+    Parameters:
+    - (str) scenario: key of SCENARIOS
+    - (SyntheticLibrary) library: library that the fake clients serve
+    - (argparse.Namespace) args: benchmark options\n
+    Return:
+    - (tuple) wall time in seconds, fake Spotify client and fake YouTube Music client
+    '''
+    converter_class, entry_point, _ = SCENARIOS[scenario]
+    sp_client = FakeSpotifyClient(library, args.latency, args.write_latency, args.replay)
+    ytm_client = FakeYTMusicClient(library, args.latency, args.write_latency, args.replay)
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {}
+        if args.stores:
+            stores = {
+                "SEARCH_CACHE": SearchCache(os.path.join(directory, "search_cache.sqlite")),
+                "MATCH_STORE": MatchStore(os.path.join(directory, "match_store.sqlite")),
+                "CATALOG_INDEX": CatalogIndex(os.path.join(directory, "catalog_index.sqlite")),
+            }
+        if args.planner:
+            stores["QUERY_PLANNER"] = QueryPlanner(args.planner)
+        converter = converter_class(ytm_client, sp_client, False, MAX_WORKERS=args.workers,
+            PAGE_WORKERS=args.page_workers, **stores)
+        converter.print = lambda message: None
+        start = time.perf_counter()
+        entry_point(converter)
+        wall_time = time.perf_counter() - start
+        for store in stores.values():
+            store.close()
+    return wall_time, sp_client, ytm_client
+
+'''
+Helper functions: Results
+'''
+def compare_results(path: str, results: dict) -> None:
+    '''
+    Given the results of an earlier run, print how much faster each scenario of this run is.\n
+    Parameters:
+    - (str) path: results file of the earlier run
+    - (dict) results: results of this run\n
+    Return:
+    - None
+    '''
+    with open(path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    baseline_runs = {(run["scenario"], run["library_size"]): run for run in baseline["runs"]}
+    print(f"\nCompared with {baseline['commit']} ({path}):")
+    for run in results["runs"]:
+        baseline_run = baseline_runs.get((run["scenario"], run["library_size"]))
+        if baseline_run:
+            print(f"{run['scenario']:<12} {run['tracks']:>7} "
+                + f"{run['tracks_per_second'] / baseline_run['tracks_per_second']:>6.2f}x tracks/s, "
+                + f"{run['calls_per_track'] - baseline_run['calls_per_track']:>+7.2f} calls/track, "
+                + f"{run['peak_memory_mb'] - baseline_run['peak_memory_mb']:>+8.1f} MB peak memory")
+    return
+
+def get_commit() -> str:
+    '''
+    Return the short hash of the checked out commit ("-dirty" if there are uncommitted changes).
+    '''
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=directory, capture_output=True,
+            text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directory,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark conversions against fake Spotify and YouTube Music clients.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+        help="number of tracks of each synthetic library")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+        help="conversions to run")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds each fake API call takes")
+    parser.add_argument("--write-latency", type=float, default=None,
+        help="seconds each fake write call takes (defaults to --latency)")
+    parser.add_argument("--workers", type=int, default=4, help="MAX_WORKERS of the converters")
+    parser.add_argument("--page-workers", type=int, default=8, help="PAGE_WORKERS of the converters")
+    parser.add_argument("--stores", action="store_true",
+        help="use a fresh search cache, match store and catalog index for each run")
+    parser.add_argument("--planner", default=None,
+        help="query planner file shared by every run, so that later runs use the query stats of earlier ones")
+    parser.add_argument("--replay", default=None,
+        help="search cache file whose recorded searches are replayed by the fake clients")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic libraries")
+    parser.add_argument("--skip-memory", action="store_true", help="do not measure peak memory (halves the run time)")
+    parser.add_argument("--output", default=None,
+        help=f"results file (defaults to {os.path.relpath(RESULTS_DIRECTORY)}/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="results file of an earlier run to compare with")
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    main()
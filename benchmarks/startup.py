@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import select
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import RESULTS_DIRECTORY, get_commit
+
+''' MAIN_SCRIPT: command line interface whose startup is measured '''
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+''' FIRST_PROMPT: text of the first question main.py asks '''
+FIRST_PROMPT = b"Type 'L' to convert a library"
+
+def main():
+    args = get_args()
+    results = {"commit": get_commit(), "date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+        "options": vars(args), "times": []}
+    with tempfile.TemporaryDirectory() as empty_directory:
+        directory = args.directory or empty_directory
+        for _ in range(args.runs):
+            results["times"].append(time_to_first_prompt(args.script, directory, args.timeout)[0])
+        if args.imports:
+            results["imports"] = get_slowest_imports(args.script, directory, args.timeout, args.imports)
+    times = results["times"]
+    results["median"] = statistics.median(times)
+    print(f"Time to first prompt of {os.path.relpath(args.script)} over {len(times)} runs: "
+        + f"{results['median'] * 1000:.0f}ms median, {min(times) * 1000:.0f}ms min, {max(times) * 1000:.0f}ms max")
+    if args.imports:
+        print(f"\nSlowest imports before the first prompt (cumulative):")
+        for module, seconds in results["imports"]:
+            print(f"{seconds * 1000:>8.1f}ms  {module}")
+    output = args.output or os.path.join(RESULTS_DIRECTORY, f"startup-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults saved to {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print(f"Compared with {baseline['commit']} ({args.compare}): {baseline['median'] / results['median']:.2f}x faster "
+            + f"({(results['median'] - baseline['median']) * 1000:+.0f}ms median)")
+    return
+
+'''
+Helper functions: Measuring startup
+'''
+def time_to_first_prompt(script: str, directory: str, timeout: float, python_options: list[str] = None) -> tuple:
+    '''
+    Given a script, start it and measure how long it takes until its first prompt is printed, then stop it.\n
+    Parameters:
+    - (str) script: path of main.py
+    - (str) directory: working directory of the script
+    - (float) timeout: seconds after which the script is stopped and the measurement fails
+    - (list[str]) python_options: extra options of the Python interpreter (eg. ["-X", "importtime"])\n
+    Return:
+    - (tuple) seconds from starting the interpreter to the first prompt, and what the script printed to stderr
+    '''
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, *(python_options or []), script], cwd=directory,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    outputs = {process.stdout.fileno(): b"", process.stderr.fileno(): b""}
+    try:
+        # Both pipes are read as the script runs, so that a full stderr pipe never blocks it
+        while FIRST_PROMPT not in outputs[process.stdout.fileno()]:
+            remaining = timeout - (time.perf_counter() - start)
+            ready = select.select(list(outputs), [], [], max(remaining, 0))[0]
+            if not ready:
+                raise TimeoutError(f"no prompt after {timeout}s")
+            for fd in ready:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    raise RuntimeError("exited before the first prompt:\n"
+                        + outputs[process.stderr.fileno()].decode(errors="replace")[-2000:])
+                outputs[fd] += chunk
+        return time.perf_counter() - start, outputs[process.stderr.fileno()]
+    finally:
+        process.kill()
+        process.communicate()
+
+def get_slowest_imports(script: str, directory: str, timeout: float, count: int) -> list:
+    '''
+    Given a script, run it once with "-X importtime" and return the modules that took longest to import
+    before its first prompt.\n
+    Parameters:
+    - (str) script: path of main.py
+    - (str) directory: working directory of the script
+    - (float) timeout: seconds after which the script is stopped
+    - (int) count: number of modules to return\n
+    Return:
+    - (list) (module, cumulative seconds) pairs, slowest first
+    '''
+    _, stderr = time_to_first_prompt(script, directory, timeout, ["-X", "importtime"])
+    imports = []
+    for line in stderr.decode(errors="replace").splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                imports.append((module.strip(), int(cumulative) / 1e6))
+    imports.sort(key=lambda module_time: module_time[1], reverse=True)
+    return imports[:count]
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure how long main.py takes to show its first prompt.")
+    parser.add_argument("--runs", type=int, default=10, help="number of times main.py is started")
+    parser.add_argument("--script", default=MAIN_SCRIPT, help="main.py to start (eg. of another checkout)")
+    parser.add_argument("--directory", default=None,
+        help="working directory of main.py, eg. one with headers_auth.json and .env (defaults to an empty directory)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the first prompt")
+    parser.add_argument("--imports", type=int, default=15, help="number of slowest imports to list (0 to skip)")
+    parser.add_argument("--output", default=None,
+        help=f"results file (defaults to {os.path.relpath(RESULTS_DIRECTORY)}/startup-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="results file of an earlier run to compare with")
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,52 @@
 import time
 start_time = time.time()
-import spotipy
-import urllib
+import urllib.parse
 import logging
-import requests
+import json
+import sys
+import argparse
 import os
-os.system("")
+if os.name == "nt":
+    os.system("")
 
-from SpotifyConverterClass import SpotifyConverter
-from YouTubeConverterClass import YouTubeMusicConverter
-from spotipy.oauth2 import SpotifyOAuth
-from spotipy.oauth2 import SpotifyClientCredentials
-from ytmusicapi import YTMusic
+# Heavy libraries (spotipy, ytmusicapi, numpy through the converters, youtube_dl through the Downloader) and the
+#   local stores are only imported and opened when the first job needs them, so the first prompt shows up at once.
+from RateLimiterClass import RateLimiter
+from RateLimitedClientClass import RateLimitedClient
+from LazyClientClass import LazyClient
+from JournalClass import Journal
+from MetricsClass import Metrics, InstrumentedClient
+from ReporterClass import Reporter
+from BatchRunnerClass import BatchRunner
 from termcolor import colored
-from dotenv import load_dotenv, dotenv_values
+from dotenv import load_dotenv
 load_dotenv()
 
-''' YTM_CLIENT: unofficial YouTube Music API (ytmusicapi library) client '''
-# YTMusic.setup('headers_auth.json')
-YTM_CLIENT = YTMusic('headers_auth.json')
-
-''' SP_CLIENT: authorization code flow'''
-SP_SCOPE = "playlist-read-private playlist-modify-private user-library-read user-library-modify"
-SP_AUTH_MANAGER = SpotifyOAuth(scope=SP_SCOPE)
-SP_AUTH_URL = "https://accounts.spotify.com/api/token"
-SP_AUTH_DATA = {
-    'grant_type': 'client_credentials',
-    'client_id': dotenv_values("SPOTIPY_CLIENT_ID"),
-    'client_secret': dotenv_values("SPOTIPY_REDIRECT_URI"),
+''' METRICS: timings of each phase and API call, and counters of the current conversion (reset for each job) '''
+METRICS = Metrics()
+
+''' YTM_CLIENT: unofficial YouTube Music API (ytmusicapi library) client (created on first use, see create_YTM_client) '''
+YTM_CLIENT = RateLimitedClient(InstrumentedClient(LazyClient(lambda: create_YTM_client()), METRICS, "YouTube Music"),
+    RateLimiter("YouTube Music", float(os.getenv("CONVERTER_YTM_RATE", "5"))))
+
+''' SP_CLIENT: authorization code flow (created on first use, see create_SP_client) '''
+SP_CLIENT = RateLimitedClient(InstrumentedClient(LazyClient(lambda: create_SP_client()), METRICS, "Spotify"),
+    RateLimiter("Spotify", float(os.getenv("CONVERTER_SP_RATE", "10"))))
+
+''' MAX_WORKERS: number of songs matched concurrently in each playlist (1 to match songs one at a time) '''
+MAX_WORKERS = int(os.getenv("CONVERTER_MAX_WORKERS", "4"))
+
+''' PAGE_WORKERS: number of pages of a Spotify playlist requested at once (1 to request pages one at a time) '''
+PAGE_WORKERS = int(os.getenv("CONVERTER_PAGE_WORKERS", "8"))
+
+''' CONVERTER_OPTIONS: keyword arguments shared by every converter created in this session (the search cache,
+    match store, catalog index and query planner are added by get_converter_options when the first converter is
+    created) '''
+CONVERTER_OPTIONS = {
+    "MAX_WORKERS": MAX_WORKERS,
+    "PAGE_WORKERS": PAGE_WORKERS,
+    "METRICS": METRICS,
 }
-SP_AUTH_RESPONSE = requests.post(SP_AUTH_URL, data=SP_AUTH_DATA)
-SP_AUTH_TOKEN = SP_AUTH_RESPONSE.json().get("access_token")
-print("SP_AUTH_TOKEN = ", SP_AUTH_TOKEN)
-SP_CLIENT = spotipy.Spotify(SP_AUTH_TOKEN)
 
 # TODO:
 # 1. fix authorization for Spotify
@@ -43,34 +57,49 @@ SP_CLIENT = spotipy.Spotify(SP_AUTH_TOKEN)
 #    - for video results, search only the video title (instead of simply skipping and not adding)
 
 def main():
+    args = get_args()
     logging.basicConfig(
         filename="log.log", 
         level=logging.INFO,
         format=u"%(message)s",
         filemode="w",
         encoding="utf-8")
-    check_exit = False
-    while not check_exit:
-        job = get_job()
-        keep_dupes = get_keep_dupes_bool()
-        if job == "Playlist":
-            parsed_URL = get_playlist_URL()
-            netloc = parsed_URL.netloc
-            path = parsed_URL.path
-            query = parsed_URL.query
-            if netloc == "open.spotify.com" and path[:10] == "/playlist/":
-                sp_playlist_ID = path[10:]
-                do_playlist_spotify(sp_playlist_ID, keep_dupes)
-            elif netloc == "music.youtube.com" and path == "/playlist":
-                yt_playlist_ID = query[5:]
-                do_playlist_youtube(yt_playlist_ID, keep_dupes)
-        elif job == "Library":
-            source = get_source()
-            if source == "Spotify":
-                do_library_spotify(keep_dupes)
-            elif source == "YouTube Music":
-                do_library_youtube(keep_dupes)
-        check_exit = prompt_exit()
+    if args.import_matches or args.export_matches:
+        return do_share_matches(args)
+    if args.manifest:
+        return do_batch(args)
+    reporter = None
+    if args.events or args.metrics:
+        reporter = Reporter(args.events, args.metrics, args.progress_interval)
+        CONVERTER_OPTIONS["REPORTER"] = reporter
+    try:
+        check_exit = False
+        while not check_exit:
+            job = get_job()
+            METRICS.reset()
+            keep_dupes = get_keep_dupes_bool()
+            if job == "Playlist":
+                parsed_URL = get_playlist_URL()
+                netloc = parsed_URL.netloc
+                path = parsed_URL.path
+                query = parsed_URL.query
+                if netloc == "open.spotify.com" and path[:10] == "/playlist/":
+                    sp_playlist_ID = path[10:]
+                    do_playlist_spotify(sp_playlist_ID, keep_dupes)
+                elif netloc == "music.youtube.com" and path == "/playlist":
+                    yt_playlist_ID = query[5:]
+                    do_playlist_youtube(yt_playlist_ID, keep_dupes)
+            elif job == "Library":
+                source = get_source()
+                if source == "Spotify":
+                    do_library_spotify(keep_dupes, args.resume)
+                elif source == "YouTube Music":
+                    do_library_youtube(keep_dupes, args.resume)
+            check_exit = prompt_exit()
+    finally:
+        if reporter:
+            reporter.close()
+        close_stores()
     get_run_time()
     return
 
@@ -84,6 +113,28 @@ def get_run_time() -> None:
     logging.info(f"\nProgram run time: {minutes} minutes and {seconds} seconds")
     return
 
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert Spotify and YouTube Music playlists and libraries.")
+    parser.add_argument("--resume", action="store_true",
+        help=f"continue the last library conversion recorded in {Journal.DEFAULT_PATH} instead of starting over")
+    parser.add_argument("--events", default=None,
+        help="append a JSON line for every event (eg. a song not found) to this file instead of printing each song")
+    parser.add_argument("--metrics", default=None,
+        help="write the metrics of each conversion to this file (Prometheus text format if it ends in .prom, "
+            + "JSON otherwise) instead of printing each song")
+    parser.add_argument("--progress-interval", type=float, default=Reporter.PROGRESS_INTERVAL,
+        help="seconds between two progress lines when --events, --metrics or --manifest is used")
+    parser.add_argument("--manifest", default=None,
+        help="convert the playlists and libraries listed in this JSON file without prompting (see BatchRunner)")
+    parser.add_argument("--workers", type=int, default=4, help="number of jobs of the manifest converted at once")
+    parser.add_argument("--summary", default="batch_summary.json",
+        help="file the JSON summary of a --manifest run is written to")
+    parser.add_argument("--import-matches", default=None,
+        help="merge the song matches of this JSON file (written by --export-matches) into the match store and exit")
+    parser.add_argument("--export-matches", default=None,
+        help="write the song matches of the match store to this JSON file (to share with other users) and exit")
+    return parser.parse_args()
+
 def get_job() -> None:
     job = input(colored("\nHello! Welcome to the Spotify-Youtube playlist coverter.\n\n" 
         + "Type 'L' to convert a library, or type 'P' to convert a playlist.\n\n", "green")).upper()
@@ -131,37 +182,167 @@ def prompt_exit() -> None:
     check_exit = True if check_exit == "exit" else False
     return check_exit
 
+'''
+Helper functions: Clients
+'''
+def create_YTM_client():
+    from ytmusicapi import YTMusic
+    # YTMusic.setup('headers_auth.json')
+    return YTMusic('headers_auth.json')
+
+def create_SP_client():
+    import spotipy
+    import requests
+    from dotenv import dotenv_values
+    SP_AUTH_URL = "https://accounts.spotify.com/api/token"
+    SP_AUTH_DATA = {
+        'grant_type': 'client_credentials',
+        'client_id': dotenv_values("SPOTIPY_CLIENT_ID"),
+        'client_secret': dotenv_values("SPOTIPY_REDIRECT_URI"),
+    }
+    SP_AUTH_RESPONSE = requests.post(SP_AUTH_URL, data=SP_AUTH_DATA)
+    SP_AUTH_TOKEN = SP_AUTH_RESPONSE.json().get("access_token")
+    print("SP_AUTH_TOKEN = ", SP_AUTH_TOKEN)
+    return spotipy.Spotify(SP_AUTH_TOKEN, requests_session=create_SP_session())
+
+def create_SP_session():
+    # NOTE: The session spotipy creates itself retries throttled requests inside the call (urllib3 honors
+    #   Retry-After even for status codes outside status_forcelist) and turns the last failure into a 429 without
+    #   its headers, so RateLimitedClient would never see a 429 (and could not slow down every request to
+    #   Spotify). This session only retries connections that could not be made, and leaves every HTTP error to
+    #   RateLimitedClient.
+    import requests
+    from urllib3.util.retry import Retry
+    retry = Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.3, respect_retry_after_header=False)
+    adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_converter_options() -> dict:
+    if "SEARCH_CACHE" not in CONVERTER_OPTIONS:
+        from SearchCacheClass import SearchCache
+        from MatchStoreClass import MatchStore
+        from CatalogIndexClass import CatalogIndex
+        from QueryPlannerClass import QueryPlanner
+        # On-disk search cache, store of resolved matches, index of every search result seen so far and stats
+        #   of which search queries find the best matches, shared by both converters
+        CONVERTER_OPTIONS["SEARCH_CACHE"] = SearchCache()
+        CONVERTER_OPTIONS["MATCH_STORE"] = MatchStore()
+        CONVERTER_OPTIONS["CATALOG_INDEX"] = CatalogIndex()
+        CONVERTER_OPTIONS["QUERY_PLANNER"] = QueryPlanner()
+    return CONVERTER_OPTIONS
+
+def finish_report(converter) -> None:
+    # Writes the "run_done" event and the metrics file of the job (if --events or --metrics)
+    if "REPORTER" in CONVERTER_OPTIONS:
+        CONVERTER_OPTIONS["REPORTER"].finish(METRICS, converter.get_run_stats())
+    return
+
+def close_stores() -> None:
+    # Writes what the local stores keep in memory (eg. stats of the query planner, access times of the search
+    #   cache) and closes their files, so that SQLite folds its -wal file back into each store
+    for option in ("SEARCH_CACHE", "MATCH_STORE", "CATALOG_INDEX", "QUERY_PLANNER"):
+        store = CONVERTER_OPTIONS.pop(option, None)
+        if store:
+            store.close()
+    return
+
 '''
 Convert playlist
 '''
 def do_playlist_spotify(sp_playlist_ID: str, keep_dupes: bool) -> None:
-    sp_converter = SpotifyConverter(YTM_CLIENT, SP_CLIENT, keep_dupes)
+    from SpotifyConverterClass import SpotifyConverter
+    sp_converter = SpotifyConverter(YTM_CLIENT, SP_CLIENT, keep_dupes, **get_converter_options())
     sp_converter.convert_SP_to_YT_playlist(sp_playlist_ID)
     sp_converter.print_not_added_songs()
+    sp_converter.print_run_stats()
+    finish_report(sp_converter)
     return
 
 def do_playlist_youtube(yt_playlist_ID: str, keep_dupes: bool) -> None:
     download = get_yt_download_bool()
-    yt_converter = YouTubeMusicConverter(YTM_CLIENT, SP_CLIENT, keep_dupes, download)
+    from YouTubeConverterClass import YouTubeMusicConverter
+    yt_converter = YouTubeMusicConverter(YTM_CLIENT, SP_CLIENT, keep_dupes, download, **get_converter_options())
     yt_converter.convert_YT_to_SP_playlist(yt_playlist_ID)
     yt_converter.print_not_added_songs()
+    yt_converter.print_run_stats()
     yt_converter.download_YT_videos()
+    finish_report(yt_converter)
     return
 
 '''
 Convert library
 '''
-def do_library_spotify(keep_dupes: bool) -> None:
-    sp_converter = SpotifyConverter(YTM_CLIENT, SP_CLIENT, keep_dupes)
+def do_library_spotify(keep_dupes: bool, resume: bool = False) -> None:
+    from SpotifyConverterClass import SpotifyConverter
+    journal = Journal(resume=resume)
+    sp_converter = SpotifyConverter(YTM_CLIENT, SP_CLIENT, keep_dupes, JOURNAL=journal, **get_converter_options())
     sp_converter.convert_SP_to_YT_library()
+    journal.close()
+    finish_report(sp_converter)
     return
 
-def do_library_youtube(keep_dupes: bool) -> None:
+def do_library_youtube(keep_dupes: bool, resume: bool = False) -> None:
     download = get_yt_download_bool()
-    yt_converter = YouTubeMusicConverter(YTM_CLIENT, SP_CLIENT, keep_dupes, download)
+    from YouTubeConverterClass import YouTubeMusicConverter
+    journal = Journal(resume=resume)
+    yt_converter = YouTubeMusicConverter(YTM_CLIENT, SP_CLIENT, keep_dupes, download, JOURNAL=journal,
+        **get_converter_options())
     yt_converter.convert_YT_to_SP_library()
+    journal.close()
+    finish_report(yt_converter)
     return
 
+'''
+Convert manifest
+'''
+def do_batch(args: argparse.Namespace) -> int:
+    # Songs are not printed one by one in batch runs, only progress lines and the summary
+    reporter = Reporter(args.events, args.metrics, args.progress_interval)
+    CONVERTER_OPTIONS["REPORTER"] = reporter
+    batch_runner = BatchRunner(YTM_CLIENT, SP_CLIENT, get_converter_options(), args.workers, args.resume)
+    try:
+        jobs = batch_runner.load_manifest(args.manifest)
+    except (OSError, ValueError) as error:
+        reporter.close()
+        close_stores()
+        print(f"ERROR: Could not read the manifest {args.manifest}: {error}")
+        return 2
+    METRICS.reset()
+    try:
+        summary = batch_runner.run(jobs)
+    finally:
+        reporter.close()
+        close_stores()
+    summary["manifest"] = args.manifest
+    with open(args.summary, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2, default=str)
+    print(f"\nConverted {summary['done']} of {len(jobs)} jobs in {summary['elapsed']:.1f}s "
+        + f"({summary['failed']} failed), summary saved to {args.summary}")
+    return 0 if summary["failed"] == 0 else 1
+
+'''
+Share matches
+'''
+def do_share_matches(args: argparse.Namespace) -> int:
+    from MatchStoreClass import MatchStore
+    match_store = MatchStore()
+    try:
+        if args.import_matches:
+            imported = match_store.import_matches(args.import_matches)
+            print(f"Imported {imported} matches from {args.import_matches}")
+        if args.export_matches:
+            exported = match_store.export_matches(args.export_matches)
+            print(f"Exported {exported} matches to {args.export_matches}")
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        print(f"ERROR: Could not share matches: {error!r}")
+        return 2
+    finally:
+        match_store.close()
+    return 0
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
     
\ No newline at end of file